@@ -3,17 +3,11 @@
 from __future__ import annotations
 
 import asyncio
-import importlib.metadata
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import TYPE_CHECKING, Any, cast
 
-import aiohttp
 import typer
-from aiohttp.client_exceptions import ClientConnectorDNSError
-from aiohttp_retry import ExponentialRetry
-from sqlalchemy.exc import DatabaseError, IntegrityError, OperationalError
 
-from boosty_downloader.src.application.di.app_environment import AppEnvironment
-from boosty_downloader.src.application.di.download_context import DownloadContext
 from boosty_downloader.src.application.exceptions.application_errors import (
     ApplicationCancelledError,
 )
@@ -21,60 +15,44 @@ from boosty_downloader.src.application.filtering import (
     DownloadContentTypeFilter,
     VideoQualityOption,
 )
-from boosty_downloader.src.application.use_cases.check_total_posts import (
-    ReportTotalPostsCountUseCase,
-)
-from boosty_downloader.src.application.use_cases.download_all_posts import (
-    DownloadAllPostUseCase,
-)
-from boosty_downloader.src.application.use_cases.download_specific_post import (
-    DownloadPostByUrlUseCase,
-)
-from boosty_downloader.src.infrastructure.boosty_api.core.client import (
-    BoostyAPINoUsernameError,
-    BoostyAPIUnauthorizedError,
-    BoostyAPIUnknownError,
-    BoostyAPIValidationError,
-)
-from boosty_downloader.src.infrastructure.boosty_api.utils.auth_parsers import (
-    parse_auth_header,
-    parse_session_cookie,
-)
-from boosty_downloader.src.infrastructure.external_videos_downloader.external_videos_downloader import (
-    ExternalVideosDownloader,
-)
+from boosty_downloader.src.infrastructure.content_store import LinkMode
 from boosty_downloader.src.infrastructure.loggers import logger_instances
-from boosty_downloader.src.infrastructure.loggers.failed_downloads_logger import (
-    FailedDownloadsLogger,
-)
-from boosty_downloader.src.infrastructure.update_checker.pypi_checker import (
-    CheckFailed,
-    NoUpdate,
-    UpdateAvailable,
-    check_for_updates,
-)
-from boosty_downloader.src.infrastructure.yaml_configuration.config import init_config
 from boosty_downloader.src.interfaces.cli_options import (
     # ---------------------------------------------------------------------------
     # These imports can't be moved to TYPE_CHECKING
     # because they are used by typer at runtime.
     #
+    BatchOption,  # noqa: TC001
+    BuildIndexOption,  # noqa: TC001
     CheckTotalCountOption,  # noqa: TC001
+    ChunkConcurrencyOption,  # noqa: TC001
     CleanCacheOption,  # noqa: TC001
     ContentTypeFilterOption,  # noqa: TC001
+    DeduplicateOption,  # noqa: TC001
+    DedupLinkModeOption,  # noqa: TC001
     DestinationDirectoryOption,  # noqa: TC001
+    DownloadSegmentsOption,  # noqa: TC001
+    ExternalVideosParallelDownloadsOption,  # noqa: TC001
+    IncrementalOption,  # noqa: TC001
+    IncrementalStopAfterOption,  # noqa: TC001
+    MaxBackoffMinutesOption,  # noqa: TC001
+    MaxDownloadsOption,  # noqa: TC001
+    MaxDownloadsPerHostOption,  # noqa: TC001
+    MinRequestDelaySecondsOption,  # noqa: TC001
+    PollIntervalMinutesOption,  # noqa: TC001
+    PostConcurrencyOption,  # noqa: TC001
     PostUrlOption,  # noqa: TC001
     PreferredVideoQualityOption,  # noqa: TC001
+    PrefetchPagesOption,  # noqa: TC001
     RequestDelaySecondsOption,  # noqa: TC001
+    ResumeOption,  # noqa: TC001
     UsernameOption,  # noqa: TC001
+    VerifyOption,  # noqa: TC001
+    VideoMinSpeedOption,  # noqa: TC001
 )
 
 if TYPE_CHECKING:
-    from pathlib import Path
-
-    from boosty_downloader.src.interfaces.console_progress_reporter import (
-        ProgressReporter,
-    )
+    from collections.abc import Callable, Coroutine
 
 typer_app = typer.Typer(
     no_args_is_help=True,
@@ -82,177 +60,39 @@ typer_app = typer.Typer(
     rich_markup_mode='rich',
 )
 
-GITHUB_ISSUES_URL = 'https://github.com/Glitchy-Sheep/boosty-downloader/issues'
-
-
-def show_start_summary(
-    pr: ProgressReporter,
-    destination_directory: Path,
-    content_type_filter: list[DownloadContentTypeFilter],
-) -> None:
-    """Just simple review before start downloading"""
-    pr.info(
-        f'[italic]Destination directory[/italic]: [bold green]{destination_directory}[/bold green]'
-    )
-    pr.info(
-        '--------------------------------------------------------------------------\n'
-        'Script will download: [bold green]'
-        + ', '.join(str(item.name) for item in content_type_filter)
-        + '[/bold green]\n'
-        '--------------------------------------------------------------------------\n'
-    )
-    pr.notice(
-        'You can safely interrupt the download at any time with [bold yellow]Ctrl+C[/bold yellow].\n'
-    )
-    if DownloadContentTypeFilter.external_videos in content_type_filter:
-        pr.notice(
-            'Progress bar for external videos downloadings can be glitchy, because yt-dlp downloads them by chunks.\n'
-            "If you see strange progress movement that's normal in most cases, just be patient.\n"
-        )
-
-
-async def typer_cmd_handler(  # noqa: PLR0913 (too many arguments because of typer)
-    *,
-    username: str,
-    post_url: PostUrlOption | None,
-    check_total_count: bool,
-    clean_cache: bool,
-    content_type_filter: list[DownloadContentTypeFilter],
-    preferred_video_quality: VideoQualityOption,
-    request_delay_seconds: float,
-    destination_directory: Path | None,
-) -> None:
-    """Download all posts from the specified user"""
-    config = init_config()
-
-    cookie_string = config.auth.cookie
-    auth_header = config.auth.auth_header
-
-    # Set the destination directory if provided
-    if destination_directory is not None:
-        config.downloading_settings.target_directory = destination_directory
-
-    retry_options = ExponentialRetry(
-        attempts=5,
-        exceptions={
-            aiohttp.ClientConnectorError,
-            aiohttp.ClientOSError,
-            aiohttp.ServerDisconnectedError,
-            aiohttp.ClientResponseError,
-            aiohttp.ClientConnectionError,
-        },
-    )
-
-    # --------------------------------------------------------------------------
-    # Check for updates and notify the user
-    current_version = importlib.metadata.version('boosty-downloader')
-    result = check_for_updates(current_version, 'boosty-downloader')
-    match result:
-        case UpdateAvailable():
-            logger_instances.downloader_logger.warning(
-                f'🔔 [bold green]Update available[/bold green]: {result.latest_version} (current: {result.current_version})'
-            )
-            logger_instances.downloader_logger.warning(
-                'You can update with --> [bold]pip install -U boosty-downloader[/bold]'
-            )
-            logger_instances.downloader_logger.warning(
-                'But first, please check the changelog for breaking changes\n'
-            )
-        case NoUpdate():
-            logger_instances.downloader_logger.info(
-                'You are using the latest boosty-downloader version.\n'
-            )
-        case CheckFailed():
-            logger_instances.downloader_logger.error(
-                'Failed to check for updates, please check it manually.\n'
-            )
-
-    # --------------------------------------------------------------------------
-    # Prepare app environment and start the task
-    async with AppEnvironment(
-        config=AppEnvironment.AppConfig(
-            author_name=username,
-            target_directory=config.downloading_settings.target_directory.absolute(),
-            boosty_headers=parse_auth_header(auth_header),
-            boosty_cookies_jar=parse_session_cookie(cookie_string),
-            retry_options=retry_options,
-            request_delay_seconds=request_delay_seconds,
-            logger=logger_instances.downloader_logger,
-        )
-    ) as app_environment:
-        downloading_context = DownloadContext(
-            author_name=username,
-            downloader_session=app_environment.downloading_retry_client,
-            external_videos_downloader=ExternalVideosDownloader(),
-            filters=content_type_filter,
-            post_cache=app_environment.post_cache,
-            preferred_video_quality=preferred_video_quality.to_ok_video_type(),
-            progress_reporter=app_environment.progress_reporter,
-            failed_logger=FailedDownloadsLogger(
-                log_file_path=config.downloading_settings.target_directory
-                / username
-                / 'failed_downloads.log',
-            ),
-        )
-
-        # ------------------------------------------------------------------
-        # Cache cleaning
-        if clean_cache:
-            app_environment.post_cache.remove_cache_completely()
-            logger_instances.downloader_logger.success(
-                f'Cache for {username} has been cleaned successfully'
-            )
-            return
-
-        # ------------------------------------------------------------------
-        # Total Checker
-        if check_total_count:
-            await ReportTotalPostsCountUseCase(
-                author_name=username,
-                logger=logger_instances.downloader_logger,
-                boosty_api=app_environment.boosty_api_client,
-            ).execute()
-            return
-
-        # ------------------------------------------------------------------
-        # Download specific post by URL
-        if post_url is not None:
-            await DownloadPostByUrlUseCase(
-                post_url=post_url,
-                boosty_api=app_environment.boosty_api_client,
-                destination=app_environment.destination_directory,
-                download_context=downloading_context,
-            ).execute()
-            return
-
-        # ------------------------------------------------------------------
-        # Download all posts
-
-        show_start_summary(
-            pr=app_environment.progress_reporter,
-            destination_directory=app_environment.destination_directory,
-            content_type_filter=content_type_filter,
-        )
-
-        await DownloadAllPostUseCase(
-            author_name=username,
-            boosty_api=app_environment.boosty_api_client,
-            destination=app_environment.destination_directory,
-            download_context=downloading_context,
-        ).execute()
+# Don't: import the CLI flow (and aiohttp, SQLAlchemy, yt-dlp with it) at the top.
+# Why: `--help` and argument errors should be printed right away, see the startup time test.
 
 
 # Use wrapper because typer can't run async functions directly
-@typer_app.command()
+@typer_app.callback(invoke_without_command=True)
 def typer_cmd_entrypoint(  # noqa: PLR0913 (too many arguments because of typer)
+    ctx: typer.Context,
     *,
-    username: UsernameOption,
+    username: UsernameOption = None,
+    batch: BatchOption = False,
     request_delay_seconds: RequestDelaySecondsOption = 2.5,
+    min_request_delay_seconds: MinRequestDelaySecondsOption = 1.0,
+    post_concurrency: PostConcurrencyOption = 1,
+    prefetch_pages: PrefetchPagesOption = 1,
+    chunk_concurrency: ChunkConcurrencyOption = 4,
+    max_downloads: MaxDownloadsOption = 8,
+    max_downloads_per_host: MaxDownloadsPerHostOption = 4,
+    download_segments: DownloadSegmentsOption = 1,
+    video_min_speed: VideoMinSpeedOption = 64,
+    external_videos_parallel: ExternalVideosParallelDownloadsOption = 1,
     post_url: PostUrlOption = None,
     content_type_filter: ContentTypeFilterOption = None,
     preferred_video_quality: PreferredVideoQualityOption = VideoQualityOption.medium,
+    dedup: DeduplicateOption = False,
+    dedup_link_mode: DedupLinkModeOption = LinkMode.hardlink,
     check_total_count: CheckTotalCountOption = False,
     clean_cache: CleanCacheOption = False,
+    incremental: IncrementalOption = False,
+    incremental_stop_after: IncrementalStopAfterOption = 10,
+    resume: ResumeOption = False,
+    verify: VerifyOption = False,
+    build_index: BuildIndexOption = False,
     destination_directory: DestinationDirectoryOption = None,
 ) -> None:
     """
@@ -266,6 +106,21 @@ def typer_cmd_entrypoint(  # noqa: PLR0913 (too many arguments because of typer)
         - Unavailable posts are skipped, and you will be notified about them.
 
 
+    [bold]BATCH MODE:[/bold]
+
+        - Use `--batch` instead of `--username` to download all the authors listed in `batch.authors` of the config file.
+        - They run in a single process: the connection, API rate and `--max-downloads` limits are shared,
+          up to `batch.parallel_authors` authors are downloaded at once and download slots are split between them fairly.
+        - Every author keeps its own directory and cache, a failed author doesn't stop the others.
+
+
+    [bold]DAEMON MODE:[/bold]
+
+        - Use `daemon` command to keep the downloads in sync instead of running the tool from cron,
+          options of the sync go before it: [italic]boosty-downloader -f files daemon --interval-minutes 15[/italic]
+        - Polls `--username` (or all the `batch.authors` of the config file) and downloads only new or updated posts.
+
+
     [bold]CONTENT FILTERING:[/bold]
 
         - Use multiple `-f` flags to select content types (all included by default).
@@ -278,7 +133,13 @@ def typer_cmd_entrypoint(  # noqa: PLR0913 (too many arguments because of typer)
     [bold]RATE LIMITING:[/bold]
 
         - Increase request delay (default 2.5s) if you get errors.
+        - The delay adapts to the API: it goes down to `--min-request-delay-seconds` (default 1s) while everything is fine
+          and goes up when the API asks to slow down.
         - Please avoid spamming the API.
+        - Use `--post-concurrency` to download several posts at once (default 1).
+        - Use `--chunk-concurrency` to limit parallel downloads inside a single post (default 4).
+        - Boosty videos continue from the failover CDN host on errors or when the primary one
+          stays slower than `--video-min-speed` KiB/s (default 64, 0 to switch only on errors).
 
 
     [bold]ABOUT CONTENT SYNC & CACHING:[/bold]
@@ -287,23 +148,96 @@ def typer_cmd_entrypoint(  # noqa: PLR0913 (too many arguments because of typer)
         - Downloading the same post with different filters downloads only missing parts.
         - Posts updated by creators are fully re-downloaded.
         - Cache doesn't check local files, you can delete them and they still won't re-download.
+        - Use `--verify` to check files against the per-post manifests (sizes and SHA-256)
+          and download only damaged or missing ones again.
+        - Use `--incremental` to stop at already synced posts instead of checking the whole history.
+        - Use `--resume` to continue an interrupted full download from the last completed page.
+        - Use `--dedup` to keep repeated images/files once (in `.content_store`) and link them into posts.
+        - Use `--index` to keep `index.html` with all the downloaded posts and search by title,
+          it's updated after every post and works offline.
 
     """
-    asyncio.run(
-        typer_cmd_handler(
-            username=username,
-            check_total_count=check_total_count,
-            clean_cache=clean_cache,
-            post_url=post_url,
-            content_type_filter=(
-                content_type_filter
-                if content_type_filter
-                else list(DownloadContentTypeFilter)
-            ),
-            preferred_video_quality=preferred_video_quality,
-            request_delay_seconds=request_delay_seconds,
-            destination_directory=destination_directory,
+    multi_author = batch or ctx.invoked_subcommand is not None
+    if multi_author and (post_url is not None or clean_cache or check_total_count):
+        message = (
+            "can't be combined with --post-url, --clean-cache or --only-check-total"
+        )
+        raise typer.BadParameter(
+            message, param_hint=ctx.invoked_subcommand or '--batch'
+        )
+    if not multi_author and not username:
+        message = 'username is required (or use --batch)'
+        raise typer.BadParameter(message, param_hint='--username')
+
+    from boosty_downloader.src.interfaces.cli_handler import (  # noqa: PLC0415 (lazy import)
+        typer_cmd_handler,
+    )
+
+    run_handler = partial(
+        typer_cmd_handler,
+        username=username,
+        batch=batch,
+        check_total_count=check_total_count,
+        clean_cache=clean_cache,
+        incremental=incremental,
+        incremental_stop_after=incremental_stop_after,
+        resume=resume,
+        verify=verify,
+        build_index=build_index,
+        post_url=post_url,
+        content_type_filter=(
+            content_type_filter
+            if content_type_filter
+            else list(DownloadContentTypeFilter)
         ),
+        preferred_video_quality=preferred_video_quality,
+        dedup_link_mode=dedup_link_mode if dedup else None,
+        request_delay_seconds=request_delay_seconds,
+        min_request_delay_seconds=min_request_delay_seconds,
+        post_concurrency=post_concurrency,
+        prefetch_pages=prefetch_pages,
+        chunk_concurrency=chunk_concurrency,
+        max_downloads=max_downloads,
+        max_downloads_per_host=max_downloads_per_host,
+        download_segments=download_segments,
+        video_min_speed=video_min_speed,
+        external_videos_parallel=external_videos_parallel,
+        destination_directory=destination_directory,
+    )
+    if ctx.invoked_subcommand is not None:
+        # Subcommands run the handler with these options themselves
+        ctx.obj = run_handler
+        return
+
+    asyncio.run(run_handler())
+
+
+@typer_app.command('daemon')
+def typer_daemon_entrypoint(
+    ctx: typer.Context,
+    *,
+    interval_minutes: PollIntervalMinutesOption = 30.0,
+    max_backoff_minutes: MaxBackoffMinutesOption = 60.0,
+) -> None:
+    """
+    Keep the authors in sync: poll them on schedule and download new or updated posts.
+
+    The app is started once (session, caches, API rate), so polls can be frequent.
+    On API or network errors the next poll of the author is postponed (1 min, then doubled up to the max backoff).
+    The first Ctrl+C (or SIGTERM) lets the running polls finish, the second one stops right away.
+    """
+    from boosty_downloader.src.application.use_cases.sync_daemon import (  # noqa: PLC0415 (lazy import)
+        PollSchedule,
+    )
+
+    run_handler = cast('Callable[..., Coroutine[Any, Any, None]]', ctx.obj)
+    asyncio.run(
+        run_handler(
+            poll_schedule=PollSchedule(
+                interval_seconds=interval_minutes * 60,
+                max_backoff_seconds=max_backoff_minutes * 60,
+            )
+        )
     )
 
 
@@ -318,47 +252,17 @@ def entry_point() -> None:
     """
     try:
         typer_app()
-    except BoostyAPINoUsernameError:
-        logger_instances.downloader_logger.error('Username not found')
-    except BoostyAPIUnauthorizedError:
-        logger_instances.downloader_logger.error(
-            'Unauthorized: Bad credentials, please relogin and update your config file'
-        )
-    except BoostyAPIUnknownError:
-        logger_instances.downloader_logger.error(
-            f'Unknown error occurred, please report this at GitHub issues of the project: {GITHUB_ISSUES_URL}'
-        )
-    except BoostyAPIValidationError as e:
-        logger_instances.downloader_logger.error(
-            'Boosty API returned unexpected structures, the client probably needs to be updated.\n'
-            f'Please report this at GitHub issues of the project: {GITHUB_ISSUES_URL}\n'
-            '\n'
-            f'Details: {e.errors!s}'
-        )
     except ApplicationCancelledError:
         logger_instances.downloader_logger.warning(
             'Download cancelled by user, see you later! 💘\n'
         )
-    except ClientConnectorDNSError:
-        logger_instances.downloader_logger.error(
-            'Network error: Unable to connect to Boosty API, please check your internet connection.'
-        )
-    except (
-        OperationalError,
-        DatabaseError,
-        IntegrityError,
-    ) as e:
-        logger_instances.downloader_logger.error('⚠️  Cache Error!\n' + str(e))
-        logger_instances.downloader_logger.warning(
-            'Cache format may be outdated after application update.'
-        )
-        logger_instances.downloader_logger.info(
-            '👉 You can clean outdated cache with --clean-cache flag'
+    except Exception as e:
+        from boosty_downloader.src.interfaces.cli_handler import (  # noqa: PLC0415 (lazy import)
+            report_app_error,
         )
-        logger_instances.downloader_logger.info(
-            '👉 If this will still happen - please report it at GitHub issues:'
-        )
-        logger_instances.downloader_logger.info(f'👉 {GITHUB_ISSUES_URL}')
+
+        if not report_app_error(e):
+            raise
 
 
 if __name__ == '__main__':
@@ -1,25 +1,61 @@
 """Defines the application environment and dependency injection context for resource management."""
 
-from contextlib import AsyncExitStack
+from __future__ import annotations
+
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
 from dataclasses import dataclass
-from pathlib import Path
-from types import TracebackType
+from typing import TYPE_CHECKING
 
 import aiohttp
-from aiohttp.typedefs import LooseHeaders
 from aiohttp_retry import RetryClient, RetryOptionsBase
 
 from boosty_downloader.src.infrastructure.boosty_api.core.client import BoostyAPIClient
-from boosty_downloader.src.infrastructure.loggers.logger_instances import RichLogger
-from boosty_downloader.src.infrastructure.post_caching.post_cache import SQLitePostCache
+from boosty_downloader.src.infrastructure.content_store import ContentStore, LinkMode
+from boosty_downloader.src.infrastructure.download_scheduler import DownloadScheduler
+from boosty_downloader.src.infrastructure.external_videos_downloader.external_videos_downloader import (
+    ExternalVideosDownloader,
+)
+from boosty_downloader.src.infrastructure.post_caching.pagination_checkpoint import (
+    PaginationCheckpoint,
+)
 from boosty_downloader.src.interfaces.console_progress_reporter import (
     ProgressReporter,
     use_reporter,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Generator
+    from pathlib import Path
+    from types import TracebackType
+
+    from aiohttp.typedefs import LooseHeaders
+    from yarl import URL
+
+    from boosty_downloader.src.infrastructure.author_index import AuthorIndex
+    from boosty_downloader.src.infrastructure.loggers.logger_instances import RichLogger
+    from boosty_downloader.src.infrastructure.post_caching.post_cache import (
+        SQLitePostCache,
+    )
+
+
+@dataclass
+class _SharedResources:
+    """Resources shared by all the authors downloaded in the same app context."""
+
+    boosty_api_client: BoostyAPIClient
+    downloading_retry_client: RetryClient
+    progress_reporter: ProgressReporter
+    download_scheduler: DownloadScheduler
+    external_videos_downloader: ExternalVideosDownloader
+
 
 class AppEnvironment:
-    """Manages the application's resource initialization and cleanup, providing an async context for dependency injection."""
+    """
+    Manages the application's resource initialization and cleanup, providing an async context for dependency injection.
+
+    The session, API client (with its request rate), download scheduler and external videos downloader
+    are shared, so other authors can be opened in the same context with `open_author`.
+    """
 
     @dataclass
     class Environment:
@@ -30,6 +66,11 @@ class AppEnvironment:
         progress_reporter: ProgressReporter
         destination_directory: Path
         post_cache: SQLitePostCache
+        pagination_checkpoint: PaginationCheckpoint
+        download_scheduler: DownloadScheduler
+        content_store: ContentStore | None
+        author_index: AuthorIndex | None
+        external_videos_downloader: ExternalVideosDownloader
 
     @dataclass
     class AppConfig:
@@ -42,6 +83,15 @@ class AppEnvironment:
         retry_options: RetryOptionsBase
         request_delay_seconds: float
         logger: RichLogger
+        min_request_delay_seconds: float | None = None
+        external_videos_parallel_downloads: int = 1
+        max_parallel_downloads: int = 8
+        max_parallel_downloads_per_host: int = 4
+        content_store_link_mode: LinkMode | None = None  # None disables deduplication
+        boosty_base_url: URL | None = (
+            None  # Another API server (e.g. local fake for benchmarks)
+        )
+        build_index: bool = False  # Maintain index.html of all downloaded posts
 
     def __init__(
         self,
@@ -54,21 +104,53 @@ class AppEnvironment:
         self.logger = config.logger
         self.retry_options = config.retry_options
         self._request_delay_seconds = config.request_delay_seconds
+        self._min_request_delay_seconds = config.min_request_delay_seconds
+        self._external_videos_parallel_downloads = (
+            config.external_videos_parallel_downloads
+        )
+        self._max_parallel_downloads = config.max_parallel_downloads
+        self._max_parallel_downloads_per_host = config.max_parallel_downloads_per_host
+        self._content_store_link_mode = config.content_store_link_mode
+        self._boosty_base_url = config.boosty_base_url
+        self._build_index = config.build_index
 
-    async def __aenter__(self) -> 'Environment':
+    def _create_boosty_session(self) -> aiohttp.ClientSession:
+        # Don't: set BASE_URL here, the BoostyAPIClient will handle it internally.
+        # Why: this session will be used for both downloading and API requests with different bases.
+        return aiohttp.ClientSession(
+            headers=self.boosty_headers,
+            cookie_jar=self.boosty_cookies_jar,
+            timeout=aiohttp.ClientTimeout(total=None),
+            trust_env=True,
+        )
+
+    def _create_boosty_api_client(self, retry_client: RetryClient) -> BoostyAPIClient:
+        return BoostyAPIClient(
+            retry_client,
+            request_delay_seconds=self._request_delay_seconds,
+            base_url=self._boosty_base_url,
+            min_request_delay_seconds=self._min_request_delay_seconds,
+        )
+
+    @asynccontextmanager
+    async def boosty_api_only(self) -> AsyncGenerator[BoostyAPIClient, None]:
+        """
+        Open just the API client, without the author cache and downloaders.
+
+        It's enough for the actions which only query the API (e.g. counting posts).
+        """
+        async with self._create_boosty_session() as session:
+            yield self._create_boosty_api_client(
+                RetryClient(session, retry_options=self.retry_options)
+            )
+
+    async def __aenter__(self) -> Environment:
         """Enter the async context and initialize resources."""
         self._exit_stack = AsyncExitStack()
         await self._exit_stack.__aenter__()
 
         authorized_boosty_session = await self._exit_stack.enter_async_context(
-            # Don't: set BASE_URL here, the BoostyAPIClient will handle it internally.
-            # Why: this session will be used for both downloading and API requests with different bases.
-            aiohttp.ClientSession(
-                headers=self.boosty_headers,
-                cookie_jar=self.boosty_cookies_jar,
-                timeout=aiohttp.ClientTimeout(total=None),
-                trust_env=True,
-            )
+            self._create_boosty_session()
         )
 
         progress_reporter = await self._exit_stack.enter_async_context(
@@ -84,24 +166,95 @@ class AppEnvironment:
             authorized_boosty_session, retry_options=self.retry_options
         )
 
-        boosty_api_client = BoostyAPIClient(
-            authorized_retry_client,
-            request_delay_seconds=self._request_delay_seconds,
+        boosty_api_client = self._create_boosty_api_client(authorized_retry_client)
+
+        external_videos_downloader = self._exit_stack.enter_context(
+            ExternalVideosDownloader(
+                max_parallel_downloads=self._external_videos_parallel_downloads,
+            )
+        )
+
+        self._shared = _SharedResources(
+            boosty_api_client=boosty_api_client,
+            downloading_retry_client=authorized_retry_client,
+            progress_reporter=progress_reporter,
+            download_scheduler=DownloadScheduler(
+                max_concurrent=self._max_parallel_downloads,
+                max_per_host=self._max_parallel_downloads_per_host,
+            ),
+            external_videos_downloader=external_videos_downloader,
         )
+        self._environment = self._enter_author(self._exit_stack, self.author_name)
+        return self._environment
+
+    @contextmanager
+    def open_author(self, author_name: str) -> Generator[Environment, None, None]:
+        """
+        Open environment of another author within the entered app context.
+
+        Only the cache, content store and index of the author are its own, the rest is shared.
+        The author of the config is already open, so its environment is just returned.
+        """
+        if author_name == self.author_name:
+            yield self._environment
+            return
+
+        with ExitStack() as exit_stack:
+            yield self._enter_author(exit_stack, author_name)
+
+    def _enter_author(
+        self, exit_stack: ExitStack | AsyncExitStack, author_name: str
+    ) -> Environment:
+        # SQLAlchemy and Jinja are heavy, so they are imported only when the author is opened
+        from boosty_downloader.src.infrastructure.post_caching.post_cache import (  # noqa: PLC0415 (lazy import)
+            SQLitePostCache,
+        )
+
+        destination_directory = self.target_directory / author_name
 
         post_cache = SQLitePostCache(
-            destination=self.target_directory / self.author_name,
+            destination=destination_directory,
             logger=self.logger,
         )
         post_cache.__enter__()  # sync context manager
-        self._exit_stack.callback(post_cache.__exit__, None, None, None)
+        exit_stack.callback(post_cache.__exit__, None, None, None)
+
+        content_store = None
+        if self._content_store_link_mode is not None:
+            content_store = exit_stack.enter_context(
+                ContentStore(
+                    destination=destination_directory,
+                    link_mode=self._content_store_link_mode,
+                )
+            )
+
+        author_index = None
+        if self._build_index:
+            from boosty_downloader.src.infrastructure.author_index import (  # noqa: PLC0415 (lazy import)
+                AuthorIndex,
+            )
+
+            # Entered after the cache, so pending index rows are written before the cache is closed
+            author_index = exit_stack.enter_context(
+                AuthorIndex(
+                    destination=destination_directory,
+                    post_cache=post_cache,
+                )
+            )
 
         return self.Environment(
-            boosty_api_client=boosty_api_client,
-            downloading_retry_client=authorized_retry_client,
-            progress_reporter=progress_reporter,
-            destination_directory=self.target_directory / self.author_name,
+            boosty_api_client=self._shared.boosty_api_client,
+            downloading_retry_client=self._shared.downloading_retry_client,
+            progress_reporter=self._shared.progress_reporter,
+            destination_directory=destination_directory,
             post_cache=post_cache,
+            pagination_checkpoint=PaginationCheckpoint(
+                destination=destination_directory,
+            ),
+            external_videos_downloader=self._shared.external_videos_downloader,
+            download_scheduler=self._shared.download_scheduler,
+            content_store=content_store,
+            author_index=author_index,
         )
 
     async def __aexit__(
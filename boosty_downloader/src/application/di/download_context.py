@@ -8,9 +8,13 @@ from boosty_downloader.src.application.filtering import (
     BoostyOkVideoType,
     DownloadContentTypeFilter,
 )
+from boosty_downloader.src.infrastructure.author_index import AuthorIndex
+from boosty_downloader.src.infrastructure.content_store import ContentStore
+from boosty_downloader.src.infrastructure.download_scheduler import DownloadScheduler
 from boosty_downloader.src.infrastructure.external_videos_downloader.external_videos_downloader import (
     ExternalVideosDownloader,
 )
+from boosty_downloader.src.infrastructure.host_failover import ThroughputFloor
 from boosty_downloader.src.infrastructure.loggers.failed_downloads_logger import (
     FailedDownloadsLogger,
 )
@@ -30,3 +34,22 @@ class DownloadContext:
     preferred_video_quality: BoostyOkVideoType
     progress_reporter: ProgressReporter
     failed_logger: FailedDownloadsLogger
+    download_scheduler: DownloadScheduler
+
+    # How many concurrent range requests to use for big files/videos (1 - disabled)
+    download_segments: int = 1
+
+    # How many segments of a HLS/DASH video stream are fetched at once
+    stream_segment_concurrency: int = 4
+
+    # Boosty videos slower than this on the primary host continue from the failover one (None - only on errors)
+    video_throughput_floor: ThroughputFloor | None = None
+
+    # How many chunks (images/files/videos) of a single post are processed at once
+    chunk_concurrency: int = 1
+
+    # Deduplicates images and files across posts (None - disabled)
+    content_store: ContentStore | None = None
+
+    # Offline index.html of all downloaded posts, updated after each post (None - disabled)
+    author_index: AuthorIndex | None = None
@@ -5,6 +5,7 @@ If the API responses change, this mapper may need to be updated accordingly.
 """
 
 import json
+from collections import Counter, defaultdict
 
 from boosty_downloader.src.domain.post_data_chunks import PostDataChunkText
 from boosty_downloader.src.infrastructure.boosty_api.models.post.post_data_types import (
@@ -39,49 +40,69 @@ def _parse_header(style_definition: str) -> int:
     return header_possible_values.get(style_definition, 0)
 
 
-def _create_style_bitmap(
+def _style_boundaries(
     text_length: int, style_array: list[list[int]]
-) -> list[set[int]]:
-    """Create bitmap of styles for each character position."""
-    bitmap: list[set[int]] = [set() for _ in range(text_length)]
+) -> dict[int, list[tuple[int, int]]]:
+    """Collect (style_id, +1/-1) changes at every position where some style range starts or ends."""
+    boundaries: defaultdict[int, list[tuple[int, int]]] = defaultdict(list)
 
     for style_desc in style_array:
         style_id, start_idx, end_idx = style_desc
-        for i in range(start_idx, min(end_idx, text_length)):
-            bitmap[i].add(style_id)
+        # API never sends negative offsets, ranges beyond the text are cut
+        start_idx = max(start_idx, 0)
+        end_idx = min(end_idx, text_length)
+        if start_idx >= end_idx:
+            continue
 
-    return bitmap
+        boundaries[start_idx].append((style_id, 1))
+        # Ending at the text end changes nothing, no fragments start there
+        if end_idx < text_length:
+            boundaries[end_idx].append((style_id, -1))
+
+    return boundaries
 
 
 def _create_text_fragments(
-    text: str, style_bitmap: list[set[int]], header_level: int
+    text: str, style_array: list[list[int]], header_level: int
 ) -> list[PostDataChunkText.TextFragment]:
-    """Create text fragments based on style bitmap."""
+    """
+    Create text fragments with the same set of styles.
+
+    It sweeps over the style range boundaries only (not over every character),
+    overlapping ranges of the same style are counted, so the style is active while any of them is.
+    """
     if not text:
         return []
 
+    def make_fragment(
+        start: int, end: int | None, style_ids: set[int]
+    ) -> PostDataChunkText.TextFragment:
+        fragment = PostDataChunkText.TextFragment(text[start:end])
+        fragment.header_level = header_level
+        fragment.style = _convert_style_set_to_text_style(style_ids)
+        return fragment
+
     fragments: list[PostDataChunkText.TextFragment] = []
-    current_fragment_start = 0
-    current_styles: set[int] = style_bitmap[0] if style_bitmap else set()
+    active_counts: Counter[int] = Counter()
+    fragment_start = 0
+    fragment_styles: set[int] = set()
 
-    for i in range(1, len(text)):
-        if i >= len(style_bitmap) or style_bitmap[i] != current_styles:
-            fragment_text = text[current_fragment_start:i]
-            fragment = PostDataChunkText.TextFragment(fragment_text)
-            fragment.header_level = header_level
-            fragment.style = _convert_style_set_to_text_style(current_styles)
-            fragments.append(fragment)
+    boundaries = _style_boundaries(len(text), style_array)
+    for position in sorted(boundaries):
+        for style_id, delta in boundaries[position]:
+            active_counts[style_id] += delta
 
-            current_fragment_start = i
-            current_styles = style_bitmap[i] if i < len(style_bitmap) else set()
+        styles = {style_id for style_id, count in active_counts.items() if count > 0}
+        if styles == fragment_styles:
+            continue
 
-    # Add the last fragment
-    fragment_text = text[current_fragment_start:]
-    fragment = PostDataChunkText.TextFragment(fragment_text)
-    fragment.header_level = header_level
-    fragment.style = _convert_style_set_to_text_style(current_styles)
-    fragments.append(fragment)
+        if position > fragment_start:
+            fragments.append(make_fragment(fragment_start, position, fragment_styles))
+        fragment_start = position
+        fragment_styles = styles
 
+    # Add the last fragment
+    fragments.append(make_fragment(fragment_start, None, fragment_styles))
     return fragments
 
 
@@ -130,8 +151,7 @@ def _parse_content_field(
         text += '\n'
 
     header_level = _parse_header(style_info)
-    style_bitmap = _create_style_bitmap(len(text), styles_array)
-    return _create_text_fragments(text, style_bitmap, header_level)
+    return _create_text_fragments(text, styles_array, header_level)
 
 
 def to_domain_text_chunk(
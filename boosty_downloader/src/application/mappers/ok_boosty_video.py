@@ -1,5 +1,7 @@
 """Mapper for converting Boosty API video DTOs to domain video content objects."""
 
+from yarl import URL
+
 from boosty_downloader.src.application.ok_video_ranking import (
     get_best_video,
 )
@@ -12,6 +14,30 @@ from boosty_downloader.src.infrastructure.boosty_api.models.post.post_data_types
 )
 
 
+def to_failover_url(url: str, failover_host: str) -> str | None:
+    """
+    Return the video url with the host replaced by `failover_host`.
+
+    Failover host can be a bare host (`vd1.mycdn.me`) or an origin (`https://vd1.mycdn.me:8443`).
+    """
+    if not failover_host:
+        return None
+
+    original = URL(url, encoded=True)  # Keep the signed query exactly as it is
+    failover_origin = URL(
+        failover_host if '://' in failover_host else f'//{failover_host}'
+    )
+    if original.host is None or failover_origin.host is None:
+        return None
+
+    failover = original.with_host(failover_origin.host).with_port(
+        failover_origin.explicit_port
+    )
+    if failover_origin.scheme:
+        failover = failover.with_scheme(failover_origin.scheme)
+    return str(failover) if failover != original else None
+
+
 def to_ok_boosty_video_content(
     api_video_dto: BoostyPostDataOkVideoDTO, preferred_quality: BoostyOkVideoType
 ) -> PostDataChunkBoostyVideo | None:
@@ -35,4 +61,5 @@ def to_ok_boosty_video_content(
         url=best_video.url,
         title=api_video_dto.title,
         quality=choosed_quality.name,
+        failover_url=to_failover_url(best_video.url, api_video_dto.failover_host),
     )
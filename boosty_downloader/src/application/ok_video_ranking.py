@@ -12,6 +12,33 @@ from boosty_downloader.src.infrastructure.boosty_api.models.post.post_data_types
 
 KT = TypeVar('KT')
 
+# Formats which are manifests (HLS/DASH) of segmented streams, not a single video file
+ADAPTIVE_VIDEO_TYPES = frozenset(
+    {
+        BoostyOkVideoType.live_playback_dash,
+        BoostyOkVideoType.live_playback_hls,
+        BoostyOkVideoType.live_ondemand_hls,
+        BoostyOkVideoType.live_dash,
+        BoostyOkVideoType.live_hls,
+        BoostyOkVideoType.hls,
+        BoostyOkVideoType.dash,
+        BoostyOkVideoType.dash_uni,
+        BoostyOkVideoType.live_cmaf,
+    }
+)
+
+# Frame height of the progressive formats, to pick the same quality among stream renditions
+_VIDEO_TYPE_HEIGHTS = {
+    BoostyOkVideoType.ultra_hd: 2160,
+    BoostyOkVideoType.quad_hd: 1440,
+    BoostyOkVideoType.full_hd: 1080,
+    BoostyOkVideoType.high: 720,
+    BoostyOkVideoType.medium: 480,
+    BoostyOkVideoType.low: 360,
+    BoostyOkVideoType.tiny: 240,
+    BoostyOkVideoType.lowest: 144,
+}
+
 
 class RankingDict(Generic[KT]):
     """A dict which also keeps track of the max value, it's not thread-safe"""
@@ -92,3 +119,14 @@ def get_best_video(
             return video_url, highest_rank_video_type
 
     return None
+
+
+def is_adaptive_video_type(quality_name: str) -> bool:
+    """Check if the video format (by its name) is a HLS/DASH stream manifest."""
+    video_type = BoostyOkVideoType.__members__.get(quality_name)
+    return video_type in ADAPTIVE_VIDEO_TYPES
+
+
+def max_video_height(quality: BoostyOkVideoType) -> int | None:
+    """Frame height of the quality, None if it's not a progressive format."""
+    return _VIDEO_TYPE_HEIGHTS.get(quality)
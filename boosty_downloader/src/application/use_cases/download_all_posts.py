@@ -1,6 +1,10 @@
 """Implements the use case for downloading all posts from a Boosty author, applying filters and caching as needed."""
 
 import asyncio
+import uuid
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass
 from pathlib import Path
 
 from boosty_downloader.src.application.di.download_context import DownloadContext
@@ -12,9 +16,13 @@ from boosty_downloader.src.application.use_cases.download_single_post import (
     DownloadSinglePostUseCase,
 )
 from boosty_downloader.src.infrastructure.boosty_api.core.client import BoostyAPIClient
+from boosty_downloader.src.infrastructure.boosty_api.models.post.post import PostDTO
 from boosty_downloader.src.infrastructure.path_sanitizer import (
     sanitize_string,
 )
+from boosty_downloader.src.infrastructure.post_caching.pagination_checkpoint import (
+    PaginationCheckpoint,
+)
 
 #Long dirname fix START
 import sys
@@ -37,6 +45,32 @@ def utf8len(s):
 #Long dirname fix END
 
 
+# Saving the checkpoint commits the post cache, so it's done once per several pages
+# (~20 posts, as many as the post cache groups into a single commit) and when the run stops.
+_CHECKPOINT_EVERY_PAGES = 4
+
+
+@dataclass
+class _PageProgress:
+    """Tracks how many posts of a single page are still being processed by the workers."""
+
+    number: int
+    task_id: uuid.UUID
+    remaining: int
+    next_offset: str  # Extra.offset of the page, pagination continues from it
+    completed: bool = False
+    skipped_posts: int = 0  # Failed all the attempts
+
+
+@dataclass
+class _PostJob:
+    """Single unit of work for the post workers pool."""
+
+    post_dto: PostDTO
+    full_post_title: str
+    page: _PageProgress
+
+
 class DownloadAllPostUseCase:
     """
     Use case for downloading all user's posts.
@@ -45,108 +79,298 @@ class DownloadAllPostUseCase:
     Initialize the use case and call its methods to perform the download operation.
 
     All the downloaded content parts will be saved under the specified destination path.
+
+    Posts are fed from the pages iterator into a bounded pool of `post_concurrency` workers,
+    so several posts can be downloaded at the same time (1 means strictly sequential processing).
+
+    If `stop_after_cached_posts` is set, paging stops once that many posts in a row
+    (newest first) are already cached and up-to-date (incremental sync).
+
+    If `checkpoint` is set (full runs only), offset of the last completed page is saved there,
+    so an interrupted run can be continued with `resume=True`.
+    Pages with skipped posts are never passed, so the resumed run gets back to them.
+    The checkpoint is removed only when the whole run is completed without skipped posts
+    (never after the incremental stop, e.g. of a resumed incremental run).
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913 (pipeline tuning options)
         self,
         author_name: str,
         boosty_api: BoostyAPIClient,
         destination: Path,
         download_context: DownloadContext,
+        *,
+        post_concurrency: int = 1,
+        prefetch_pages: int = 1,
+        stop_after_cached_posts: int | None = None,
+        checkpoint: PaginationCheckpoint | None = None,
+        resume: bool = False,
+        retry_delay_seconds: float = 1.0,
     ) -> None:
         self.author_name = author_name
 
         self.boosty_api = boosty_api
         self.destination = destination
         self.context = download_context
+        self.post_concurrency = max(1, post_concurrency)
+        self.prefetch_pages = prefetch_pages
+        self.stop_after_cached_posts = stop_after_cached_posts
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.retry_delay_seconds = retry_delay_seconds  # Before the 2nd attempt
+
+        # Pages in the order they were fetched, to save only fully completed prefix of them
+        self._pages_in_order: deque[_PageProgress] = deque()
+        self._last_passed_offset: str | None = None
+        self._unsaved_passed_pages = 0
+        # Incremental stop left older pages unchecked, so the run isn't complete
+        self._stopped_early = False
 
     async def execute(self) -> None:
-        posts_iterator = self.boosty_api.iterate_over_posts(
-            author_name=self.author_name
+        start_offset = None
+        if self.checkpoint is not None and self.resume:
+            start_offset = self.checkpoint.load()
+            if start_offset is not None:
+                self.context.progress_reporter.notice(
+                    'Resuming from the last completed page of the previous run'
+                )
+
+        # Bounded queue keeps the producer at most one "batch" ahead of the workers,
+        # so we don't hold many pages of posts in memory.
+        queue: asyncio.Queue[_PostJob | None] = asyncio.Queue(
+            maxsize=self.post_concurrency
         )
 
-        current_page = 0
+        workers = [
+            asyncio.create_task(self._post_worker(queue))
+            for _ in range(self.post_concurrency)
+        ]
+        producer = asyncio.create_task(
+            self._produce_posts(queue, len(workers), start_offset)
+        )
+        tasks = [producer, *workers]
 
-        async for page in posts_iterator:
-            count = len(page.posts)
-            current_page += 1
+        try:
+            # Returns as soon as any task fails (e.g. cancelled by user),
+            # otherwise waits for the whole pipeline to finish.
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            results = await self._shutdown(tasks)
+            # Don't lose the grouped cache commits of already finished posts
+            self.context.post_cache.flush()
+            self._save_checkpoint(force=True)
+            # Keep the same semantics as a sequential run:
+            # interruption during a post download surfaces as ApplicationCancelledError.
+            for result in results:
+                if isinstance(result, ApplicationCancelledError):
+                    raise result from None
+            raise
 
-            page_task_id = self.context.progress_reporter.create_task(
-                f'Got new posts: [{count}]',
-                total=count,
-                indent_level=0,  # Each page prints without indentation
-            )
+        await self._shutdown(tasks)
+        failed = any(not task.cancelled() and task.exception() for task in done)
+        if self.checkpoint is not None:
+            if failed or self._pages_in_order or self._stopped_early:
+                # Stopped early or some posts were skipped, resume from the last passed page
+                self._save_checkpoint(force=True)
+            else:
+                self.context.post_cache.flush()
+                self.checkpoint.clear()
 
-            for post_dto in page.posts:
-                if not post_dto.has_access:
-                    self.context.progress_reporter.warn(
-                        f'Skip post ([red]no access to content[/red]): {post_dto.title}'
-                    )
-                    continue
+        for task in done:
+            task.result()  # re-raise the first failure if any
 
-                # For empty titles use post ID as a fallback (first 8 chars)
-                if len(post_dto.title) == 0:
-                    post_dto.title = f'Not title (id_{post_dto.id[:8]})'
+    async def _shutdown(self, tasks: list[asyncio.Task[None]]) -> list[object]:
+        for task in tasks:
+            task.cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
 
-                post_dto.title = (
-                    sanitize_string(post_dto.title).replace('.', '').strip()
-                )
-                
-                #Long dirname fix START
-                #'5bd54c48-f79e-4e09-aa09-47f8ba83afec':
-                human_filename = post_dto.title
-                char_count = utf8len(human_filename);
-                #2025-11-13 - НОВИНКА!! Русификатор Decktamer [128] Карточная стратегия, симулятор рогалик-головоломка (c1900ad3)
-                #255-(13+11) = 231
-                if char_count > 231 :
-                    short_txt = '';
-                    for c in human_filename :
-                        c_utf8len = utf8len(short_txt + c)
-                        if c_utf8len <= 231 :
-                            short_txt = short_txt + c;
-                    human_filename = short_txt
-                #Long dirname fix END
-
-
-                # date - TITLE (UUID_PART) for deduplication in case of same names with different posts
-                full_post_title = f'{post_dto.created_at.date()} - {human_filename} ({post_dto.id[:8]})'
-                        
-                single_post_use_case = DownloadSinglePostUseCase(
-                    destination=self.destination / full_post_title,
-                    post_dto=post_dto,
-                    download_context=self.context,
+    async def _produce_posts(
+        self,
+        queue: asyncio.Queue[_PostJob | None],
+        workers_count: int,
+        start_offset: str | None,
+    ) -> None:
+        # Next pages are fetched in background while the workers process current ones
+        async with aclosing(
+            self.boosty_api.iterate_over_posts(
+                author_name=self.author_name,
+                prefetch_pages=self.prefetch_pages,
+                start_offset=start_offset,
+            )
+        ) as posts_iterator:
+            current_page = 0
+            cached_in_row = 0
+
+            async for page in posts_iterator:
+                count = len(page.posts)
+                current_page += 1
+
+                page_progress = _PageProgress(
+                    number=current_page,
+                    task_id=self.context.progress_reporter.create_task(
+                        f'Got new posts: [{count}]',
+                        total=count,
+                        indent_level=0,  # Each page prints without indentation
+                    ),
+                    remaining=1,  # Hold the page open until all its posts are queued
+                    next_offset=page.extra.offset,
                 )
+                self._pages_in_order.append(page_progress)
 
-                self.context.progress_reporter.update_task(
-                    page_task_id,
-                    advance=1,
-                    description=f'Processing page [bold]{current_page}[/bold]',
+                # One lookup for the whole page, so cached posts never reach the workers
+                missing_parts = self.context.post_cache.get_missing_parts_many(
+                    ((post_dto.id, post_dto.updated_at) for post_dto in page.posts),
+                    required=self.context.filters,
                 )
 
-                max_attempts = 5
-                delay = 1.0
-                for attempt in range(1, max_attempts + 1):
-                    try:
-                        await single_post_use_case.execute()
-                        break
-                    except ApplicationCancelledError:
-                        raise
-                    except ApplicationFailedDownloadError as e:
-                        if attempt == max_attempts:
-                            self.context.progress_reporter.error(
-                                f'Skip post after {attempt} failed attempts: {full_post_title} ({e.message})'
-                            )
-                        else:
-                            self.context.progress_reporter.warn(
-                                f'Attempt {attempt} failed for post: {full_post_title} ({e.message}), RESOURCE: ({e.resource})'
-                            )
-                            self.context.progress_reporter.warn(
-                                f'Retrying in {delay:.1f}s... ({e.message})'
-                            )
-                            await asyncio.sleep(delay)
-                            delay = min(delay * 1.5, 10.0)
-
-            self.context.progress_reporter.complete_task(page_task_id)
-            self.context.progress_reporter.success(
-                f'--- Finished page {current_page} ---'
+                for post_dto in page.posts:
+                    if not post_dto.has_access:
+                        self.context.progress_reporter.warn(
+                            f'Skip post ([red]no access to content[/red]): {post_dto.title}'
+                        )
+                        continue
+
+                    full_post_title = self._build_post_title(post_dto)
+                    if not missing_parts[post_dto.id]:
+                        cached_in_row += 1
+                        self.context.progress_reporter.update_task(
+                            page_progress.task_id, advance=1
+                        )
+                        self.context.progress_reporter.notice(
+                            'SKIP([bold]cached[/bold] and up-to-date): '
+                            + full_post_title
+                        )
+                        continue
+
+                    cached_in_row = 0
+                    page_progress.remaining += 1
+                    await queue.put(
+                        _PostJob(
+                            post_dto=post_dto,
+                            full_post_title=full_post_title,
+                            page=page_progress,
+                        )
+                    )
+
+                self._finish_page_post(page_progress)
+
+                if (
+                    self.stop_after_cached_posts is not None
+                    and cached_in_row >= self.stop_after_cached_posts
+                ):
+                    self.context.progress_reporter.notice(
+                        f'Incremental sync: last {cached_in_row} posts are up-to-date, '
+                        'older posts are not checked.'
+                    )
+                    self._stopped_early = True
+                    break
+
+        # Poison pills to stop the workers
+        for _ in range(workers_count):
+            await queue.put(None)
+
+    def _finish_page_post(self, page: _PageProgress) -> None:
+        page.remaining -= 1
+        if page.remaining > 0:
+            return
+
+        self.context.progress_reporter.complete_task(page.task_id)
+        self.context.progress_reporter.success(f'--- Finished page {page.number} ---')
+
+        page.completed = True
+        self._save_checkpoint()
+
+    def _save_checkpoint(self, *, force: bool = False) -> None:
+        if self.checkpoint is None:
+            return
+
+        # Workers can finish pages out of order,
+        # so only the offset of the last page completed together with all the previous ones is saved.
+        # Page with skipped posts stops it for the rest of the run.
+        while (
+            self._pages_in_order
+            and self._pages_in_order[0].completed
+            and not self._pages_in_order[0].skipped_posts
+        ):
+            self._last_passed_offset = self._pages_in_order.popleft().next_offset
+            self._unsaved_passed_pages += 1
+
+        if self._last_passed_offset is None or self._unsaved_passed_pages == 0:
+            return
+        if not force and self._unsaved_passed_pages < _CHECKPOINT_EVERY_PAGES:
+            return
+
+        # Cache must be persisted first, otherwise resumed run would skip uncached posts
+        self.context.post_cache.flush()
+        self.checkpoint.save(self._last_passed_offset)
+        self._unsaved_passed_pages = 0
+
+    def _build_post_title(self, post_dto: PostDTO) -> str:
+        # For empty titles use post ID as a fallback (first 8 chars)
+        if len(post_dto.title) == 0:
+            post_dto.title = f'Not title (id_{post_dto.id[:8]})'
+
+        post_dto.title = sanitize_string(post_dto.title).replace('.', '').strip()
+
+        #Long dirname fix START
+        #'5bd54c48-f79e-4e09-aa09-47f8ba83afec':
+        human_filename = post_dto.title
+        char_count = utf8len(human_filename);
+        #2025-11-13 - НОВИНКА!! Русификатор Decktamer [128] Карточная стратегия, симулятор рогалик-головоломка (c1900ad3)
+        #255-(13+11) = 231
+        if char_count > 231 :
+            short_txt = '';
+            for c in human_filename :
+                c_utf8len = utf8len(short_txt + c)
+                if c_utf8len <= 231 :
+                    short_txt = short_txt + c;
+            human_filename = short_txt
+        #Long dirname fix END
+
+        # date - TITLE (UUID_PART) for deduplication in case of same names with different posts
+        return f'{post_dto.created_at.date()} - {human_filename} ({post_dto.id[:8]})'
+
+    async def _post_worker(self, queue: asyncio.Queue[_PostJob | None]) -> None:
+        while (job := await queue.get()) is not None:
+            self.context.progress_reporter.update_task(
+                job.page.task_id,
+                advance=1,
+                description=f'Processing page [bold]{job.page.number}[/bold]',
             )
+
+            await self._download_post_with_retries(job)
+            self._finish_page_post(job.page)
+
+    async def _download_post_with_retries(self, job: _PostJob) -> None:
+        # NOTE: post cache is safe to share between workers:
+        # its methods are synchronous, so cache() + commit() of one post
+        # can't interleave with another worker on the same event loop.
+        single_post_use_case = DownloadSinglePostUseCase(
+            destination=self.destination / job.full_post_title,
+            post_dto=job.post_dto,
+            download_context=self.context,
+        )
+
+        max_attempts = 5
+        delay = self.retry_delay_seconds
+        for attempt in range(1, max_attempts + 1):
+            try:
+                await single_post_use_case.execute()
+                break
+            except ApplicationCancelledError:
+                raise
+            except ApplicationFailedDownloadError as e:
+                if attempt == max_attempts:
+                    job.page.skipped_posts += 1
+                    self.context.progress_reporter.error(
+                        f'Skip post after {attempt} failed attempts: {job.full_post_title} ({e.message})'
+                    )
+                else:
+                    self.context.progress_reporter.warn(
+                        f'Attempt {attempt} failed for post: {job.full_post_title} ({e.message}), RESOURCE: ({e.resource})'
+                    )
+                    self.context.progress_reporter.warn(
+                        f'Retrying in {delay:.1f}s... ({e.message})'
+                    )
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 1.5, 10.0)
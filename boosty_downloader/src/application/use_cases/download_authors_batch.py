@@ -0,0 +1,76 @@
+"""Use case for downloading posts of several Boosty authors in a single app context."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import aiohttp
+
+from boosty_downloader.src.infrastructure.boosty_api.core.client import (
+    BoostyAPIError,
+    BoostyAPIUnauthorizedError,
+)
+from boosty_downloader.src.interfaces.console_progress_reporter import ProgressReporter
+
+
+class DownloadAuthorsBatchUseCase:
+    """
+    Downloads posts of several authors concurrently (up to `parallel_authors` at once).
+
+    Authors are expected to share the API client and the download scheduler,
+    so the request rate and the download slots are split between them.
+    Failure of a single author (e.g. unknown username or a network error) doesn't stop the others,
+    bad credentials and cancellation stop the whole batch.
+    """
+
+    def __init__(
+        self,
+        authors: list[str],
+        download_author: Callable[[str], Awaitable[None]],
+        progress_reporter: ProgressReporter,
+        parallel_authors: int = 2,
+    ) -> None:
+        self.authors = list(dict.fromkeys(authors))  # Without duplicates, in order
+        self.download_author = download_author
+        self.progress_reporter = progress_reporter
+        self.parallel_authors = max(1, parallel_authors)
+
+    async def execute(self) -> list[str]:
+        """Download all the authors and return the ones which failed."""
+        failed_authors: list[str] = []
+        if not self.authors:
+            return failed_authors
+
+        slots = asyncio.Semaphore(self.parallel_authors)
+
+        async def run_author(author_name: str) -> None:
+            async with slots:
+                self.progress_reporter.headline_rule()
+                self.progress_reporter.info(f'Author: [bold]{author_name}[/bold]')
+                try:
+                    await self.download_author(author_name)
+                except BoostyAPIUnauthorizedError:
+                    raise
+                except (BoostyAPIError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    failed_authors.append(author_name)
+                    self.progress_reporter.error(
+                        f'Author [bold]{author_name}[/bold] failed '
+                        f'({type(e).__name__}), continue with the others'
+                    )
+                else:
+                    self.progress_reporter.success(
+                        f'Author [bold]{author_name}[/bold] is synced'
+                    )
+
+        tasks = [
+            asyncio.create_task(run_author(author_name)) for author_name in self.authors
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for task in done:
+            task.result()  # re-raise the first failure if any
+        return failed_authors
@@ -4,8 +4,13 @@ Use case for downloading a single post from Boosty.
 It encapsulates the logic required to download a post from a specific author.
 """
 
+import asyncio
 import uuid
 from asyncio import CancelledError
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
+from functools import partial
 from pathlib import Path
 
 from yarl import URL
@@ -25,6 +30,10 @@ from boosty_downloader.src.application.mappers.html_converter import (
     convert_text_to_html,
     convert_video_to_html,
 )
+from boosty_downloader.src.application.ok_video_ranking import (
+    is_adaptive_video_type,
+    max_video_height,
+)
 from boosty_downloader.src.domain.post import (
     Post,
     PostDataAllChunks,
@@ -36,7 +45,12 @@ from boosty_downloader.src.domain.post_data_chunks import (
     PostDataChunkFile,
     PostDataChunkText,
 )
+from boosty_downloader.src.infrastructure.adaptive_streams import (
+    StreamManifestError,
+    download_adaptive_stream,
+)
 from boosty_downloader.src.infrastructure.boosty_api.models.post.post import PostDTO
+from boosty_downloader.src.infrastructure.download_scheduler import DownloadPriority
 from boosty_downloader.src.infrastructure.external_videos_downloader.external_videos_downloader import (
     ExternalVideoDownloadStatus,
     ExtVideoDownloadError,
@@ -45,10 +59,15 @@ from boosty_downloader.src.infrastructure.external_videos_downloader.external_vi
 )
 from boosty_downloader.src.infrastructure.file_downloader import (
     DownloadCancelledError,
+    DownloadedFile,
     DownloadError,
     DownloadFileConfig,
     DownloadingStatus,
-    download_file,
+    download_file_with_info,
+    file_path_with_extension,
+)
+from boosty_downloader.src.infrastructure.host_failover import (
+    download_with_failover,
 )
 from boosty_downloader.src.infrastructure.html_generator import (
     HtmlGenChunk,
@@ -60,6 +79,12 @@ from boosty_downloader.src.infrastructure.html_generator.renderer import (
 from boosty_downloader.src.infrastructure.human_readable_filesize import (
     human_readable_size,
 )
+from boosty_downloader.src.infrastructure.post_caching.post_cache import IndexedPost
+from boosty_downloader.src.infrastructure.post_manifest import (
+    FileIntegrity,
+    PostManifest,
+    check_file,
+)
 
 
 def _form_post_url(username: str, post_id: str) -> str:
@@ -92,6 +117,15 @@ class DownloadSinglePostUseCase:
         self.external_videos_destination = destination / Path('external_videos')
         self.boosty_videos_destination = destination / Path('boosty_videos')
 
+        # Files written for the post, saved next to `post.html` to verify them later
+        self.manifest = PostManifest(
+            post_uuid=post_dto.id,
+            updated_at=post_dto.updated_at,
+            title=post_dto.title,
+            created_at=post_dto.created_at,
+        )
+        self._reuse_intact_files = False
+
     def _should_execute(
         self, post: Post, filters: list[DownloadContentTypeFilter]
     ) -> bool:
@@ -159,6 +193,9 @@ class DownloadSinglePostUseCase:
             return
 
         if not self._should_execute(post, missing_parts):
+            # Nothing to download for these parts, so the post is synced (e.g. for incremental runs)
+            self.context.post_cache.cache(post.uuid, post.updated_at, missing_parts)
+            self.context.post_cache.commit()
             self.context.progress_reporter.notice(
                 'SKIP ([bold]no content[/bold] matching selected filters): '
                 + self.destination.name
@@ -166,18 +203,10 @@ class DownloadSinglePostUseCase:
             return
 
         self.destination.mkdir(parents=True, exist_ok=True)
+        self._load_manifest(post)
         post_task_id = self._start_post_task(post)
         try:
-            post_html: list[HtmlGenChunk] = []
-
-            for chunk in post.post_data_chunks:
-                html_chunk = await self._safely_process_chunk(
-                    chunk, missing_parts, post
-                )
-                if html_chunk:
-                    post_html.append(html_chunk)
-
-                self._update_post_task(post_task_id)
+            post_html = await self._process_chunks(post, missing_parts, post_task_id)
 
             if DownloadContentTypeFilter.post_content in missing_parts:
                 try:
@@ -187,13 +216,34 @@ class DownloadSinglePostUseCase:
                     raise
 
             self.context.post_cache.cache(post.uuid, post.updated_at, missing_parts)
+            if self.context.author_index is not None:
+                self.context.author_index.add(
+                    IndexedPost(
+                        uuid=post.uuid,
+                        title=post.title,
+                        directory=self.destination.name,
+                        created_at=post.created_at,
+                        has_html=self.post_file_path.is_file(),
+                    )
+                )
             self.context.post_cache.commit()
             self.context.progress_reporter.success(
                 f'Finished:  {self.destination.name}'
             )
         finally:
+            # Even for failed posts, so their completed files aren't downloaded again
+            self.manifest.save(self.destination)
             self.context.progress_reporter.complete_task(post_task_id)
 
+    def _load_manifest(self, post: Post) -> None:
+        previous = PostManifest.load(self.destination)
+        if previous is None:
+            return
+
+        # Files of an updated post may have changed, so they are only kept in the manifest
+        self._reuse_intact_files = previous.updated_at == post.updated_at
+        self.manifest.entries = previous.entries
+
     def _start_post_task(self, post: Post) -> uuid.UUID:
         return self.context.progress_reporter.create_task(
             f'[bold]POST: {post.title}[/bold]',
@@ -207,6 +257,70 @@ class DownloadSinglePostUseCase:
             advance=1,
         )
 
+    async def _process_chunks(
+        self,
+        post: Post,
+        missing_parts: list[DownloadContentTypeFilter],
+        post_task_id: uuid.UUID,
+    ) -> list[HtmlGenChunk]:
+        """
+        Process chunks of the post concurrently (up to `chunk_concurrency` at once).
+
+        HTML chunks are returned in the original order of the post.
+        The first failure stops the whole post, the rest of chunks are cancelled.
+        """
+        limiter = asyncio.Semaphore(self.context.chunk_concurrency)
+        # Chunks saved under the same name must not write the same file simultaneously
+        resource_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        async def process(chunk: PostDataAllChunks) -> HtmlGenChunk | None:
+            key = self._chunk_resource_key(chunk)
+            lock: AbstractAsyncContextManager[object] = (
+                resource_locks[key] if key else nullcontext()
+            )
+            async with lock, limiter:
+                html_chunk = await self._safely_process_chunk(
+                    chunk, missing_parts, post
+                )
+            self._update_post_task(post_task_id)
+            return html_chunk
+
+        tasks = [asyncio.create_task(process(chunk)) for chunk in post.post_data_chunks]
+        if not tasks:
+            return []
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except CancelledError as e:
+            await self._cancel_chunk_tasks(tasks)
+            raise ApplicationCancelledError(post_uuid=post.uuid) from e
+
+        # Cancelled chunks clean up their partial files in `_safely_process_chunk`
+        await self._cancel_chunk_tasks(tasks)
+        for task in tasks:
+            if task in done and not task.cancelled() and (error := task.exception()):
+                raise error
+
+        return [html for task in tasks if (html := task.result()) is not None]
+
+    async def _cancel_chunk_tasks(
+        self, tasks: list[asyncio.Task[HtmlGenChunk | None]]
+    ) -> None:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _chunk_resource_key(self, chunk: PostDataAllChunks) -> str | None:
+        if isinstance(chunk, PostDataChunkImage):
+            return f'images/{URL(chunk.url).name}'
+        if isinstance(chunk, PostDataChunkFile):
+            return f'files/{chunk.filename}'
+        if isinstance(chunk, PostDataChunkBoostyVideo):
+            return f'boosty_videos/{chunk.title}'
+        if isinstance(chunk, PostDataChunkExternalVideo):
+            return f'external_videos/{chunk.url}'
+        return None
+
     async def _safely_process_chunk(
         self,
         chunk: PostDataAllChunks,
@@ -223,7 +337,7 @@ class DownloadSinglePostUseCase:
             return await self._process_chunk(chunk, missing_parts)
         # KeyboardInterrupt while downloading file
         except DownloadCancelledError as e:
-            if e.file:
+            if e.file and not e.resumable:
                 e.file.unlink(missing_ok=True)
             raise ApplicationCancelledError(post_uuid=post.uuid) from e
         # KeyboardInterrupt while downloading external video
@@ -234,7 +348,8 @@ class DownloadSinglePostUseCase:
             raise ApplicationCancelledError(post_uuid=post.uuid) from e
         # Error while downloading file (e.g. boosty video / files / images)
         except DownloadError as e:
-            if e.file:
+            # Resumable partial files are kept, so the next attempt continues them
+            if e.file and not e.resumable:
                 e.file.unlink(missing_ok=True)
             await self.context.failed_logger.add_error(
                 f'{_form_post_url(username=self.context.author_name, post_id=post.uuid)} - {e.resource_url}',
@@ -245,6 +360,20 @@ class DownloadSinglePostUseCase:
                 message=f"Couldn't download resource: {e.message}",
                 resource=e.file.name if e.file else 'Unknown name',
             ) from e
+        # Stream of boosty video which can't be downloaded (e.g. live or encrypted one)
+        except StreamManifestError as e:
+            video_url = (
+                chunk.url if isinstance(chunk, PostDataChunkBoostyVideo) else 'Unknown'
+            )
+            await self.context.failed_logger.add_error(
+                f'{_form_post_url(username=self.context.author_name, post_id=post.uuid)} - {video_url}',
+                f'Video stream is not supported: {e}',
+            )
+            raise ApplicationFailedDownloadError(
+                post_uuid=post.uuid,
+                message=f'Video stream is not supported: {e}',
+                resource=video_url,
+            ) from e
         # Error while downloading external video
         except ExtVideoInfoError as e:
             await self.context.failed_logger.add_error(
@@ -313,6 +442,83 @@ class DownloadSinglePostUseCase:
     # --------------------------------------------------------------------------
     # Helper downloading methods
 
+    async def _find_intact_file(self, dl_config: DownloadFileConfig) -> Path | None:
+        """
+        Find the file left by the previous run of the same post version (e.g. after `--verify`).
+
+        The file is hashed again, its neighbours in the post part may have been damaged.
+        """
+        if not self._reuse_intact_files:
+            return None
+
+        for entry in self.manifest.entries.values():
+            candidate = file_path_with_extension(dl_config, Path(entry.path).suffix)
+            if self.manifest.find_intact(self.destination, candidate) is not entry:
+                continue
+            integrity = await asyncio.to_thread(check_file, self.destination, entry)
+            return candidate if integrity is FileIntegrity.ok else None
+        return None
+
+    async def _download_recorded(
+        self,
+        dl_config: DownloadFileConfig,
+        priority: DownloadPriority,
+        store_key: str | None = None,
+        download: Callable[[], Awaitable[DownloadedFile]] | None = None,
+    ) -> Path:
+        """
+        Download the file and record its size/hash in the post manifest.
+
+        Intact files from the previous run aren't downloaded again,
+        repeated content is taken from the content store (if enabled and `store_key` is given).
+        `download` replaces the plain file download (e.g. for failover hosts),
+        it takes the scheduler slots itself.
+        """
+        intact_file = await self._find_intact_file(dl_config)
+        if intact_file is not None:
+            return intact_file
+
+        store = self.context.content_store if store_key is not None else None
+        if store is not None and store_key is not None:
+            stored = store.find(store_key)
+            if stored is not None:
+                file_path = store.link_to(
+                    stored, file_path_with_extension(dl_config, stored.suffix)
+                )
+                self.manifest.add(
+                    self.destination,
+                    file_path,
+                    url=dl_config.url,
+                    size=file_path.stat().st_size,
+                    sha256=stored.sha256,
+                )
+                return file_path
+
+        # Hash is computed from the chunks while they are written, without reading the file back
+        dl_config.compute_sha256 = True
+        if download is None:
+            downloaded = await self.context.download_scheduler.submit(
+                dl_config.url,
+                priority,
+                lambda: download_file_with_info(dl_config),
+                owner=self.context.author_name,
+                connections=dl_config.segments,
+            )
+        else:
+            downloaded = await download()
+        if store is not None and store_key is not None and downloaded.sha256:
+            store.add(store_key, downloaded.path, downloaded.sha256)
+
+        self.manifest.add(
+            self.destination,
+            downloaded.path,
+            url=dl_config.url,
+            size=downloaded.size,
+            sha256=downloaded.sha256,
+            etag=downloaded.etag,
+        )
+        return downloaded.path
+
     async def download_boosty_video(
         self,
         boosty_video: PostDataChunkBoostyVideo,
@@ -343,10 +549,48 @@ class DownloadSinglePostUseCase:
             guess_extension=True,
             destination=self.boosty_videos_destination,
             on_status_update=update_progress,
+            resume=True,
+            segments=self.context.download_segments,
         )
 
+        download_from_host: Callable[[DownloadFileConfig], Awaitable[DownloadedFile]]
+        download_from_host = download_file_with_info
+        connections = dl_config.segments
+        if is_adaptive_video_type(boosty_video.quality):
+            # HLS/DASH manifest, segments are fetched and joined into a single file
+            download_from_host = partial(
+                download_adaptive_stream,
+                parallel_segments=self.context.stream_segment_concurrency,
+                max_height=max_video_height(self.context.preferred_video_quality),
+            )
+            connections = self.context.stream_segment_concurrency
+
+        def report_failover(error: DownloadError, failover_url: str) -> None:
+            self.context.progress_reporter.warn(
+                f'Boosty video ({error.message}), switching to the failover host: '
+                f'{URL(failover_url).host} - {boosty_video.title}'
+            )
+
         try:
-            downloaded_file_path = await download_file(dl_config)
+            downloaded_file_path = await self._download_recorded(
+                dl_config,
+                DownloadPriority.videos,
+                download=partial(
+                    download_with_failover,
+                    dl_config,
+                    [boosty_video.failover_url] if boosty_video.failover_url else [],
+                    download=download_from_host,
+                    throughput_floor=self.context.video_throughput_floor,
+                    on_failover=report_failover,
+                    # Every host takes its own slots, for all the connections of the video
+                    host_slot=partial(
+                        self.context.download_scheduler.slot,
+                        priority=DownloadPriority.videos,
+                        owner=self.context.author_name,
+                        connections=connections,
+                    ),
+                ),
+            )
         finally:
             self.context.progress_reporter.complete_task(download_task_id)
 
@@ -374,16 +618,28 @@ class DownloadSinglePostUseCase:
             )
 
         try:
-            downloaded_file_path = (
-                self.context.external_videos_downloader.download_video(
+            downloaded_file_path = await self.context.download_scheduler.submit(
+                external_video.url,
+                DownloadPriority.videos,
+                lambda: self.context.external_videos_downloader.download_video_async(
                     url=external_video.url,
                     destination_directory=self.external_videos_destination,
                     progress_hook=update_progress,
-                )
+                ),
+                owner=self.context.author_name,
             )
         finally:
             self.context.progress_reporter.complete_task(download_video_task_id)
 
+        # yt-dlp writes the file itself, so only its size is recorded (no extra read pass)
+        if downloaded_file_path.is_file():
+            self.manifest.add(
+                self.destination,
+                downloaded_file_path,
+                url=external_video.url,
+                size=downloaded_file_path.stat().st_size,
+                sha256=None,
+            )
         return downloaded_file_path.relative_to(self.external_videos_destination.parent)
 
     async def download_files(self, file: PostDataChunkFile) -> Path:
@@ -413,10 +669,17 @@ class DownloadSinglePostUseCase:
             guess_extension=True,
             destination=self.files_destination,
             on_status_update=update_progress,
+            resume=True,
+            segments=self.context.download_segments,
         )
 
         try:
-            downloaded_file_path = await download_file(dl_config)
+            # Signed query of file urls changes between requests, so it's not a part of the key
+            downloaded_file_path = await self._download_recorded(
+                dl_config,
+                DownloadPriority.files,
+                store_key=str(URL(file.url).with_query(None)),
+            )
         finally:
             self.context.progress_reporter.complete_task(download_task_id)
 
@@ -451,7 +714,11 @@ class DownloadSinglePostUseCase:
         )
 
         try:
-            downloaded_file_path = await download_file(dl_config)
+            downloaded_file_path = await self._download_recorded(
+                dl_config,
+                DownloadPriority.post_content,
+                store_key=image.url,
+            )
         finally:
             self.context.progress_reporter.complete_task(download_task_id)
 
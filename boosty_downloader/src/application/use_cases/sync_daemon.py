@@ -0,0 +1,114 @@
+"""Use case for keeping downloads of Boosty authors in sync by polling them on a schedule."""
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import aiohttp
+
+from boosty_downloader.src.infrastructure.boosty_api.core.client import (
+    BoostyAPIError,
+    BoostyAPIUnauthorizedError,
+)
+from boosty_downloader.src.interfaces.console_progress_reporter import ProgressReporter
+
+
+@dataclass
+class PollSchedule:
+    """How often authors are polled and how polling slows down on errors."""
+
+    interval_seconds: float
+    error_backoff_seconds: float = 60.0  # Doubled after every failed poll in a row
+    max_backoff_seconds: float = 3600.0
+
+    def next_delay(self, failures: int) -> float:
+        """Return the delay before the next poll after `failures` failed polls in a row."""
+        if failures == 0:
+            return self.interval_seconds
+        return min(
+            self.error_backoff_seconds * 2 ** (failures - 1),
+            self.max_backoff_seconds,
+        )
+
+
+class SyncDaemonUseCase:
+    """
+    Polls every author on the schedule until the stop is requested.
+
+    Each author is polled by its own loop (up to `parallel_authors` polls at once),
+    API and network errors postpone the next poll of the author with exponential backoff.
+    Stop is graceful: sleeping authors quit at once, running polls are finished first.
+    Bad credentials stop the daemon, they won't fix themselves.
+    """
+
+    def __init__(
+        self,
+        authors: list[str],
+        poll_author: Callable[[str], Awaitable[None]],
+        progress_reporter: ProgressReporter,
+        schedule: PollSchedule,
+        parallel_authors: int = 1,
+    ) -> None:
+        self.authors = list(dict.fromkeys(authors))  # Without duplicates, in order
+        self.poll_author = poll_author
+        self.progress_reporter = progress_reporter
+        self.schedule = schedule
+        self.parallel_authors = max(1, parallel_authors)
+
+        self._stop = asyncio.Event()
+
+    def request_stop(self) -> None:
+        """Stop polling once the running polls are finished."""
+        self._stop.set()
+
+    async def _sleep(self, seconds: float) -> None:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+
+    async def _poll(self, author_name: str) -> bool:
+        """Poll the author once and tell whether it went fine."""
+        try:
+            await self.poll_author(author_name)
+        except BoostyAPIUnauthorizedError:
+            raise
+        except (BoostyAPIError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.progress_reporter.error(
+                f'Polling [bold]{author_name}[/bold] failed ({type(e).__name__})'
+            )
+            return False
+        return True
+
+    async def _run_author(self, author_name: str, slots: asyncio.Semaphore) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            async with slots:
+                if self._stop.is_set():
+                    break
+                failures = 0 if await self._poll(author_name) else failures + 1
+
+            delay = self.schedule.next_delay(failures)
+            self.progress_reporter.info(
+                f'Next poll of [bold]{author_name}[/bold] in {delay / 60:.1f} min'
+            )
+            await self._sleep(delay)
+
+    async def execute(self) -> None:
+        """Poll the authors until `request_stop` is called."""
+        if not self.authors:
+            return
+
+        slots = asyncio.Semaphore(self.parallel_authors)
+        tasks = [
+            asyncio.create_task(self._run_author(author_name, slots))
+            for author_name in self.authors
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for task in done:
+            task.result()  # re-raise the first failure if any
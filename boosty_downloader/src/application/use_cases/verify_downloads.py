@@ -0,0 +1,125 @@
+"""
+Use case for verifying downloaded files against the per-post manifests.
+
+Damaged and missing files are removed and their post parts are marked as not downloaded,
+so the following sync downloads only them again.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from boosty_downloader.src.application.filtering import DownloadContentTypeFilter
+from boosty_downloader.src.infrastructure.content_store import ContentStore
+from boosty_downloader.src.infrastructure.post_caching.post_cache import SQLitePostCache
+from boosty_downloader.src.infrastructure.post_manifest import (
+    MANIFEST_FILENAME,
+    FileIntegrity,
+    ManifestEntry,
+    PostManifest,
+    check_file,
+)
+from boosty_downloader.src.interfaces.console_progress_reporter import ProgressReporter
+
+# Top level directory of a post file -> part of the post it belongs to
+_PART_BY_DIRECTORY = {
+    'images': DownloadContentTypeFilter.post_content,
+    'files': DownloadContentTypeFilter.files,
+    'boosty_videos': DownloadContentTypeFilter.boosty_videos,
+    'external_videos': DownloadContentTypeFilter.external_videos,
+}
+
+
+@dataclass
+class VerificationReport:
+    """Results of the verification, paths are relative to the author directory."""
+
+    checked: int = 0
+    damaged: list[str] = field(default_factory=list[str])
+    missing: list[str] = field(default_factory=list[str])
+
+
+class VerifyDownloadsUseCase:
+    """
+    Check all the files of the author directory against their manifests.
+
+    Files are hashed in parallel (in threads, up to `concurrency` at once),
+    only posts with damaged/missing files are queued for the re-download.
+    """
+
+    def __init__(
+        self,
+        destination: Path,
+        post_cache: SQLitePostCache,
+        progress_reporter: ProgressReporter,
+        content_store: ContentStore | None = None,
+        concurrency: int = 4,
+    ) -> None:
+        self.destination = destination
+        self.post_cache = post_cache
+        self.progress_reporter = progress_reporter
+        self.content_store = content_store
+        self.concurrency = max(1, concurrency)
+
+    async def execute(self) -> VerificationReport:
+        manifests = [
+            (manifest_file.parent, manifest)
+            for manifest_file in sorted(self.destination.glob(f'*/{MANIFEST_FILENAME}'))
+            if (manifest := PostManifest.load(manifest_file.parent)) is not None
+        ]
+        jobs = [
+            (post_directory, manifest, entry)
+            for post_directory, manifest in manifests
+            for entry in manifest.entries.values()
+        ]
+
+        report = VerificationReport()
+        task_id = self.progress_reporter.create_task(
+            '[bold]Verifying downloaded files[/bold]', total=len(jobs)
+        )
+        limiter = asyncio.Semaphore(self.concurrency)
+
+        async def verify(
+            post_directory: Path, manifest: PostManifest, entry: ManifestEntry
+        ) -> None:
+            async with limiter:
+                integrity = await asyncio.to_thread(check_file, post_directory, entry)
+            report.checked += 1
+            if integrity is not FileIntegrity.ok:
+                self._queue_for_redownload(
+                    post_directory, manifest, entry, integrity, report
+                )
+            self.progress_reporter.update_task(task_id, advance=1)
+
+        try:
+            await asyncio.gather(*(verify(*job) for job in jobs))
+        finally:
+            self.progress_reporter.complete_task(task_id)
+
+        self.post_cache.flush()
+        return report
+
+    def _queue_for_redownload(
+        self,
+        post_directory: Path,
+        manifest: PostManifest,
+        entry: ManifestEntry,
+        integrity: FileIntegrity,
+        report: VerificationReport,
+    ) -> None:
+        file_path = post_directory / entry.path
+        relative_path = file_path.relative_to(self.destination).as_posix()
+        if integrity is FileIntegrity.missing:
+            report.missing.append(relative_path)
+        else:
+            report.damaged.append(relative_path)
+            # Linked file shares its content with the store, so the stored object is broken too
+            if self.content_store is not None and entry.sha256 is not None:
+                self.content_store.discard(entry.sha256)
+
+        # Don't leave a broken file (or a link to the store) to be written through
+        file_path.unlink(missing_ok=True)
+
+        part = _PART_BY_DIRECTORY.get(Path(entry.path).parts[0])
+        if part is not None:
+            self.post_cache.forget_parts(manifest.post_uuid, [part])
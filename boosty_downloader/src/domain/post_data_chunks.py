@@ -63,6 +63,8 @@ class PostDataChunkBoostyVideo:
     title: str
     url: str
     quality: str
+    # Same video on the failover host of the CDN (if Boosty provides it)
+    failover_url: str | None = None
 
 
 @dataclass
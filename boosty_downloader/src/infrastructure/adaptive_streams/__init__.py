@@ -0,0 +1,10 @@
+"""Download of adaptive (HLS/DASH) video streams into a single file."""
+
+from .downloader import StreamRemuxError, download_adaptive_stream
+from .manifests import StreamManifestError
+
+__all__ = [
+    'StreamManifestError',
+    'StreamRemuxError',
+    'download_adaptive_stream',
+]
@@ -0,0 +1,337 @@
+"""
+Downloader of adaptive streams (HLS/DASH) into a single media file.
+
+Segments are fetched concurrently, but at most `parallel_segments` of them at once
+and they are written in order as soon as the oldest one is ready,
+so memory use is bounded by a few segments whatever the video length is.
+
+If a segment of a rendition fails, the whole download falls back to the next rendition
+(segments of different qualities can't be mixed in a single file).
+
+MPEG-TS or fMP4 segments of a single track are just concatenated, which is a playable file.
+Separate audio/video tracks (and TS to MP4 conversion) are remuxed by ffmpeg,
+so renditions which need it are skipped if ffmpeg isn't installed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import http
+import shutil
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import aiofiles
+
+from boosty_downloader.src.infrastructure.adaptive_streams.manifests import (
+    StreamManifestError,
+    StreamRendition,
+    StreamSegment,
+    StreamTrack,
+    is_dash,
+    is_hls,
+    parse_dash,
+    parse_hls_master,
+    parse_hls_media,
+)
+from boosty_downloader.src.infrastructure.file_downloader import (
+    PARTIAL_FILE_SUFFIX,
+    DownloadCancelledError,
+    DownloadedFile,
+    DownloadError,
+    DownloadFileConfig,
+    DownloadIncompleteError,
+    DownloadingStatus,
+    DownloadUnexpectedStatusError,
+    file_path_with_extension,
+    translate_download_errors,
+)
+from boosty_downloader.src.infrastructure.path_sanitizer import sanitize_string
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from aiohttp_retry import RetryClient
+
+
+class StreamRemuxError(DownloadError):
+    """Exception raised when ffmpeg failed to remux the downloaded tracks"""
+
+    def __init__(self, resource_url: str, details: str) -> None:
+        super().__init__(f'Failed to remux the stream: {details}', None, resource_url)
+
+
+@dataclass
+class _StreamProgress:
+    """Shared progress of all the tracks of a single stream."""
+
+    filename: str
+    total_downloaded: int = 0
+
+
+def order_renditions(
+    renditions: list[StreamRendition], max_height: int | None
+) -> list[StreamRendition]:
+    """
+    Order renditions to try them one by one.
+
+    The best ones not higher than `max_height` go first, then the rest from the lowest one.
+    """
+    fitting = [
+        rendition
+        for rendition in renditions
+        if max_height is None
+        or rendition.height is None
+        or rendition.height <= max_height
+    ]
+    too_high = [rendition for rendition in renditions if rendition not in fitting]
+    return sorted(fitting, key=lambda r: r.bandwidth, reverse=True) + sorted(
+        too_high, key=lambda r: r.bandwidth
+    )
+
+
+def _needs_remux(rendition: StreamRendition) -> bool:
+    return len(rendition.tracks) > 1 or rendition.audio_playlist_url is not None
+
+
+async def _fetch_text(session: RetryClient, url: str) -> tuple[str, str]:
+    """Return the manifest and its final url (after redirects) to resolve relative urls."""
+    async with session.get(url) as response:
+        if response.status != http.HTTPStatus.OK:
+            raise DownloadUnexpectedStatusError(
+                resource_url=url,
+                status=response.status,
+                response_message=response.reason or 'No reason provided',
+            )
+        # Not a text at all (e.g. a plain video) is reported as unknown manifest format
+        return await response.text(errors='replace'), str(response.url)
+
+
+async def _fetch_segment(session: RetryClient, segment: StreamSegment) -> bytes:
+    headers: dict[str, str] = {}
+    if segment.byte_range is not None:
+        start, end = segment.byte_range
+        headers['Range'] = f'bytes={start}-{end}'
+
+    # Byte range segments are parts of a bigger file, the whole file (200) isn't the segment
+    expected_status = (
+        http.HTTPStatus.OK
+        if segment.byte_range is None
+        else http.HTTPStatus.PARTIAL_CONTENT
+    )
+    async with session.get(segment.url, headers=headers) as response:
+        if response.status != expected_status:
+            raise DownloadUnexpectedStatusError(
+                resource_url=segment.url,
+                status=response.status,
+                response_message=response.reason or 'No reason provided',
+            )
+        data = await response.read()
+
+    if segment.byte_range is not None:
+        start, end = segment.byte_range
+        if len(data) != end - start + 1:
+            raise DownloadIncompleteError(
+                segment.url, None, received=len(data), expected=end - start + 1
+            )
+    return data
+
+
+async def _load_renditions(
+    dl_config: DownloadFileConfig,
+) -> list[StreamRendition]:
+    with translate_download_errors(dl_config, dl_config.destination, resumable=False):
+        manifest, manifest_url = await _fetch_text(dl_config.session, dl_config.url)
+
+    if is_hls(manifest):
+        renditions = parse_hls_master(manifest, manifest_url)
+        if renditions:
+            return renditions
+        # It's a media playlist already, the only rendition
+        return [
+            StreamRendition(
+                bandwidth=0,
+                height=None,
+                tracks=[parse_hls_media(manifest, manifest_url)],
+            )
+        ]
+    if is_dash(manifest):
+        return parse_dash(manifest, manifest_url)
+
+    msg = 'Unknown stream manifest format'
+    raise StreamManifestError(msg)
+
+
+async def _resolve_tracks(
+    dl_config: DownloadFileConfig, rendition: StreamRendition
+) -> list[StreamTrack]:
+    """Load HLS media playlists of the rendition (DASH ones are already known)."""
+    playlist_urls = [
+        url for url in (rendition.playlist_url, rendition.audio_playlist_url) if url
+    ]
+    tracks = list(rendition.tracks)
+    with translate_download_errors(dl_config, dl_config.destination, resumable=False):
+        for url in playlist_urls:
+            playlist, playlist_url = await _fetch_text(dl_config.session, url)
+            tracks.append(parse_hls_media(playlist, playlist_url))
+    return tracks
+
+
+async def _download_track(  # noqa: PLR0913 (track download needs the whole context)
+    dl_config: DownloadFileConfig,
+    track: StreamTrack,
+    write_path: Path,
+    progress: _StreamProgress,
+    *,
+    parallel_segments: int,
+    update_digest: Callable[[bytes], None] | None,
+) -> None:
+    """Fetch segments with a bounded window of concurrent requests and write them in order."""
+    pending: deque[asyncio.Task[bytes]] = deque()
+
+    async def write_oldest() -> None:
+        data = await pending.popleft()
+        await file.write(data)
+        if update_digest is not None:
+            update_digest(data)
+        progress.total_downloaded += len(data)
+        dl_config.on_status_update(
+            DownloadingStatus(
+                name=progress.filename,
+                total_bytes=None,  # Sizes of segments aren't known in advance
+                total_downloaded_bytes=progress.total_downloaded,
+                downloaded_bytes=len(data),
+            )
+        )
+
+    async with aiofiles.open(write_path, mode='wb') as file:
+        try:
+            with translate_download_errors(dl_config, write_path, resumable=False):
+                for segment in track.segments:
+                    pending.append(
+                        asyncio.create_task(_fetch_segment(dl_config.session, segment))
+                    )
+                    if len(pending) >= parallel_segments:
+                        await write_oldest()
+                while pending:
+                    await write_oldest()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _remux(
+    dl_config: DownloadFileConfig, inputs: list[Path], output: Path
+) -> None:
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise StreamRemuxError(dl_config.url, 'ffmpeg is not installed')
+
+    args = [ffmpeg, '-y', '-loglevel', 'error']
+    for input_path in inputs:
+        args += ['-i', str(input_path)]
+    if len(inputs) > 1:
+        args += ['-map', '0:v:0', '-map', '1:a:0']
+    args += ['-c', 'copy', str(output)]
+
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise StreamRemuxError(
+            dl_config.url, stderr.decode(errors='replace').strip()[-500:]
+        )
+
+
+async def _download_rendition(
+    dl_config: DownloadFileConfig,
+    rendition: StreamRendition,
+    *,
+    parallel_segments: int,
+) -> DownloadedFile:
+    tracks = await _resolve_tracks(dl_config, rendition)
+    filename = sanitize_string(dl_config.filename)
+    progress = _StreamProgress(filename=filename)
+    ffmpeg_available = shutil.which('ffmpeg') is not None
+
+    # Single track is the final file as is, unless TS can be converted to MP4
+    remux = len(tracks) > 1 or (ffmpeg_available and tracks[0].extension == '.ts')
+    # Remuxed file is written by ffmpeg, so it isn't hashed rather than read back
+    sha256 = hashlib.sha256() if dl_config.compute_sha256 and not remux else None
+
+    part_paths = [
+        dl_config.destination
+        / f'{filename}.track{index}{track.extension}{PARTIAL_FILE_SUFFIX}'
+        for index, track in enumerate(tracks)
+    ]
+    try:
+        for track, part_path in zip(tracks, part_paths, strict=True):
+            await _download_track(
+                dl_config,
+                track,
+                part_path,
+                progress,
+                parallel_segments=parallel_segments,
+                update_digest=sha256.update if sha256 else None,
+            )
+
+        if remux:
+            file_path = file_path_with_extension(dl_config, '.mp4')
+            try:
+                await _remux(dl_config, part_paths, file_path)
+            except StreamRemuxError:
+                file_path.unlink(missing_ok=True)
+                raise
+        else:
+            file_path = file_path_with_extension(dl_config, tracks[0].extension)
+            part_paths[0].replace(file_path)
+    finally:
+        for part_path in part_paths:
+            part_path.unlink(missing_ok=True)
+
+    return DownloadedFile(
+        path=file_path,
+        size=file_path.stat().st_size,
+        sha256=sha256.hexdigest() if sha256 else None,
+    )
+
+
+async def download_adaptive_stream(
+    dl_config: DownloadFileConfig,
+    *,
+    parallel_segments: int = 4,
+    max_height: int | None = None,
+) -> DownloadedFile:
+    """
+    Download HLS/DASH stream from `dl_config.url` (manifest) into a single file.
+
+    Renditions are tried from the best one not higher than `max_height`,
+    the next one is tried if any segment (or remuxing) of the current one fails.
+    """
+    renditions = order_renditions(await _load_renditions(dl_config), max_height)
+    if shutil.which('ffmpeg') is None:
+        renditions = [r for r in renditions if not _needs_remux(r)]
+    if not renditions:
+        msg = 'No renditions which can be downloaded (separate audio needs ffmpeg)'
+        raise StreamManifestError(msg)
+
+    errors: list[DownloadError | StreamManifestError] = []
+    for rendition in renditions:
+        try:
+            return await _download_rendition(
+                dl_config, rendition, parallel_segments=parallel_segments
+            )
+        except (DownloadError, StreamManifestError) as e:  # noqa: PERF203 (fallback to the next rendition)
+            if isinstance(e, DownloadCancelledError):
+                raise
+            errors.append(e)
+
+    # Every rendition failed, the last error is the most relevant one
+    raise errors[-1]
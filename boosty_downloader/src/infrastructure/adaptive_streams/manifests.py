@@ -0,0 +1,389 @@
+"""
+Parsers of adaptive streaming manifests (HLS playlists and DASH MPD).
+
+They only turn manifests into renditions with absolute segment URLs,
+nothing is downloaded here. Supported subset is what video CDNs serve for VOD:
+
+- HLS: master playlists with variants, media playlists with MPEG-TS or fMP4 (`EXT-X-MAP`)
+  segments and byte ranges. Encrypted playlists are rejected.
+- DASH: the first period, `SegmentTemplate` (numbers or `SegmentTimeline`),
+  `SegmentList` and single-file representations (`BaseURL` only).
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
+
+
+class StreamManifestError(Exception):
+    """Manifest can't be parsed or uses features which aren't supported."""
+
+
+@dataclass
+class StreamSegment:
+    """Piece of the stream, `byte_range` is inclusive (as in the Range header)."""
+
+    url: str
+    byte_range: tuple[int, int] | None = None
+
+
+@dataclass
+class StreamTrack:
+    """Sequence of segments which are concatenated into a single media file."""
+
+    segments: list[StreamSegment]
+    extension: str  # Of the concatenated file, e.g. '.ts' or '.mp4'
+
+
+@dataclass
+class StreamRendition:
+    """
+    One quality of the stream.
+
+    Either `tracks` are known (DASH, HLS media playlist) or `playlist_url`
+    of HLS media playlist must be loaded first.
+    """
+
+    bandwidth: int
+    height: int | None
+    tracks: list[StreamTrack] = field(default_factory=list[StreamTrack])
+    playlist_url: str | None = None
+    audio_playlist_url: str | None = None  # Separate HLS audio, needs remuxing
+
+
+def is_hls(manifest: str) -> bool:
+    """Check if the manifest is an HLS playlist."""
+    return manifest.lstrip('\ufeff').startswith('#EXTM3U')
+
+
+def is_dash(manifest: str) -> bool:
+    """Check if the manifest is a DASH MPD."""
+    return '<MPD' in manifest[:4096]
+
+
+# ------------------------------------------------------------------------------
+# HLS
+
+_HLS_ATTRIBUTE_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def _hls_attributes(line: str) -> dict[str, str]:
+    _, _, attributes = line.partition(':')
+    return {
+        name: value.strip('"') for name, value in _HLS_ATTRIBUTE_RE.findall(attributes)
+    }
+
+
+def parse_hls_master(manifest: str, base_url: str) -> list[StreamRendition]:
+    """Return variants of the master playlist, empty list if it's a media playlist."""
+    audio_groups: dict[str, str] = {}
+    pending_variant: dict[str, str] | None = None
+    renditions: list[StreamRendition] = []
+
+    for raw_line in manifest.splitlines():
+        line = raw_line.strip()
+        if line.startswith('#EXT-X-MEDIA:'):
+            attributes = _hls_attributes(line)
+            if attributes.get('TYPE') == 'AUDIO' and 'URI' in attributes:
+                audio_groups.setdefault(
+                    attributes.get('GROUP-ID', ''), urljoin(base_url, attributes['URI'])
+                )
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            pending_variant = _hls_attributes(line)
+        elif line and not line.startswith('#') and pending_variant is not None:
+            resolution = pending_variant.get('RESOLUTION', '')
+            _, _, height = resolution.partition('x')
+            renditions.append(
+                StreamRendition(
+                    bandwidth=int(pending_variant.get('BANDWIDTH', '0') or 0),
+                    height=int(height) if height.isdigit() else None,
+                    playlist_url=urljoin(base_url, line),
+                    audio_playlist_url=audio_groups.get(
+                        pending_variant.get('AUDIO', '')
+                    ),
+                )
+            )
+            pending_variant = None
+
+    return renditions
+
+
+def parse_hls_media(manifest: str, base_url: str) -> StreamTrack:
+    """
+    Return segments of the media playlist (with the fMP4 init segment first).
+
+    Playlist without the end tag (and not marked as VOD) is live, it still grows,
+    so downloading its current segments would give a truncated video.
+    """
+    _ensure_hls_is_finite(manifest)
+
+    segments: list[StreamSegment] = []
+    extension = '.ts'
+    next_byte_range: tuple[int, int | None] | None = None
+    previous_range_end = 0
+
+    for raw_line in manifest.splitlines():
+        line = raw_line.strip()
+        if line.startswith('#EXT-X-KEY:'):
+            if _hls_attributes(line).get('METHOD', 'NONE') != 'NONE':
+                msg = 'Encrypted HLS streams are not supported'
+                raise StreamManifestError(msg)
+        elif line.startswith('#EXT-X-MAP:'):
+            attributes = _hls_attributes(line)
+            init_range = None
+            if 'BYTERANGE' in attributes:
+                init_range = _hls_byte_range(attributes['BYTERANGE'], 0)
+            segments.append(
+                StreamSegment(urljoin(base_url, attributes['URI']), init_range)
+            )
+            extension = '.mp4'
+        elif line.startswith('#EXT-X-BYTERANGE:'):
+            length, _, offset = line.partition(':')[2].partition('@')
+            next_byte_range = (int(length), int(offset) if offset else None)
+        elif line and not line.startswith('#'):
+            byte_range = None
+            if next_byte_range is not None:
+                length, offset = next_byte_range
+                # Without offset the range continues the previous one
+                start = previous_range_end if offset is None else offset
+                byte_range = (start, start + length - 1)
+                previous_range_end = start + length
+                next_byte_range = None
+            segments.append(StreamSegment(urljoin(base_url, line), byte_range))
+
+    if not segments:
+        msg = 'HLS playlist has no segments'
+        raise StreamManifestError(msg)
+    return StreamTrack(segments=segments, extension=extension)
+
+
+def _ensure_hls_is_finite(manifest: str) -> None:
+    tags = {line.strip() for line in manifest.splitlines()}
+    if not tags & {'#EXT-X-ENDLIST', '#EXT-X-PLAYLIST-TYPE:VOD'}:
+        msg = 'Live HLS streams are not supported'
+        raise StreamManifestError(msg)
+
+
+def _hls_byte_range(value: str, default_offset: int) -> tuple[int, int]:
+    length, _, offset = value.partition('@')
+    start = int(offset) if offset else default_offset
+    return (start, start + int(length) - 1)
+
+
+# ------------------------------------------------------------------------------
+# DASH
+
+_DASH_NS = '{urn:mpeg:dash:schema:mpd:2011}'
+_ISO_DURATION_RE = re.compile(
+    r'^P(?:(?P<days>[\d.]+)D)?'
+    r'(?:T(?:(?P<hours>[\d.]+)H)?(?:(?P<minutes>[\d.]+)M)?(?:(?P<seconds>[\d.]+)S)?)?$'
+)
+_TEMPLATE_RE = re.compile(r'\$(RepresentationID|Number|Bandwidth|Time)(%0(\d+)d)?\$')
+_EXTENSIONS = {'video/mp4': '.mp4', 'audio/mp4': '.m4a', 'video/webm': '.webm'}
+
+
+def _iso_duration_seconds(value: str) -> float:
+    match = _ISO_DURATION_RE.match(value.strip())
+    if match is None:
+        msg = f'Unsupported duration: {value}'
+        raise StreamManifestError(msg)
+    parts = {name: float(part) for name, part in match.groupdict().items() if part}
+    return (
+        parts.get('days', 0) * 86400
+        + parts.get('hours', 0) * 3600
+        + parts.get('minutes', 0) * 60
+        + parts.get('seconds', 0)
+    )
+
+
+def _child(element: ET.Element, name: str) -> ET.Element | None:
+    return element.find(_DASH_NS + name)
+
+
+def _base_url(element: ET.Element, parent_url: str) -> str:
+    base = _child(element, 'BaseURL')
+    if base is None or not (base.text or '').strip():
+        return parent_url
+    return urljoin(parent_url, (base.text or '').strip())
+
+
+def _fill_template(
+    template: str, representation: ET.Element, number: int, time: int
+) -> str:
+    values = {
+        'RepresentationID': representation.get('id', ''),
+        'Number': number,
+        'Bandwidth': int(representation.get('bandwidth', '0')),
+        'Time': time,
+    }
+
+    def replace(match: re.Match[str]) -> str:
+        value = values[match.group(1)]
+        width = match.group(3)
+        if width and isinstance(value, int):
+            return str(value).zfill(int(width))
+        return str(value)
+
+    return _TEMPLATE_RE.sub(replace, template).replace('$$', '$')
+
+
+def _template_segments(
+    template: ET.Element,
+    representation: ET.Element,
+    base_url: str,
+    period_seconds: float,
+) -> list[StreamSegment]:
+    segments: list[StreamSegment] = []
+    initialization = template.get('initialization')
+    if initialization:
+        segments.append(
+            StreamSegment(
+                urljoin(base_url, _fill_template(initialization, representation, 0, 0))
+            )
+        )
+
+    media = template.get('media')
+    if not media:
+        msg = 'DASH SegmentTemplate without media'
+        raise StreamManifestError(msg)
+    number = int(template.get('startNumber', '1'))
+
+    timeline = _child(template, 'SegmentTimeline')
+    if timeline is not None:
+        time = 0
+        for entry in timeline.findall(_DASH_NS + 'S'):
+            time = int(entry.get('t', time))
+            duration = int(entry.get('d', '0'))
+            for _ in range(int(entry.get('r', '0')) + 1):
+                segments.append(
+                    StreamSegment(
+                        urljoin(
+                            base_url,
+                            _fill_template(media, representation, number, time),
+                        )
+                    )
+                )
+                number += 1
+                time += duration
+        return segments
+
+    duration = int(template.get('duration', '0'))
+    if not duration or not period_seconds:
+        msg = 'DASH SegmentTemplate without timeline and duration'
+        raise StreamManifestError(msg)
+    timescale = int(template.get('timescale', '1'))
+    count = math.ceil(period_seconds * timescale / duration)
+    segments.extend(
+        StreamSegment(
+            urljoin(
+                base_url,
+                _fill_template(media, representation, number + i, i * duration),
+            )
+        )
+        for i in range(count)
+    )
+    return segments
+
+
+def _list_segments(segment_list: ET.Element, base_url: str) -> list[StreamSegment]:
+    segments: list[StreamSegment] = []
+    initialization = _child(segment_list, 'Initialization')
+    if initialization is not None and initialization.get('sourceURL'):
+        segments.append(
+            StreamSegment(urljoin(base_url, initialization.get('sourceURL', '')))
+        )
+    for segment_url in segment_list.findall(_DASH_NS + 'SegmentURL'):
+        media_range = segment_url.get('mediaRange')
+        byte_range = None
+        if media_range:
+            start, _, end = media_range.partition('-')
+            byte_range = (int(start), int(end))
+        segments.append(
+            StreamSegment(urljoin(base_url, segment_url.get('media', '')), byte_range)
+        )
+    return segments
+
+
+def _representation_track(
+    adaptation_set: ET.Element,
+    representation: ET.Element,
+    base_url: str,
+    period_seconds: float,
+    mime_type: str,
+) -> StreamTrack:
+    url = _base_url(representation, base_url)
+    template = _child(representation, 'SegmentTemplate')
+    if template is None:
+        template = _child(adaptation_set, 'SegmentTemplate')
+    segment_list = _child(representation, 'SegmentList')
+
+    if template is not None:
+        segments = _template_segments(template, representation, url, period_seconds)
+    elif segment_list is not None:
+        segments = _list_segments(segment_list, url)
+    else:
+        # Whole representation is a single file
+        segments = [StreamSegment(url)]
+
+    return StreamTrack(segments=segments, extension=_EXTENSIONS.get(mime_type, '.mp4'))
+
+
+def parse_dash(manifest: str, base_url: str) -> list[StreamRendition]:
+    """
+    Return video renditions of the first period, each with the best audio track (if separate).
+
+    Audio is picked by the highest bandwidth, as it's small compared to video anyway.
+    """
+    try:
+        mpd = ET.fromstring(manifest)  # noqa: S314 (manifest of the video CDN, not arbitrary XML)
+    except ET.ParseError as e:
+        msg = f'Invalid DASH manifest: {e}'
+        raise StreamManifestError(msg) from e
+
+    if mpd.get('type') == 'dynamic':
+        msg = 'Live DASH streams are not supported'
+        raise StreamManifestError(msg)
+
+    period = _child(mpd, 'Period')
+    if period is None:
+        msg = 'DASH manifest has no periods'
+        raise StreamManifestError(msg)
+
+    period_duration = period.get('duration') or mpd.get('mediaPresentationDuration')
+    period_seconds = _iso_duration_seconds(period_duration) if period_duration else 0.0
+    period_url = _base_url(period, _base_url(mpd, base_url))
+
+    videos: list[tuple[int, int | None, StreamTrack]] = []
+    audios: list[tuple[int, StreamTrack]] = []
+    for adaptation_set in period.findall(_DASH_NS + 'AdaptationSet'):
+        set_url = _base_url(adaptation_set, period_url)
+        for representation in adaptation_set.findall(_DASH_NS + 'Representation'):
+            mime_type = representation.get('mimeType') or adaptation_set.get(
+                'mimeType', ''
+            )
+            content_type = (
+                adaptation_set.get('contentType') or mime_type.partition('/')[0]
+            )
+            track = _representation_track(
+                adaptation_set, representation, set_url, period_seconds, mime_type
+            )
+            bandwidth = int(representation.get('bandwidth', '0'))
+            if content_type == 'audio':
+                audios.append((bandwidth, track))
+            elif content_type == 'video':
+                height = representation.get('height') or adaptation_set.get('height')
+                videos.append((bandwidth, int(height) if height else None, track))
+
+    best_audio = max(audios, key=lambda audio: audio[0])[1] if audios else None
+    return [
+        StreamRendition(
+            bandwidth=bandwidth,
+            height=height,
+            tracks=[track, best_audio] if best_audio else [track],
+        )
+        for bandwidth, height, track in videos
+    ]
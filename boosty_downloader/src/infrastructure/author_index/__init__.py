@@ -0,0 +1,7 @@
+"""Offline index of all the downloaded posts of an author."""
+
+from .author_index import AuthorIndex
+
+__all__ = [
+    'AuthorIndex',
+]
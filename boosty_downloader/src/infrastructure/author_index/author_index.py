@@ -0,0 +1,287 @@
+"""
+Offline index of all the downloaded posts of an author.
+
+`index.html` in the author directory lists the posts page by page and searches them by title.
+Posts are taken from the post cache database (`post_index` table),
+and the generated files are updated incrementally: only pages and search shards
+whose content changed are written again, so huge authors stay cheap to update.
+
+Search index is split into shards by the first two characters of title words,
+the browser loads only the shard of the typed word. Shards are scripts (not JSON),
+so they are loaded from `file://` without any local server.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import shutil
+from bisect import bisect_left
+from collections import defaultdict
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+from jinja2 import Environment, PackageLoader, select_autoescape
+
+from boosty_downloader.src.application.filtering import DownloadContentTypeFilter
+from boosty_downloader.src.infrastructure.post_caching.post_cache import IndexedPost
+from boosty_downloader.src.infrastructure.post_manifest import (
+    MANIFEST_FILENAME,
+    PostManifest,
+)
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from pathlib import Path
+
+    from typing_extensions import Self
+
+    from boosty_downloader.src.infrastructure.post_caching.post_cache import (
+        SQLitePostCache,
+    )
+
+# Words are split the same way by the search script of index.html
+_WORD_RE = re.compile(r'\w+')
+_SHARD_KEY_LENGTH = 2
+
+env = Environment(
+    loader=PackageLoader(
+        'boosty_downloader.src.infrastructure.author_index', 'templates'
+    ),
+    autoescape=select_autoescape(['html']),
+)
+
+
+def shard_key(word: str) -> str:
+    """Return the search shard of the (lowercase) word, also used by the search script."""
+    return word[:_SHARD_KEY_LENGTH]
+
+
+def shard_filename(key: str) -> str:
+    """Name of the shard script, hex keeps any alphabet safe for file names."""
+    return key.encode('utf-8').hex() + '.js'
+
+
+class AuthorIndex:
+    """
+    Maintains `index.html` with paginated list of posts and sharded search index.
+
+    Pages are numbered from the oldest post, so new posts only change the last page.
+    Changed posts mark their search shards and pages from their position to the end as dirty,
+    and only the dirty files are written on flush.
+    """
+
+    DEFAULT_INDEX_FILENAME = 'index.html'
+    DEFAULT_INDEX_DIRNAME = '_index'
+
+    def __init__(
+        self,
+        destination: Path,
+        post_cache: SQLitePostCache,
+        posts_per_page: int = 100,
+        flush_every: int = 20,
+    ) -> None:
+        self.destination = destination
+        self.index_file = destination / self.DEFAULT_INDEX_FILENAME
+        self.index_dir = destination / self.DEFAULT_INDEX_DIRNAME
+        self.post_cache = post_cache
+        self.posts_per_page = posts_per_page
+        self._flush_every = flush_every
+
+        self._posts: dict[str, IndexedPost] = {}
+        self._shard_members: defaultdict[str, set[str]] = defaultdict(set)
+        self._dirty_shards: set[str] = set()
+        self._first_changed: tuple[datetime, str] | None = None
+        self._unflushed = 0
+
+        for post in post_cache.get_indexed_posts():
+            self._put(post)
+        # Stored posts are already written
+        self._dirty_shards = set()
+        self._first_changed = None
+
+        # Generated files are missing or were made for another (e.g. cleaned) cache
+        self._rebuild = not self._posts or not self.index_file.exists()
+        if not self._posts:
+            self._index_existing_posts()
+        if self._rebuild:
+            self._unflushed += 1
+
+    def __enter__(self) -> Self:
+        """Use the index as a context manager, pending changes are written on exit."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Write pending changes."""
+        self.flush()
+
+    def _index_existing_posts(self) -> None:
+        """
+        Index posts downloaded before the index was enabled.
+
+        Only the post directories with manifests are read (not the whole tree),
+        and only for posts the cache knows as downloaded.
+        """
+        downloaded = self.post_cache.get_downloaded_post_uuids(
+            DownloadContentTypeFilter.post_content
+        )
+        for manifest_file in self.destination.glob(f'*/{MANIFEST_FILENAME}'):
+            post_directory = manifest_file.parent
+            manifest = PostManifest.load(post_directory)
+            if manifest is None or manifest.post_uuid not in downloaded:
+                continue
+
+            post = IndexedPost(
+                uuid=manifest.post_uuid,
+                title=manifest.title or post_directory.name,
+                directory=post_directory.name,
+                created_at=manifest.created_at or manifest.updated_at,
+                has_html=(post_directory / 'post.html').is_file(),
+            )
+            self._put(post)
+            self.post_cache.index_post(post)
+
+    def _put(self, post: IndexedPost) -> None:
+        """Update the in-memory index and mark what the post changes as dirty."""
+        previous = self._posts.get(post.uuid)
+        self._posts[post.uuid] = post
+
+        changed_keys = [(post.created_at, post.uuid)]
+        old_shards: set[str] = set()
+        if previous is not None:
+            changed_keys.append((previous.created_at, previous.uuid))
+            old_shards = _shard_keys(previous.title)
+        new_shards = _shard_keys(post.title)
+
+        for key in old_shards - new_shards:
+            self._shard_members[key].discard(post.uuid)
+        for key in new_shards:
+            self._shard_members[key].add(post.uuid)
+        self._dirty_shards |= old_shards | new_shards
+
+        first_changed = min(changed_keys)
+        if self._first_changed is None or first_changed < self._first_changed:
+            self._first_changed = first_changed
+
+    def add(self, post: IndexedPost) -> None:
+        """Add or update the post, files are written every `flush_every` changes."""
+        if self._posts.get(post.uuid) == post:
+            return
+
+        self._put(post)
+        self.post_cache.index_post(post)
+        self._unflushed += 1
+        if self._unflushed >= self._flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the dirty pages and shards, and `index.html`."""
+        if not self._unflushed:
+            return
+
+        if self._rebuild:
+            shutil.rmtree(self.index_dir, ignore_errors=True)
+            self._dirty_shards = set(self._shard_members)
+            self._first_changed = None
+            self._rebuild = False
+
+        posts = sorted(self._posts.values(), key=_sort_key)
+        pages = [
+            posts[start : start + self.posts_per_page]
+            for start in range(0, len(posts), self.posts_per_page)
+        ]
+
+        first_dirty_page = 0
+        if self._first_changed is not None:
+            position = bisect_left(posts, self._first_changed, key=_sort_key)
+            first_dirty_page = position // self.posts_per_page
+        for number in range(first_dirty_page + 1, len(pages) + 1):
+            self._write_page(number, pages[number - 1], has_next=number < len(pages))
+
+        for key in self._dirty_shards:
+            self._write_shard(key)
+
+        self._write_index(pages)
+
+        self._dirty_shards = set()
+        self._first_changed = None
+        self._unflushed = 0
+        self.post_cache.commit()
+
+    def _write_page(
+        self, number: int, page_posts: list[IndexedPost], *, has_next: bool
+    ) -> None:
+        page_file = self.index_dir / 'pages' / _page_filename(number)
+        page_file.parent.mkdir(parents=True, exist_ok=True)
+        page_file.write_text(
+            env.get_template('page.html').render(
+                number=number,
+                has_next=has_next,
+                posts=[_entry(post, '../../') for post in reversed(page_posts)],
+            ),
+            encoding='utf-8',
+        )
+
+    def _write_shard(self, key: str) -> None:
+        shard_file = self.index_dir / 'search' / shard_filename(key)
+        members = self._shard_members.get(key)
+        if not members:
+            shard_file.unlink(missing_ok=True)
+            self._shard_members.pop(key, None)
+            return
+
+        # Newest first in search results
+        shard_posts = sorted(
+            (self._posts[uuid] for uuid in members), key=_sort_key, reverse=True
+        )
+        rows = [list(_entry(post, '').values()) for post in shard_posts]
+        shard_file.parent.mkdir(parents=True, exist_ok=True)
+        shard_file.write_text(
+            f'boostyIndexShard({json.dumps(key)}, {json.dumps(rows, ensure_ascii=False)});\n',
+            encoding='utf-8',
+        )
+
+    def _write_index(self, pages: list[list[IndexedPost]]) -> None:
+        """`index.html` is small (one line per page), it's written on every flush."""
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.index_file.write_text(
+            env.get_template('index.html').render(
+                author=self.destination.name,
+                posts_count=len(self._posts),
+                pages=[
+                    {
+                        'href': f'{self.DEFAULT_INDEX_DIRNAME}/pages/{_page_filename(number)}',
+                        'number': number,
+                        'first_date': page_posts[0].created_at.date().isoformat(),
+                        'last_date': page_posts[-1].created_at.date().isoformat(),
+                        'count': len(page_posts),
+                    }
+                    for number, page_posts in reversed(list(enumerate(pages, start=1)))
+                ],
+                shards_dir=f'{self.DEFAULT_INDEX_DIRNAME}/search',
+                shard_key_length=_SHARD_KEY_LENGTH,
+            ),
+            encoding='utf-8',
+        )
+
+
+def _sort_key(post: IndexedPost) -> tuple[datetime, str]:
+    return (post.created_at, post.uuid)
+
+
+def _shard_keys(title: str) -> set[str]:
+    return {shard_key(word) for word in _WORD_RE.findall(title.lower())}
+
+
+def _page_filename(number: int) -> str:
+    return f'page-{number:05d}.html'
+
+
+def _entry(post: IndexedPost, prefix: str) -> dict[str, str]:
+    """Title, link and date of the post, links are relative to the `prefix` directory."""
+    href = prefix + quote(post.directory) + '/'
+    return {
+        'title': post.title,
+        'href': href + 'post.html' if post.has_html else href,
+        'date': post.created_at.date().isoformat(),
+    }
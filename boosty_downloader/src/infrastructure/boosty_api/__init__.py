@@ -1,5 +1,19 @@
-from .core.client import BoostyAPIClient
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core.client import BoostyAPIClient
 
 __all__ = [
     'BoostyAPIClient',
 ]
+
+
+def __getattr__(name: str) -> object:
+    # The client pulls aiohttp and all the API models, so it's imported on the first use:
+    # importing a single model (e.g. an enum for CLI options) shouldn't load all of it.
+    if name == 'BoostyAPIClient':
+        from .core.client import BoostyAPIClient  # noqa: PLC0415 (lazy import)
+
+        return BoostyAPIClient
+    message = f'module {__name__!r} has no attribute {name!r}'
+    raise AttributeError(message)
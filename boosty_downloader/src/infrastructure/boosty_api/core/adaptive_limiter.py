@@ -0,0 +1,124 @@
+"""Request rate limiter which adapts its rate to the server responses."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse Retry-After header (delay in seconds or HTTP date) into seconds to wait."""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_throttling_status(status: int) -> bool:
+    """Check if the server asks to slow down (429) or is overloaded (5xx)."""
+    return (
+        status == HTTPStatus.TOO_MANY_REQUESTS
+        or status >= HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+
+
+class AdaptiveRateLimiter:
+    """
+    Limits the rate of requests and adapts it to the server responses.
+
+    Requests are spaced by the current delay, which:
+    - decreases step by step (down to `min_delay_seconds`) while responses are healthy,
+    - multiplies (up to `max_delay_seconds`) on 429 / 5xx responses,
+    - and all the requests are paused for `Retry-After` if the server sent it.
+
+    Use it as an async context manager around each request
+    and report the response with `record_response`.
+    """
+
+    def __init__(  # noqa: PLR0913 (tuning knobs with sane defaults)
+        self,
+        initial_delay_seconds: float,
+        min_delay_seconds: float | None = None,
+        *,
+        max_delay_seconds: float = 60.0,
+        speedup_after: int = 3,
+        speedup_factor: float = 0.9,
+        backoff_factor: float = 2.0,
+    ) -> None:
+        self.min_delay_seconds = (
+            initial_delay_seconds
+            if min_delay_seconds is None
+            else min(min_delay_seconds, initial_delay_seconds)
+        )
+        self.max_delay_seconds = max(max_delay_seconds, initial_delay_seconds)
+        self._delay = initial_delay_seconds
+        self._speedup_after = speedup_after
+        self._speedup_factor = speedup_factor
+        self._backoff_factor = backoff_factor
+
+        self._healthy_in_row = 0
+        self._next_request_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def current_delay_seconds(self) -> float:
+        """Current delay between requests."""
+        return self._delay
+
+    @property
+    def current_rate(self) -> float:
+        """Current rate of requests per second."""
+        return 1 / self._delay if self._delay > 0 else float('inf')
+
+    async def __aenter__(self) -> None:
+        """Wait until the next request is allowed."""
+        # Lock keeps requests in order, so every one of them is spaced by the delay
+        async with self._lock:
+            wait_seconds = self._next_request_at - time.monotonic()
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+            self._next_request_at = time.monotonic() + self._delay
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Nothing to release, the next request time is already reserved."""
+
+    def record_response(
+        self, status: int, retry_after_seconds: float | None = None
+    ) -> None:
+        """Adapt the rate to the server response."""
+        if not is_throttling_status(status):
+            self._healthy_in_row += 1
+            if self._healthy_in_row >= self._speedup_after:
+                self._healthy_in_row = 0
+                self._delay = max(
+                    self.min_delay_seconds, self._delay * self._speedup_factor
+                )
+            return
+
+        self._healthy_in_row = 0
+        self._delay = min(self.max_delay_seconds, self._delay * self._backoff_factor)
+
+        pause_until = time.monotonic() + max(self._delay, retry_after_seconds or 0)
+        self._next_request_at = max(self._next_request_at, pause_until)
@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 from http import HTTPStatus
 from typing import TYPE_CHECKING
 
-from aiolimiter import AsyncLimiter
 from pydantic import ValidationError
 from yarl import URL
 
+from boosty_downloader.src.infrastructure.boosty_api.core.adaptive_limiter import (
+    AdaptiveRateLimiter,
+    parse_retry_after,
+)
 from boosty_downloader.src.infrastructure.boosty_api.core.endpoints import (
     BOOSTY_DEFAULT_BASE_URL,
 )
@@ -72,19 +76,15 @@ class BoostyAPIValidationError(BoostyAPIError):
         self.errors = errors
 
 
-def _create_limiter(request_delay_seconds: float) -> AsyncLimiter | None:
-    # aiolimiter expects max_rate and time_period to be positive.
-    # For delays <1s, we use a 1-second window and scale the rate to avoid exceptions and ensure correct throttling.
-    # For delays >=1s, we allow 1 request per delay period, matching the intended throttle.
-    # Without this logic, certain values (e.g. delay=0.5) would cause aiolimiter to raise or throttle incorrectly.
+def _create_limiter(
+    request_delay_seconds: float, min_request_delay_seconds: float | None
+) -> AdaptiveRateLimiter | None:
+    # Zero delay means no throttling at all (e.g. for local servers)
     if request_delay_seconds > 0:
-        if request_delay_seconds < 1:
-            max_rate = 1 / request_delay_seconds
-            time_period = 1
-        else:
-            max_rate = 1
-            time_period = request_delay_seconds
-        return AsyncLimiter(max_rate=max_rate, time_period=time_period)
+        return AdaptiveRateLimiter(
+            initial_delay_seconds=request_delay_seconds,
+            min_delay_seconds=min_request_delay_seconds,
+        )
     return None
 
 
@@ -97,17 +97,32 @@ class BoostyAPIClient:
 
     It handles the connection and makes requests to the API.
     To work with private/paid posts you need to provide valid authentication token and cookies in the session.
+
+    Requests are throttled starting with `request_delay_seconds` between them.
+    While the API responds fine the delay goes down to `min_request_delay_seconds` (if set),
+    on 429/5xx it goes up and `Retry-After` is honoured (429 responses are retried).
     """
 
+    # How many times a request is repeated if the API says "too many requests"
+    _TOO_MANY_REQUESTS_ATTEMPTS = 5
+
     def __init__(
         self,
         session: RetryClient,
         request_delay_seconds: float = 0.0,
         base_url: URL | None = None,
+        min_request_delay_seconds: float | None = None,
     ) -> None:
         self._base_url = base_url or BOOSTY_DEFAULT_BASE_URL
         self.session = session
-        self._limiter = _create_limiter(request_delay_seconds)
+        self._limiter = _create_limiter(
+            request_delay_seconds, min_request_delay_seconds
+        )
+
+    @property
+    def current_request_rate(self) -> float | None:
+        """Current allowed rate of API requests per second (None if not throttled)."""
+        return self._limiter.current_rate if self._limiter else None
 
     async def _throttled_get(
         self,
@@ -117,10 +132,29 @@ class BoostyAPIClient:
     ) -> ClientResponse:
         url = URL(self._base_url) / endpoint.lstrip('/')
 
-        if self._limiter:
+        if not self._limiter:
+            return await self.session.get(url, params=params, headers=headers)
+
+        attempt = 1
+        while True:
             async with self._limiter:
-                return await self.session.get(url, params=params, headers=headers)
-        return await self.session.get(url, params=params, headers=headers)
+                response = await self.session.get(url, params=params, headers=headers)
+
+            self._limiter.record_response(
+                response.status,
+                retry_after_seconds=parse_retry_after(
+                    response.headers.get('Retry-After')
+                ),
+            )
+            if (
+                response.status != HTTPStatus.TOO_MANY_REQUESTS
+                or attempt >= self._TOO_MANY_REQUESTS_ATTEMPTS
+            ):
+                return response
+
+            # Limiter already holds the next request back as long as the server asked
+            response.release()
+            attempt += 1
 
     async def get_author_posts(
         self,
@@ -177,13 +211,35 @@ class BoostyAPIClient:
         self,
         author_name: str,
         posts_per_page: int = 5,
+        prefetch_pages: int = 0,
+        start_offset: str | None = None,
     ) -> AsyncGenerator[PostsResponse, None]:
         """
         Infinite generator iterating over posts of the specified author.
 
         The generator will yield all posts of the author, paginating internally.
+        Pagination can be started from the `start_offset` (`Extra.offset` of some previous page).
+
+        If `prefetch_pages` > 0 the next pages are requested in background
+        while the consumer is still processing the current one (up to `prefetch_pages` are buffered).
+        All the requests still go through the same limiter.
         """
-        offset = None
+        pages = self._iterate_over_pages(author_name, posts_per_page, start_offset)
+        if prefetch_pages <= 0:
+            async for response in pages:
+                yield response
+            return
+
+        async for response in self._prefetch(pages, buffer_size=prefetch_pages):
+            yield response
+
+    async def _iterate_over_pages(
+        self,
+        author_name: str,
+        posts_per_page: int,
+        start_offset: str | None,
+    ) -> AsyncGenerator[PostsResponse, None]:
+        offset = start_offset
         while True:
             response = await self.get_author_posts(
                 author_name,
@@ -194,3 +250,34 @@ class BoostyAPIClient:
             if response.extra.is_last:
                 break
             offset = response.extra.offset
+
+    async def _prefetch(
+        self,
+        pages: AsyncGenerator[PostsResponse, None],
+        buffer_size: int,
+    ) -> AsyncGenerator[PostsResponse, None]:
+        # Pagination is sequential by nature (next offset comes from the previous page),
+        # so a single background task fetches pages one by one into a bounded buffer.
+        buffer: asyncio.Queue[PostsResponse | Exception | None] = asyncio.Queue(
+            maxsize=buffer_size
+        )
+
+        async def _fetch_pages() -> None:
+            try:
+                async for page in pages:
+                    await buffer.put(page)
+            except Exception as e:  # noqa: BLE001 Re-raised on the consumer side
+                await buffer.put(e)
+                return
+            await buffer.put(None)
+
+        fetcher = asyncio.create_task(_fetch_pages())
+        try:
+            while (item := await buffer.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            fetcher.cancel()
+            await asyncio.wait([fetcher])
+            await pages.aclose()
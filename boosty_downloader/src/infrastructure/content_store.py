@@ -0,0 +1,179 @@
+"""
+Content-addressed store to deduplicate downloaded images and files.
+
+Every unique content is stored once under its SHA-256, and post directories
+get links to it, so the same banner/attachment in many posts takes the disk space once
+and is downloaded once.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from typing_extensions import Self
+
+# ioctl request for reflink (copy-on-write clone) on Linux filesystems like btrfs/XFS
+_FICLONE = 0x40049409
+
+
+class LinkMode(str, Enum):
+    """How deduplicated files are placed into post directories."""
+
+    hardlink = 'hardlink'
+    reflink = 'reflink'  # Copy-on-write clone, falls back to copying
+    symlink = 'symlink'
+
+
+@dataclass
+class StoredContent:
+    """Content known to the store by its source key."""
+
+    sha256: str
+    suffix: str  # Extension the file was saved with
+
+
+class ContentStore:
+    """
+    Content-addressed store under the author directory.
+
+    Objects are kept as `objects/<sha256[:2]>/<sha256>`,
+    index maps source keys (e.g. URLs) to the content hash,
+    so repeated references are satisfied without any network requests.
+    """
+
+    DEFAULT_STORE_DIRNAME = '.content_store'
+    _INDEX_FILENAME = 'index.json'
+    _SAVE_INDEX_EVERY = 100  # Additions, index is saved on close anyway
+
+    def __init__(
+        self, destination: Path, link_mode: LinkMode = LinkMode.hardlink
+    ) -> None:
+        self.root = destination / self.DEFAULT_STORE_DIRNAME
+        self.objects_dir = self.root / 'objects'
+        self.index_file = self.root / self._INDEX_FILENAME
+        self.link_mode = link_mode
+
+        self._index: dict[str, StoredContent] = self._load_index()
+        self._unsaved_additions = 0
+
+    def __enter__(self) -> Self:
+        """Use the store as a context manager, the index is saved on exit."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Save the index."""
+        self.close()
+
+    def _load_index(self) -> dict[str, StoredContent]:
+        try:
+            raw = json.loads(self.index_file.read_text(encoding='utf-8'))
+            return {
+                key: StoredContent(sha256=entry['sha256'], suffix=entry['suffix'])
+                for key, entry in raw.items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Missing or broken index just means files will be downloaded again
+            return {}
+
+    def _object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / sha256
+
+    def find(self, key: str) -> StoredContent | None:
+        """Return stored content for the key if its object still exists."""
+        content = self._index.get(key)
+        if content is None or not self._object_path(content.sha256).exists():
+            return None
+        return content
+
+    def link_to(self, content: StoredContent, target: Path) -> Path:
+        """Place the stored content at the target path."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        self._link(self._object_path(content.sha256), target)
+        return target
+
+    def add(self, key: str, file_path: Path, sha256: str) -> None:
+        """
+        Register downloaded file in the store.
+
+        If the same content is already stored, the file is replaced with a link to it,
+        otherwise the file becomes the stored object and a link is placed instead of it.
+        """
+        object_path = self._object_path(sha256)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.replace(object_path)
+        self._link(object_path, file_path)
+
+        self._index[key] = StoredContent(sha256=sha256, suffix=file_path.suffix)
+        self._unsaved_additions += 1
+        if self._unsaved_additions >= self._SAVE_INDEX_EVERY:
+            self.save_index()
+
+    def discard(self, sha256: str) -> None:
+        """Remove (e.g. damaged) content, references to it are downloaded again."""
+        self._object_path(sha256).unlink(missing_ok=True)
+        self._index = {
+            key: content
+            for key, content in self._index.items()
+            if content.sha256 != sha256
+        }
+        self._unsaved_additions += 1
+
+    def save_index(self) -> None:
+        """Atomically write the index to the disk."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.index_file.with_name(self.index_file.name + '.tmp')
+        tmp_file.write_text(
+            json.dumps(
+                {
+                    key: {'sha256': content.sha256, 'suffix': content.suffix}
+                    for key, content in self._index.items()
+                }
+            ),
+            encoding='utf-8',
+        )
+        tmp_file.replace(self.index_file)
+        self._unsaved_additions = 0
+
+    def close(self) -> None:
+        """Save the index if there are new entries."""
+        if self._unsaved_additions:
+            self.save_index()
+
+    def _link(self, source: Path, target: Path) -> None:
+        target.unlink(missing_ok=True)
+
+        if self.link_mode is LinkMode.symlink:
+            # Relative link keeps working if the whole archive is moved
+            target.symlink_to(os.path.relpath(source, target.parent))
+            return
+
+        try:
+            if self.link_mode is LinkMode.hardlink:
+                target.hardlink_to(source)
+            else:
+                _reflink(source, target)
+        except OSError:
+            # E.g. other filesystem or reflinks aren't supported
+            target.unlink(missing_ok=True)
+            shutil.copy2(source, target)
+
+
+def _reflink(source: Path, target: Path) -> None:
+    if sys.platform != 'linux':
+        msg = 'Reflinks are supported only on Linux'
+        raise OSError(msg)
+
+    import fcntl  # noqa: PLC0415 (unix only module)
+
+    with source.open('rb') as src, target.open('wb') as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
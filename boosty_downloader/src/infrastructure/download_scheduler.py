@@ -0,0 +1,206 @@
+"""
+Central scheduler for all the content downloads.
+
+It limits how many connections are open at the same time (globally and per host)
+and decides which of the waiting downloads goes next by its priority,
+sharing the slots fairly between owners (e.g. authors of a batch download).
+"""
+
+import asyncio
+import itertools
+import time
+from collections import Counter
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import TypeVar
+
+from yarl import URL
+
+T = TypeVar('T')
+
+
+class DownloadPriority(IntEnum):
+    """Priority classes of downloads, lower value goes first."""
+
+    post_content = 0  # Images and other small parts of the post page
+    files = 1
+    videos = 2  # Can be multi-GB, so they shouldn't block everything else
+
+
+@dataclass
+class DownloadSchedulerStats:
+    """Snapshot of the scheduler queue metrics."""
+
+    queued: int
+    running: int  # Connections held by the running downloads
+    peak_queued: int
+    total_jobs: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def average_wait_seconds(self) -> float:
+        """Average time jobs spent in the queue before they started."""
+        if self.total_jobs == 0:
+            return 0.0
+        return self.total_wait_seconds / self.total_jobs
+
+
+@dataclass
+class _Waiter:
+    priority: DownloadPriority
+    sequence: int  # FIFO order inside the same priority
+    host: str
+    owner: str
+    connections: int
+    future: asyncio.Future[None] = field(repr=False)
+
+
+class DownloadScheduler:
+    """
+    Schedules downloads with global and per-host concurrency caps and priorities.
+
+    Downloads are submitted with `submit` (or wrapped with `slot`),
+    each of them waits in the queue until there is a free slot both globally and for its host.
+    Download which opens several connections (segmented or HLS/DASH) takes a slot for
+    each of them, but never more than the caps, so it can always start eventually.
+    Among waiting downloads the one with the highest priority starts first, then the one
+    whose owner has the fewest running downloads, then the oldest one.
+    Downloads for a busy host don't block downloads for other hosts.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_per_host: int = 4) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_host = max(1, max_per_host)
+
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._running_per_host: Counter[str] = Counter()
+        self._running_per_owner: Counter[str] = Counter()
+
+        self._peak_queued = 0
+        self._total_jobs = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def stats(self) -> DownloadSchedulerStats:
+        """Return current queue depth and waiting time metrics."""
+        return DownloadSchedulerStats(
+            queued=len(self._waiters),
+            running=self._running,
+            peak_queued=self._peak_queued,
+            total_jobs=self._total_jobs,
+            total_wait_seconds=self._total_wait_seconds,
+            max_wait_seconds=self._max_wait_seconds,
+        )
+
+    async def submit(
+        self,
+        url: str,
+        priority: DownloadPriority,
+        job: Callable[[], Awaitable[T]],
+        owner: str = '',
+        connections: int = 1,
+    ) -> T:
+        """Wait for free slots for the url host and run the download job in them."""
+        async with self.slot(url, priority, owner, connections):
+            return await job()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        url: str,
+        priority: DownloadPriority,
+        owner: str = '',
+        connections: int = 1,
+    ) -> AsyncGenerator[None, None]:
+        """Hold slots for `connections` to the url host while inside the context."""
+        host = URL(url).host or ''
+        connections = max(1, min(connections, self.max_concurrent, self.max_per_host))
+        await self._acquire(host, priority, owner, connections)
+        try:
+            yield
+        finally:
+            self._release(host, owner, connections)
+
+    def _has_capacity(self, host: str, connections: int) -> bool:
+        return (
+            self._running + connections <= self.max_concurrent
+            and self._running_per_host[host] + connections <= self.max_per_host
+        )
+
+    async def _acquire(
+        self, host: str, priority: DownloadPriority, owner: str, connections: int
+    ) -> None:
+        waiter = _Waiter(
+            priority=priority,
+            sequence=next(self._sequence),
+            host=host,
+            owner=owner,
+            connections=connections,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        # New job may start right away if its host is free and nobody more important waits for it
+        self._wake_up_waiters()
+        self._peak_queued = max(self._peak_queued, len(self._waiters))
+
+        enqueued_at = time.monotonic()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.cancelled():
+                self._waiters.remove(waiter)
+            else:
+                # Slot was granted right before the cancellation, give it back
+                self._release(host, owner, connections)
+            raise
+
+        waited_seconds = time.monotonic() - enqueued_at
+        self._total_jobs += 1
+        self._total_wait_seconds += waited_seconds
+        self._max_wait_seconds = max(self._max_wait_seconds, waited_seconds)
+
+    def _release(self, host: str, owner: str, connections: int) -> None:
+        self._running -= connections
+        self._running_per_host[host] -= connections
+        if self._running_per_host[host] <= 0:
+            del self._running_per_host[host]
+        self._running_per_owner[owner] -= connections
+        if self._running_per_owner[owner] <= 0:
+            del self._running_per_owner[owner]
+
+        self._wake_up_waiters()
+
+    def _next_waiter(self) -> _Waiter | None:
+        # Cancelled waiter is removed by its own task a bit later
+        startable = (
+            waiter
+            for waiter in self._waiters
+            if not waiter.future.done()
+            and self._has_capacity(waiter.host, waiter.connections)
+        )
+        return min(
+            startable,
+            key=lambda waiter: (
+                waiter.priority,
+                self._running_per_owner[waiter.owner],
+                waiter.sequence,
+            ),
+            default=None,
+        )
+
+    def _wake_up_waiters(self) -> None:
+        while self._running < self.max_concurrent:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+
+            self._waiters.remove(waiter)
+            self._running += waiter.connections
+            self._running_per_host[waiter.host] += waiter.connections
+            self._running_per_owner[waiter.owner] += waiter.connections
+            waiter.future.set_result(None)
@@ -1,16 +1,21 @@
 """Manager for downloading external videos (e.g., YouTube, Vimeo) with progress reporting."""
-# ruff: noqa: I001
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
+import threading
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, ClassVar, cast
+from typing import TYPE_CHECKING, Any, ClassVar, cast
 
-from yt_dlp.YoutubeDL import YoutubeDL
-from yt_dlp.utils import DownloadError
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from typing_extensions import Self
+    from yt_dlp.YoutubeDL import YoutubeDL
 
 YtDlOptions = dict[str, object]
 ExternalVideoDownloadProgressHook = Callable[['ExternalVideoDownloadStatus'], None]
@@ -50,6 +55,23 @@ class ExternalVideoDownloadStatus:
     delta_bytes: int
 
 
+@dataclass(slots=True)
+class _WorkerYoutubeDL:
+    """
+    YoutubeDL instance bound to a single download thread and reused between its downloads.
+
+    yt-dlp allows registering progress hooks only once per instance,
+    so the instance has one permanent hook which dispatches to the current download hook.
+    """
+
+    ydl: YoutubeDL
+    current_progress_hook: Callable[[dict[str, Any]], None] | None = None
+
+    def dispatch_progress(self, d: dict[str, Any]) -> None:
+        if self.current_progress_hook is not None:
+            self.current_progress_hook(d)
+
+
 @dataclass(slots=True)
 class _HookState:
     """Internal state holder for tracking the status of an external video download."""
@@ -83,7 +105,13 @@ class _SilentLogger:
 
 
 class ExternalVideosDownloader:
-    """Manager for downloading external videos (YouTube, Vimeo) with a 720p preference."""
+    """
+    Manager for downloading external videos (YouTube, Vimeo) with a 720p preference.
+
+    yt-dlp is fully blocking, so for async code use `download_video_async`:
+    it runs downloads in a dedicated thread pool (up to `max_parallel_downloads` at once)
+    and keeps the event loop responsive.
+    """
 
     # Prefer 720p when available, otherwise choose the best >720
     _default_ydl_options: ClassVar[YtDlOptions] = {
@@ -95,14 +123,117 @@ class ExternalVideosDownloader:
         'logger': _SilentLogger(),  # Suppress noisy error logging
     }
 
+    # Limit of redirects (`_type: url` or `url_transparent`) to follow while resolving the video info
+    _max_url_redirects: ClassVar[int] = 5
+
+    # Fields of a transparent redirect which describe the redirect itself, not the video
+    _redirect_fields: ClassVar[frozenset[str]] = frozenset(
+        {'_type', 'url', 'ie_key', 'id', 'extractor', 'extractor_key'}
+    )
+
+    def __init__(self, max_parallel_downloads: int = 1) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_parallel_downloads),
+            thread_name_prefix='yt-dlp',
+        )
+        self._thread_local = threading.local()
+        self._workers: list[_WorkerYoutubeDL] = []
+        self._workers_lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        """Create a context manager which shuts down the download threads on exit."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Ensure that all the download threads are stopped when exiting the context."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop accepting new downloads and wait for the running ones."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+        with self._workers_lock:
+            for worker in self._workers:
+                cast('Any', worker.ydl).close()
+            self._workers.clear()
+
+    def _get_worker_ydl(self) -> _WorkerYoutubeDL:
+        """Get YoutubeDL instance of the current thread, create it on the first use."""
+        worker: _WorkerYoutubeDL | None = getattr(self._thread_local, 'worker', None)
+        if worker is None:
+            # yt-dlp takes long to import, so it's loaded only when the first video is downloaded
+            from yt_dlp.YoutubeDL import YoutubeDL  # noqa: PLC0415 (lazy import)
+
+            worker = _WorkerYoutubeDL(ydl=YoutubeDL(self._default_ydl_options.copy()))
+            cast('Any', worker.ydl).add_progress_hook(worker.dispatch_progress)
+            self._thread_local.worker = worker
+            with self._workers_lock:
+                self._workers.append(worker)
+        return worker
+
+    async def download_video_async(
+        self,
+        url: str,
+        destination_directory: Path,
+        progress_hook: ExternalVideoDownloadProgressHook | None = None,
+    ) -> Path:
+        """
+        Download video in the downloader thread pool without blocking the event loop.
+
+        Progress hook is always called from the event loop thread.
+        If the awaiting task is cancelled, the download is stopped and
+        ExtVideoInterruptedByUserError is raised.
+        """
+        loop = asyncio.get_running_loop()
+        cancel_event = threading.Event()
+
+        def _call_hook_in_loop(status: ExternalVideoDownloadStatus) -> None:
+            if progress_hook is not None:
+                loop.call_soon_threadsafe(progress_hook, status)
+
+        download_future = asyncio.wrap_future(
+            self._executor.submit(
+                self.download_video,
+                url,
+                destination_directory,
+                _call_hook_in_loop,
+                cancel_event,
+            )
+        )
+
+        try:
+            return await asyncio.shield(download_future)
+        except asyncio.CancelledError as e:
+            # The thread can't be killed, ask yt-dlp to stop on its next progress report
+            # and wait for it, so nothing is written after the cancellation.
+            cancel_event.set()
+            download_future.cancel()  # If it's still waiting in the pool queue
+            await asyncio.wait([download_future])
+            raise ExtVideoInterruptedByUserError from e
+
     def download_video(
         self,
         url: str,
         destination_directory: Path,
         progress_hook: ExternalVideoDownloadProgressHook | None = None,
+        cancel_event: threading.Event | None = None,
     ) -> Path:
-        """Download video using yt-dlp and repeatedly report progress via progress_hook callback until completion."""
-        info = self._probe_video(url)
+        """
+        Download video using yt-dlp and repeatedly report progress via progress_hook callback until completion.
+
+        Setting `cancel_event` stops the download as if it was interrupted by the user.
+        """
+        from yt_dlp.utils import DownloadCancelled, DownloadError  # noqa: PLC0415 (lazy import)
+
+        worker = self._get_worker_ydl()
+        ydl = cast('Any', worker.ydl)  # yt-dlp isn't typed
+
+        info = self._extract_video_info(ydl, url)
         title = info.get('title')
         if not isinstance(title, str) or not title.strip():
             raise ExtVideoInfoError(url)
@@ -113,44 +244,68 @@ class ExternalVideosDownloader:
         outtmpl = self._build_outtmpl(destination_directory, clean_title)
 
         state = _HookState()
-        internal_hook = self._make_progress_hook(outtmpl, progress_hook, state)
-
-        options: YtDlOptions = self._default_ydl_options.copy()
-        options['outtmpl'] = outtmpl
-        options['progress_hooks'] = [internal_hook]
+        worker.current_progress_hook = self._make_progress_hook(
+            outtmpl, progress_hook, state, cancel_event
+        )
+        ydl.params['outtmpl']['default'] = outtmpl
 
         try:
-            with YoutubeDL(params=options) as ydl:
-                try:
-                    # yt-dlp isn't typed; cast to Any and coerce to int
-                    errors: int = int(cast('Any', ydl).download([url]))
-                except KeyboardInterrupt as e:
-                    raise ExtVideoInterruptedByUserError from e
-
-            if errors != 0:
-                raise ExtVideoDownloadError(url)
-
+            # Reuse already extracted info, so the video page isn't extracted twice.
+            # It's the same as extract_info(url, download=True) does internally.
+            result = ydl.process_ie_result(info, download=True)
+        except (KeyboardInterrupt, DownloadCancelled) as e:
+            raise ExtVideoInterruptedByUserError from e
         except DownloadError as e:
-            raise ExtVideoError(url) from e
+            raise ExtVideoDownloadError(url) from e
+        finally:
+            worker.current_progress_hook = None
 
         if state.final_filename is not None:
             return state.final_filename
 
-        ext = info.get('ext')
+        result_info = cast('dict[str, Any]', result) if isinstance(result, dict) else {}
+        ext = result_info.get('ext')
         guessed_ext = ext if isinstance(ext, str) and ext else 'mp4'
         return destination_directory / f'{clean_title}.{guessed_ext}'
 
-    def _probe_video(self, url: str) -> dict[str, Any]:
-        # Extract metadata without downloading to validate and fetch title/ext.
+    def _extract_video_info(self, ydl: Any, url: str) -> dict[str, Any]:  # noqa: ANN401 (yt-dlp isn't typed)
+        """
+        Extract raw (not processed) video info to get its title before downloading.
+
+        Redirects (e.g. embeds) are followed until the actual video info,
+        processing and formats selection happens later during the download.
+        Fields of transparent redirects (e.g. title of the embedding page) override
+        the ones of the video, the same way yt-dlp merges them.
+        """
+        from yt_dlp.utils import DownloadError  # noqa: PLC0415 (lazy import)
+
+        ie_key: str | None = None
+        overrides: dict[str, Any] = {}
         try:
-            with YoutubeDL({**self._default_ydl_options, 'skip_download': True}) as ydl:
-                raw = cast('Any', ydl).extract_info(url, download=False)
+            for _ in range(self._max_url_redirects):
+                raw = ydl.extract_info(
+                    url, download=False, process=False, ie_key=ie_key
+                )
+                if not isinstance(raw, dict):
+                    break
+
+                info = cast('dict[str, Any]', raw)
+                redirect_type = info.get('_type')
+                if redirect_type not in {'url', 'url_transparent'}:
+                    return {**info, **overrides}
+
+                if redirect_type == 'url_transparent':
+                    # The outer redirect wins over the inner ones
+                    overrides = {
+                        key: value
+                        for key, value in info.items()
+                        if value is not None and key not in self._redirect_fields
+                    } | overrides
+                url, ie_key = str(info['url']), info.get('ie_key')
         except DownloadError as e:
             raise ExtVideoInfoError(url) from e
 
-        if not isinstance(raw, dict):
-            raise ExtVideoInfoError(url)
-        return cast('dict[str, Any]', raw)
+        raise ExtVideoInfoError(url)
 
     @staticmethod
     def _sanitize_title(text: str) -> str:
@@ -166,8 +321,16 @@ class ExternalVideosDownloader:
         outtmpl: str,
         user_hook: ExternalVideoDownloadProgressHook | None,
         state: _HookState,
+        cancel_event: threading.Event | None = None,
     ) -> Callable[[dict[str, Any]], None]:
         def _hook(d: dict[str, Any]) -> None:
+            # The only way to stop yt-dlp from the outside is to raise from its hook
+            if cancel_event is not None and cancel_event.is_set():
+                from yt_dlp.utils import DownloadCancelled  # noqa: PLC0415 (lazy import)
+
+                msg = 'Download cancelled by user'
+                raise DownloadCancelled(msg)
+
             filename = d.get('filename') or d.get('tmpfilename') or outtmpl
             name = Path(str(filename)).name
 
@@ -2,23 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import http
+import json
 import mimetypes
 from asyncio import CancelledError
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 import aiofiles
-from aiohttp import ClientConnectionError
+from aiohttp import ClientConnectionError, ClientPayloadError
 
 from boosty_downloader.src.infrastructure.path_sanitizer import (
     sanitize_string,
 )
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Generator
     from pathlib import Path
 
+    from aiohttp import ClientResponse
     from aiohttp_retry import RetryClient
 
 
@@ -50,6 +55,32 @@ class DownloadFileConfig:
     guess_extension: bool = True
     chunk_size_bytes: int = 524288  # 512 KiB
 
+    # Download into `<filename>.part` and keep it on failures,
+    # so the next call continues from where it stopped (HTTP Range request).
+    resume: bool = False
+
+    # Files bigger than the threshold are split into `segments` byte ranges
+    # downloaded concurrently (if the server supports ranges), 1 disables it.
+    segments: int = 1
+    segment_threshold_bytes: int = 67108864  # 64 MiB
+
+    # Compute SHA-256 of the content while it's being written (see `download_file_with_info`)
+    compute_sha256: bool = False
+
+
+@dataclass
+class DownloadedFile:
+    """Info about successfully downloaded file."""
+
+    path: Path
+    size: int
+    sha256: str | None  # Only if `compute_sha256` was requested
+    etag: str | None = None  # As the server sent it, to tell the remote file version
+
+
+PARTIAL_FILE_SUFFIX = '.part'
+_PARTIAL_META_SUFFIX = '.meta'
+
 
 class DownloadError(Exception):
     """Exception raised when the download failed for any reason"""
@@ -58,44 +89,79 @@ class DownloadError(Exception):
     file: Path | None
     resource_url: str
 
-    def __init__(self, message: str, file: Path | None, resource_url: str) -> None:
+    # If True the file is a partial download kept on purpose to be resumed later,
+    # so it shouldn't be cleaned up.
+    resumable: bool
+
+    def __init__(
+        self,
+        message: str,
+        file: Path | None,
+        resource_url: str,
+        *,
+        resumable: bool = False,
+    ) -> None:
         super().__init__(message)
+        self.message = message
         self.file = file
         self.resource_url = resource_url
+        self.resumable = resumable
 
 
 class DownloadCancelledError(DownloadError):
     """Exception raised when the download was cancelled by the user"""
 
-    def __init__(self, resource_url: str, file: Path | None = None) -> None:
-        super().__init__('Download cancelled by user', file, resource_url=resource_url)
+    def __init__(
+        self, resource_url: str, file: Path | None = None, *, resumable: bool = False
+    ) -> None:
+        super().__init__(
+            'Download cancelled by user',
+            file,
+            resource_url=resource_url,
+            resumable=resumable,
+        )
 
 
 class DownloadTimeoutError(DownloadError):
     """Exception raised when the download timed out"""
 
-    def __init__(self, resource_url: str, file: Path | None = None) -> None:
+    def __init__(
+        self, resource_url: str, file: Path | None = None, *, resumable: bool = False
+    ) -> None:
         super().__init__(
             'Download timed out for the destination server',
             file,
             resource_url=resource_url,
+            resumable=resumable,
         )
 
 
 class DownloadConnectionError(DownloadError):
     """Exception raised when there was a connection error during the download"""
 
-    def __init__(self, resource_url: str, file: Path | None = None) -> None:
+    def __init__(
+        self, resource_url: str, file: Path | None = None, *, resumable: bool = False
+    ) -> None:
         super().__init__(
-            'Connection error during the download', file, resource_url=resource_url
+            'Connection error during the download',
+            file,
+            resource_url=resource_url,
+            resumable=resumable,
         )
 
 
 class DownloadIOFailureError(DownloadError):
     """Exception raised when there was an IOError during the download"""
 
-    def __init__(self, resource_url: str, file: Path | None = None) -> None:
-        super().__init__('Failed during I/O operation', file, resource_url=resource_url)
+    def __init__(
+        self, resource_url: str, file: Path | None = None, *, resumable: bool = False
+    ) -> None:
+        super().__init__(
+            'Failed during I/O operation',
+            file,
+            resource_url=resource_url,
+            resumable=resumable,
+        )
 
 
 class DownloadUnexpectedStatusError(DownloadError):
@@ -112,61 +178,490 @@ class DownloadUnexpectedStatusError(DownloadError):
         self.response_message = response_message
 
 
-async def download_file(
+class DownloadIncompleteError(DownloadError):
+    """Exception raised when the server sent less data than it promised"""
+
+    def __init__(
+        self, resource_url: str, file: Path | None, *, received: int, expected: int
+    ) -> None:
+        super().__init__(
+            f'Incomplete response: got {received} of {expected} bytes',
+            file,
+            resource_url=resource_url,
+        )
+        self.received = received
+        self.expected = expected
+
+
+@dataclass
+class _ResumeState:
+    """Where to continue a partial download from and how to validate it on the server."""
+
+    offset: int
+    validator: str
+
+
+def _partial_meta_path(part_path: Path) -> Path:
+    return part_path.with_name(part_path.name + _PARTIAL_META_SUFFIX)
+
+
+def _load_resume_state(part_path: Path) -> _ResumeState | None:
+    """
+    Read the saved validator (ETag / Last-Modified) of a partial download.
+
+    Without a validator we can't prove the remote file is still the same,
+    so such partial file can't be resumed.
+    """
+    meta_path = _partial_meta_path(part_path)
+    if not part_path.exists() or not meta_path.exists():
+        return None
+
+    try:
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        validator = meta['validator']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    offset = part_path.stat().st_size
+    if not isinstance(validator, str) or not validator or offset == 0:
+        return None
+    return _ResumeState(offset=offset, validator=validator)
+
+
+def _save_resume_validator(
+    part_path: Path, etag: str | None, last_modified: str | None
+) -> None:
+    # Weak ETags can't be used with If-Range (RFC 9110), fallback to Last-Modified then.
+    validator = etag if etag and not etag.startswith('W/') else last_modified
+    meta_path = _partial_meta_path(part_path)
+    if validator is None:
+        meta_path.unlink(missing_ok=True)
+        return
+    meta_path.write_text(json.dumps({'validator': validator}), encoding='utf-8')
+
+
+def discard_partial_download(part_path: Path) -> None:
+    """Remove partial download file and its metadata if any."""
+    part_path.unlink(missing_ok=True)
+    _partial_meta_path(part_path).unlink(missing_ok=True)
+
+
+def _content_range_bounds(content_range: str | None) -> tuple[int, int] | None:
+    # Expected header format: "bytes <start>-<end>/<total>", bounds are inclusive
+    if not content_range or not content_range.startswith('bytes '):
+        return None
+    bounds, _, _ = content_range.removeprefix('bytes ').partition('/')
+    start, _, end = bounds.partition('-')
+    try:
+        return int(start), int(end)
+    except ValueError:
+        return None
+
+
+def _content_range_start(content_range: str | None) -> int | None:
+    bounds = _content_range_bounds(content_range)
+    return bounds[0] if bounds else None
+
+
+def _check_response(
+    response: ClientResponse,
+    url: str,
+    part_path: Path,
+    resume_state: _ResumeState | None,
+) -> int:
+    """Validate response status and return the offset the response body starts from."""
+    if response.status == http.HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+        # Partial file is broken (e.g. bigger than remote one), start over next time
+        discard_partial_download(part_path)
+
+    if response.status not in (http.HTTPStatus.OK, http.HTTPStatus.PARTIAL_CONTENT):
+        raise DownloadUnexpectedStatusError(
+            resource_url=url,
+            status=response.status,
+            response_message=response.reason or 'No reason provided',
+        )
+
+    # Server ignored the range or the file was changed (If-Range mismatch)
+    if resume_state is None or response.status != http.HTTPStatus.PARTIAL_CONTENT:
+        return 0
+
+    content_range = response.headers.get('Content-Range')
+    if _content_range_start(content_range) != resume_state.offset:
+        discard_partial_download(part_path)
+        raise DownloadUnexpectedStatusError(
+            resource_url=url,
+            status=response.status,
+            response_message=f'Unexpected content range: {content_range}',
+        )
+    return resume_state.offset
+
+
+def file_path_with_extension(dl_config: DownloadFileConfig, ext: str | None) -> Path:
+    """Return the path the file is saved to, if its guessed extension is `ext`."""
+    file_path = dl_config.destination / sanitize_string(dl_config.filename)
+    if ext and dl_config.guess_extension:
+        file_path = file_path.with_suffix(ext)
+    return file_path
+
+
+def _guess_file_path(response: ClientResponse, dl_config: DownloadFileConfig) -> Path:
+    content_type = response.content_type
+    ext = mimetypes.guess_extension(content_type) if content_type else None
+    return file_path_with_extension(dl_config, ext)
+
+
+async def _write_response_body(  # noqa: PLR0913 (body writing needs the whole context)
+    response: ClientResponse,
     dl_config: DownloadFileConfig,
-) -> Path:
-    """Download files and report the downloading process via callback"""
-    async with dl_config.session.get(dl_config.url) as response:
-        if response.status != http.HTTPStatus.OK:
+    write_path: Path,
+    filename: str,
+    resume_from: int,
+    *,
+    update_digest: Callable[[bytes], None] | None,
+) -> None:
+    total_downloaded = resume_from
+    total_size = response.content_length
+    if total_size is not None:
+        total_size += resume_from
+
+    if resume_from:
+        # Report already downloaded part, so progress starts from the right place
+        dl_config.on_status_update(
+            DownloadingStatus(
+                name=filename,
+                total_bytes=total_size,
+                total_downloaded_bytes=total_downloaded,
+                downloaded_bytes=resume_from,
+            ),
+        )
+
+    async with aiofiles.open(write_path, mode='ab' if resume_from else 'wb') as file:
+        with translate_download_errors(
+            dl_config, write_path, resumable=dl_config.resume
+        ):
+            async for chunk in response.content.iter_chunked(
+                dl_config.chunk_size_bytes
+            ):
+                total_downloaded += len(chunk)
+                dl_config.on_status_update(
+                    DownloadingStatus(
+                        name=filename,
+                        total_bytes=total_size,
+                        total_downloaded_bytes=total_downloaded,
+                        downloaded_bytes=len(chunk),
+                    ),
+                )
+                if update_digest is not None:
+                    update_digest(chunk)
+                await file.write(chunk)
+
+
+async def _hash_file(
+    path: Path,
+    update_digest: Callable[[bytes], None],
+    chunk_size: int,
+    limit: int | None = None,
+) -> None:
+    """Feed the file content (first `limit` bytes if set) into the digest."""
+    remaining = limit
+    async with aiofiles.open(path, mode='rb') as file:
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = await file.read(size)
+            if not chunk:
+                break
+            update_digest(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+
+
+@contextmanager
+def translate_download_errors(
+    dl_config: DownloadFileConfig, write_path: Path, *, resumable: bool
+) -> Generator[None, None, None]:
+    """Convert low level errors during the body downloading to DownloadError family."""
+    try:
+        yield
+    except (CancelledError, KeyboardInterrupt) as e:
+        raise DownloadCancelledError(
+            file=write_path,
+            resource_url=dl_config.url,
+            resumable=resumable,
+        ) from e
+    except DownloadTimeoutError as e:
+        raise DownloadTimeoutError(
+            file=write_path,
+            resource_url=dl_config.url,
+            resumable=resumable,
+        ) from e
+    except (
+        ConnectionResetError,
+        BrokenPipeError,
+        ClientConnectionError,
+        ClientPayloadError,  # connection dropped in the middle of the body
+    ) as e:
+        raise DownloadConnectionError(
+            file=write_path,
+            resource_url=dl_config.url,
+            resumable=resumable,
+        ) from e
+    except OSError as e:
+        raise DownloadIOFailureError(
+            file=write_path,
+            resource_url=dl_config.url,
+            resumable=resumable,
+        ) from e
+
+
+# ------------------------------------------------------------------------------
+# Segmented download (several concurrent range requests for a single file)
+
+
+@dataclass
+class _SegmentedProbe:
+    """Info about remote file gathered before segmented download."""
+
+    total_size: int
+    validator: str | None
+    etag: str | None
+    file_path: Path
+
+
+@dataclass
+class _SegmentsProgress:
+    """Shared progress counter of all segments of a single file."""
+
+    total_downloaded: int = 0
+
+
+async def _probe_segmented_download(
+    dl_config: DownloadFileConfig,
+) -> _SegmentedProbe | None:
+    """
+    Check whether the file should (and can) be downloaded by segments.
+
+    It requests only the first byte of the file to get its full size,
+    returns None if the server doesn't support ranges or the file is too small.
+    """
+    async with dl_config.session.get(
+        dl_config.url, headers={'Range': 'bytes=0-0'}
+    ) as response:
+        if response.status != http.HTTPStatus.PARTIAL_CONTENT:
+            return None
+
+        content_range = response.headers.get('Content-Range', '')
+        _, _, total = content_range.rpartition('/')
+        if not total.isdigit() or int(total) < dl_config.segment_threshold_bytes:
+            return None
+
+        etag = response.headers.get('ETag')
+        return _SegmentedProbe(
+            total_size=int(total),
+            validator=etag
+            if etag and not etag.startswith('W/')
+            else response.headers.get('Last-Modified'),
+            etag=etag,
+            file_path=_guess_file_path(response, dl_config),
+        )
+
+
+async def _download_segment(  # noqa: PLR0913 (segment needs the whole context)
+    dl_config: DownloadFileConfig,
+    probe: _SegmentedProbe,
+    write_path: Path,
+    filename: str,
+    *,
+    segment: tuple[int, int],
+    progress: _SegmentsProgress,
+) -> None:
+    start, end = segment
+    headers = {'Range': f'bytes={start}-{end}'}
+    if probe.validator:
+        headers['If-Range'] = probe.validator
+
+    async with dl_config.session.get(dl_config.url, headers=headers) as response:
+        # 200 here means the file was changed between requests (If-Range mismatch)
+        if response.status != http.HTTPStatus.PARTIAL_CONTENT:
             raise DownloadUnexpectedStatusError(
                 resource_url=dl_config.url,
                 status=response.status,
                 response_message=response.reason or 'No reason provided',
             )
 
-        filename = sanitize_string(dl_config.filename)
-        file_path = dl_config.destination / filename
-
-        content_type = response.content_type
-        if content_type and dl_config.guess_extension:
-            ext = mimetypes.guess_extension(content_type)
-            if ext is not None:
-                file_path = file_path.with_suffix(ext)
-
-        total_downloaded = 0
-
-        async with aiofiles.open(file_path, mode='wb') as file:
-            total_size = response.content_length
+        # E.g. CDN which caps the size of ranges, the rest would be left zero-filled
+        content_range = response.headers.get('Content-Range')
+        if _content_range_bounds(content_range) != segment:
+            raise DownloadUnexpectedStatusError(
+                resource_url=dl_config.url,
+                status=response.status,
+                response_message=f'Unexpected content range: {content_range}',
+            )
 
-            try:
+        written = 0
+        async with aiofiles.open(write_path, mode='r+b') as file:
+            with translate_download_errors(dl_config, write_path, resumable=False):
+                await file.seek(start)
                 async for chunk in response.content.iter_chunked(
                     dl_config.chunk_size_bytes
                 ):
-                    total_downloaded += len(chunk)
+                    written += len(chunk)
+                    progress.total_downloaded += len(chunk)
                     dl_config.on_status_update(
                         DownloadingStatus(
                             name=filename,
-                            total_bytes=total_size,
-                            total_downloaded_bytes=total_downloaded,
+                            total_bytes=probe.total_size,
+                            total_downloaded_bytes=progress.total_downloaded,
                             downloaded_bytes=len(chunk),
                         ),
                     )
                     await file.write(chunk)
-            except (CancelledError, KeyboardInterrupt) as e:
-                raise DownloadCancelledError(
-                    file=file_path, resource_url=dl_config.url
-                ) from e
-            except DownloadTimeoutError as e:
-                raise DownloadTimeoutError(
-                    file=file_path, resource_url=dl_config.url
-                ) from e
-            except (ConnectionResetError, BrokenPipeError, ClientConnectionError) as e:
-                raise DownloadConnectionError(
-                    file=file_path, resource_url=dl_config.url
-                ) from e
-            except OSError as e:
-                raise DownloadIOFailureError(
-                    file=file_path, resource_url=dl_config.url
-                ) from e
-
-        return file_path
+
+        if written != end - start + 1:
+            raise DownloadIncompleteError(
+                dl_config.url, write_path, received=written, expected=end - start + 1
+            )
+
+
+def _split_into_segments(total_size: int, segments: int) -> list[tuple[int, int]]:
+    """Split [0, total_size) into inclusive byte ranges (as in the Range header)."""
+    segment_size = -(-total_size // segments)  # ceil division
+    return [
+        (start, min(start + segment_size, total_size) - 1)
+        for start in range(0, total_size, segment_size)
+    ]
+
+
+async def _download_file_segmented(
+    dl_config: DownloadFileConfig,
+    probe: _SegmentedProbe,
+    write_path: Path,
+    filename: str,
+) -> None:
+    # Preallocate the file, so every segment can write at its own offset
+    with translate_download_errors(dl_config, write_path, resumable=False):
+        async with aiofiles.open(write_path, mode='wb') as file:
+            await file.truncate(probe.total_size)
+
+    progress = _SegmentsProgress()
+    tasks = [
+        asyncio.create_task(
+            _download_segment(
+                dl_config,
+                probe,
+                write_path,
+                filename,
+                segment=segment,
+                progress=progress,
+            )
+        )
+        for segment in _split_into_segments(probe.total_size, dl_config.segments)
+    ]
+
+    try:
+        with translate_download_errors(dl_config, write_path, resumable=False):
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    for task in done:
+        task.result()  # re-raise the first failure if any
+
+
+async def download_file(
+    dl_config: DownloadFileConfig,
+) -> Path:
+    """
+    Download files and report the downloading process via callback
+
+    Data is written to `<filename>.part` first and moved in place once it's complete,
+    so an existing file (maybe a link to deduplicated content) is never rewritten in place.
+    In resume mode (`dl_config.resume`) the partial file is kept on failures
+    and continued with a Range request next time.
+    The server must confirm the file wasn't changed (If-Range), otherwise it's downloaded from scratch.
+
+    In segmented mode (`dl_config.segments` > 1) big files are downloaded by several
+    concurrent range requests into a preallocated `<filename>.part` file.
+    """
+    downloaded = await download_file_with_info(dl_config)
+    return downloaded.path
+
+
+async def download_file_with_info(
+    dl_config: DownloadFileConfig,
+) -> DownloadedFile:
+    """
+    Download file the same way as `download_file` but return info about it.
+
+    If `dl_config.compute_sha256` is set, the hash is computed from the chunks while they are written.
+    Only resumed prefix of a partial file is read back for it. Segmented downloads are written
+    out of order, so their part file is hashed in a single sequential pass once it's complete.
+    """
+    filename = sanitize_string(dl_config.filename)
+    part_path = dl_config.destination / (filename + PARTIAL_FILE_SUFFIX)
+    sha256 = hashlib.sha256() if dl_config.compute_sha256 else None
+
+    resume_state = _load_resume_state(part_path) if dl_config.resume else None
+
+    # Partial downloads are continued by a single stream, only fresh ones are segmented
+    if dl_config.segments > 1 and resume_state is None:
+        probe = await _probe_segmented_download(dl_config)
+        if probe is not None:
+            # Segments are written out of order, so such partial file can't be resumed
+            discard_partial_download(part_path)
+            await _download_file_segmented(dl_config, probe, part_path, filename)
+            if sha256 is not None:
+                await _hash_file(part_path, sha256.update, dl_config.chunk_size_bytes)
+            part_path.replace(probe.file_path)
+            return DownloadedFile(
+                path=probe.file_path,
+                size=probe.total_size,
+                sha256=sha256.hexdigest() if sha256 else None,
+                etag=probe.etag,
+            )
+
+    request_headers: dict[str, str] = {}
+    if resume_state is not None:
+        request_headers['Range'] = f'bytes={resume_state.offset}-'
+        request_headers['If-Range'] = resume_state.validator
+
+    async with dl_config.session.get(
+        dl_config.url, headers=request_headers
+    ) as response:
+        resume_from = _check_response(response, dl_config.url, part_path, resume_state)
+        file_path = _guess_file_path(response, dl_config)
+        etag = response.headers.get('ETag')
+
+        if dl_config.resume and resume_from == 0:
+            _save_resume_validator(
+                part_path,
+                etag=etag,
+                last_modified=response.headers.get('Last-Modified'),
+            )
+
+        if sha256 is not None and resume_from:
+            await _hash_file(
+                part_path, sha256.update, dl_config.chunk_size_bytes, limit=resume_from
+            )
+
+        await _write_response_body(
+            response,
+            dl_config,
+            part_path,
+            filename,
+            resume_from,
+            update_digest=sha256.update if sha256 else None,
+        )
+
+    # Replaces the directory entry, other links to the old content stay intact
+    part_path.replace(file_path)
+    if dl_config.resume:
+        _partial_meta_path(part_path).unlink(missing_ok=True)
+
+    return DownloadedFile(
+        path=file_path,
+        size=file_path.stat().st_size,
+        sha256=sha256.hexdigest() if sha256 else None,
+        etag=etag,
+    )
@@ -0,0 +1,170 @@
+"""
+Download a file from mirror hosts when the primary one fails or is too slow.
+
+Every host but the last one is watched: if it errors or its throughput stays
+below the floor, the download is stopped and continued from the next host.
+Partial file of a single stream download is kept (resume mode), so the next host continues
+from where the previous one stopped if it serves the same file version (If-Range),
+otherwise it starts over. Segmented and HLS/DASH downloads always start over from zero:
+their partial files are written out of order or per rendition, so they aren't kept.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+from boosty_downloader.src.infrastructure.file_downloader import (
+    DownloadCancelledError,
+    DownloadError,
+    download_file_with_info,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+    from contextlib import AbstractAsyncContextManager
+
+    from boosty_downloader.src.infrastructure.file_downloader import (
+        DownloadedFile,
+        DownloadFileConfig,
+        DownloadingStatus,
+    )
+
+
+@dataclass
+class ThroughputFloor:
+    """Minimal average speed a host must keep, checked once per window."""
+
+    bytes_per_second: int
+    # The first window is a grace period (connection setup, resumed part reporting)
+    window_seconds: float = 15.0
+
+
+class DownloadTooSlowError(DownloadError):
+    """Exception raised when the host stays below the throughput floor"""
+
+    def __init__(self, resource_url: str, bytes_per_second: float) -> None:
+        super().__init__(
+            f'Download is too slow ({bytes_per_second / 1024:.1f} KiB/s)',
+            file=None,
+            resource_url=resource_url,
+            resumable=True,
+        )
+        self.bytes_per_second = bytes_per_second
+
+
+@dataclass
+class _ThroughputMeter:
+    """Count bytes reported by the download progress callback."""
+
+    report: Callable[[DownloadingStatus], None]
+    downloaded_bytes: int = 0
+
+    def __call__(self, status: DownloadingStatus) -> None:
+        self.downloaded_bytes += status.downloaded_bytes
+        self.report(status)
+
+
+@dataclass
+class _AcrossHostsProgress:
+    """
+    Pass on only the bytes no previous host has reported yet.
+
+    The next host reports the resumed part again (or starts over from zero),
+    so without it the progress would count these bytes twice and go over 100%.
+    """
+
+    report: Callable[[DownloadingStatus], None]
+    reported_bytes: int = 0
+    host_bytes: int = 0
+
+    def next_host(self) -> None:
+        self.host_bytes = 0
+
+    def __call__(self, status: DownloadingStatus) -> None:
+        self.host_bytes += status.downloaded_bytes
+        new_bytes = max(0, self.host_bytes - self.reported_bytes)
+        self.reported_bytes += new_bytes
+        self.report(replace(status, downloaded_bytes=new_bytes))
+
+
+async def _download_with_floor(
+    dl_config: DownloadFileConfig,
+    download: Callable[[DownloadFileConfig], Awaitable[DownloadedFile]],
+    floor: ThroughputFloor,
+) -> DownloadedFile:
+    meter = _ThroughputMeter(dl_config.on_status_update)
+    task = asyncio.ensure_future(download(replace(dl_config, on_status_update=meter)))
+
+    try:
+        window_start_bytes: int | None = None
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=floor.window_seconds)
+            if done:
+                return task.result()
+
+            if window_start_bytes is not None:
+                speed = (
+                    meter.downloaded_bytes - window_start_bytes
+                ) / floor.window_seconds
+                if speed < floor.bytes_per_second:
+                    raise DownloadTooSlowError(dl_config.url, speed)
+            window_start_bytes = meter.downloaded_bytes
+    finally:
+        if not task.done():
+            task.cancel()
+            # Let it close the file and the connection, partial file is kept for resuming
+            await asyncio.wait({task})
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved, it's already handled or superseded
+
+
+async def download_with_failover(  # noqa: PLR0913 (download options of the hosts)
+    dl_config: DownloadFileConfig,
+    mirror_urls: Sequence[str],
+    *,
+    download: Callable[
+        [DownloadFileConfig], Awaitable[DownloadedFile]
+    ] = download_file_with_info,
+    throughput_floor: ThroughputFloor | None = None,
+    on_failover: Callable[[DownloadError, str], None] | None = None,
+    host_slot: Callable[[str], AbstractAsyncContextManager[None]] | None = None,
+) -> DownloadedFile:
+    """
+    Download `dl_config.url`, switching to the next of `mirror_urls` on failures.
+
+    `download` is called with the config of each host (e.g. for segmented streams),
+    `on_failover` is called with the error of the previous host and the next url.
+    `host_slot` is entered with the url of each host before downloading from it
+    (e.g. a scheduler slot), waiting for it doesn't count against the throughput floor.
+    Cancellation by user is never retried, the error of the last host is raised.
+    """
+    urls = [dl_config.url, *mirror_urls]
+    progress = _AcrossHostsProgress(dl_config.on_status_update)
+    dl_config = replace(dl_config, on_status_update=progress)
+
+    def enter_host(url: str) -> AbstractAsyncContextManager[None]:
+        return host_slot(url) if host_slot is not None else nullcontext()
+
+    for url, next_url in pairwise(urls):
+        progress.next_host()
+        host_config = replace(dl_config, url=url)
+        try:
+            async with enter_host(url):
+                if throughput_floor is None:
+                    return await download(host_config)
+                return await _download_with_floor(
+                    host_config, download, throughput_floor
+                )
+        except DownloadCancelledError:
+            raise
+        except DownloadError as e:
+            if on_failover is not None:
+                on_failover(e, next_url)
+
+    progress.next_host()
+    async with enter_host(urls[-1]):
+        return await download(replace(dl_config, url=urls[-1]))
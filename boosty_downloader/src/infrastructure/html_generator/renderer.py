@@ -1,14 +1,18 @@
 """
 Module provides functions to render HTML content from structured data.
 
-You can also dump the rendered HTML to a file.
+You can also dump the rendered HTML to a file, it's streamed there piece by piece.
 
 Current implementation uses Jinja2 templates to render HTML with a little styling.
+The whole post is rendered in one pass by `post.html` with the macros from `chunks.html`.
 """
 
-from pathlib import Path
+from __future__ import annotations
 
-from jinja2 import Environment, PackageLoader, select_autoescape
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from jinja2 import Environment, PackageLoader, Template, select_autoescape
 
 from boosty_downloader.src.infrastructure.html_generator.models import (
     HtmlGenChunk,
@@ -19,6 +23,10 @@ from boosty_downloader.src.infrastructure.html_generator.models import (
     HtmlGenVideo,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from pathlib import Path
+
 # Load all templates as a package files
 # So if ANY structure changed in this path - it should be reflected here.
 # There is also a test to check if templates are rendered correctly (available).
@@ -30,32 +38,70 @@ env = Environment(
 )
 
 
+def _is_chunk_of(chunk_type: type) -> Callable[..., bool]:
+    def test(value: object) -> bool:
+        return isinstance(value, chunk_type)
+
+    return test
+
+
+# Used by post.html to pick the macro for a chunk: {% if chunk is html_text %}
+_CHUNK_TESTS: dict[str, type] = {
+    'html_text': HtmlGenText,
+    'html_image': HtmlGenImage,
+    'html_video': HtmlGenVideo,
+    'html_list': HtmlGenList,
+    'html_file': HtmlGenFile,
+}
+for test_name, chunk_type in _CHUNK_TESTS.items():
+    env.tests[test_name] = _is_chunk_of(chunk_type)
+
+
+@cache
+def _post_template() -> Template:
+    """Compile the post template once, it's reused for every post."""
+    return env.get_template('post.html')
+
+
+@cache
+def _chunk_macros() -> Any:  # noqa: ANN401 (module of the template, attributes are the macros)
+    """Compile the chunk macros once, each one is a plain callable then."""
+    return env.get_template('chunks.html').module
+
+
 def render_html_chunk(chunk: HtmlGenChunk) -> str:
     """Render a single HtmlGenChunk to its HTML representation."""
+    macros = _chunk_macros()
     match chunk:
         case HtmlGenText():
-            return env.get_template('text.html').render(text=chunk)
+            return str(macros.text(chunk))
         case HtmlGenImage():
-            return env.get_template('image.html').render(image=chunk)
+            return str(macros.image(chunk))
         case HtmlGenVideo():
-            chunk.url = str(chunk.url).replace('\\', '/')
-            return env.get_template('video.html').render(video=chunk)
+            return str(macros.video(chunk))
         case HtmlGenList():
-            return env.get_template('list.html').render(
-                lst=chunk, render_chunk=render_html_chunk
-            )
+            return str(macros.list(chunk))
         case HtmlGenFile():
-            return f'<a href="{chunk.url}" download>{chunk.filename}</a>'
+            return str(macros.file(chunk))
 
 
-def render_html(chunks: list[HtmlGenChunk]) -> str:
+def render_html(chunks: Iterable[HtmlGenChunk]) -> str:
     """Render a list of HTML chunks to HTML."""
-    rendered = [render_html_chunk(chunk) for chunk in chunks]
-    return env.get_template('base.html').render(content='\n'.join(rendered))
+    return _post_template().render(chunks=chunks)
+
 
+def render_html_to_file(chunks: Iterable[HtmlGenChunk], out_path: Path) -> None:
+    """
+    Render HTML chunks to HTML file.
 
-def render_html_to_file(chunks: list[HtmlGenChunk], out_path: Path) -> None:
-    """Render HTML chunks to HTML file."""
-    html = render_html(chunks)
+    The document is written while it's being rendered, so the whole HTML is never kept in memory.
+    It goes to a temporary file first, so the previous file stays intact if rendering fails.
+    """
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(html, encoding='utf-8')
+    tmp_path = out_path.with_name(out_path.name + '.tmp')
+    try:
+        with tmp_path.open('w', encoding='utf-8') as out_file:
+            out_file.writelines(_post_template().generate(chunks=chunks))
+        tmp_path.replace(out_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,41 @@
+"""Persistent pagination checkpoint, used to resume interrupted full runs."""
+
+import json
+from pathlib import Path
+
+
+class PaginationCheckpoint:
+    """
+    Stores the offset of the last completed posts page of an author.
+
+    The checkpoint lives next to the post cache database, so it's removed
+    together with the author's directory.
+    """
+
+    DEFAULT_CHECKPOINT_FILENAME = 'pagination_checkpoint.json'
+
+    def __init__(self, destination: Path) -> None:
+        self.checkpoint_file = destination / self.DEFAULT_CHECKPOINT_FILENAME
+
+    def load(self) -> str | None:
+        """Return the saved offset or None if there is no (valid) checkpoint."""
+        try:
+            data = json.loads(self.checkpoint_file.read_text(encoding='utf-8'))
+            offset = data['offset']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if not isinstance(offset, str) or not offset:
+            return None
+        return offset
+
+    def save(self, offset: str) -> None:
+        """Atomically replace the checkpoint, so a crash never leaves a broken file."""
+        self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.checkpoint_file.with_name(self.checkpoint_file.name + '.tmp')
+        tmp_file.write_text(json.dumps({'offset': offset}), encoding='utf-8')
+        tmp_file.replace(self.checkpoint_file)
+
+    def clear(self) -> None:
+        """Invalidate the checkpoint (e.g. when the whole run is completed)."""
+        self.checkpoint_file.unlink(missing_ok=True)
@@ -1,10 +1,15 @@
 """Implementation of a post cache using SQLAlchemy + SQLite local database."""
 
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from sqlite3 import Connection as SQLiteConnection
 from types import TracebackType
 
-from sqlalchemy import String, create_engine, text
+from sqlalchemy import Engine, String, create_engine, event, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import DatabaseError, OperationalError
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, sessionmaker
 
@@ -46,6 +51,38 @@ class _PostCacheEntryModel(Base):
     )
 
 
+class _PostIndexEntryModel(Base):
+    """Internal sqlite table with what the author index shows for every post"""
+
+    __tablename__ = 'post_index'
+
+    post_uuid: Mapped[str] = mapped_column(String, primary_key=True)
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    # Name of the post directory under the author directory
+    directory: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[str] = mapped_column(String, nullable=False)  # ISO 8601
+    has_html: Mapped[bool] = mapped_column(default=True, nullable=False)
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedPost:
+    """Downloaded post as it's shown in the author index."""
+
+    uuid: str
+    title: str
+    directory: str
+    created_at: datetime
+    has_html: bool = True  # post.html exists (post_content was downloaded)
+
+
+@dataclass(slots=True)
+class _CachedPostState:
+    """Compact in-memory copy of a single cache row."""
+
+    updated_at: datetime
+    downloaded: frozenset[DownloadContentTypeFilter]
+
+
 class SQLitePostCache:
     """
     Post cache using SQLite with SQLAlchemy.
@@ -55,10 +92,24 @@ class SQLitePostCache:
 
     Caching mechanism is smart enough to determine which specific parts are up-to-date
     and which are not.
+
+    The whole table is loaded into memory once on start, so lookups don't touch the database,
+    and writes go to both the memory view and the database.
+
+    Database works in WAL mode and commits are grouped (by count or time window),
+    so syncing many small posts doesn't pay fsync latency for each of them.
+    Pending changes are always flushed on close.
     """
 
     DEFAULT_CACHE_FILENAME = 'post_cache.db'
 
+    # WAL + NORMAL is still safe against app crashes, only the last commits can be lost on power loss
+    _SQLITE_PRAGMAS = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA mmap_size={64 * 1024 * 1024}',
+    )
+
     def __enter__(self) -> 'SQLitePostCache':
         """Create a context manager for the SQLitePostCache."""
         return self
@@ -72,7 +123,13 @@ class SQLitePostCache:
         """Ensure that the database connection is closed when exiting the context."""
         self.close()
 
-    def __init__(self, destination: Path, logger: RichLogger) -> None:
+    def __init__(
+        self,
+        destination: Path,
+        logger: RichLogger,
+        commit_every: int = 20,
+        commit_interval_seconds: float = 5.0,
+    ) -> None:
         """Make a connection with the SQLite database and create/init it if necessary."""
         self.logger = logger
 
@@ -80,13 +137,21 @@ class SQLitePostCache:
         self.db_file: Path = self.destination / self.DEFAULT_CACHE_FILENAME
         self.db_file.parent.mkdir(parents=True, exist_ok=True)
 
-        self.engine = create_engine(f'sqlite:///{self.db_file}')
+        self.engine = self._create_engine()
         Base.metadata.create_all(self.engine)
 
         self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
         self.session: Session = self.Session()
         self._dirty = False
 
+        self._commit_every = commit_every
+        self._commit_interval_seconds = commit_interval_seconds
+        self._pending_commits = 0
+        self._last_commit_time = time.monotonic()
+
+        self._entries: dict[str, _CachedPostState] = {}
+        self._load_entries()
+
     def _check_db_integrity(self) -> bool:
         """Check if post_cache table is available and the db itself is accessible."""
         try:
@@ -99,17 +164,33 @@ class SQLitePostCache:
         else:
             return True
 
+    def _create_engine(self) -> Engine:
+        engine = create_engine(f'sqlite:///{self.db_file}')
+
+        @event.listens_for(engine, 'connect')
+        def _set_pragmas(dbapi_connection: SQLiteConnection, _: object) -> None:  # pyright: ignore[reportUnusedFunction]
+            cursor = dbapi_connection.cursor()
+            for pragma in self._SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+            cursor.close()
+
+        return engine
+
     def _reinitialize_db(self) -> None:
         """Reinitialize the database (recreate it from scratch) and recreate session."""
         self.session.close()
         self.engine.dispose()
 
-        if self.db_file.exists():
-            self.db_file.unlink()  # Remove the corrupted file
+        # Remove the corrupted file together with its WAL leftovers
+        for suffix in ('', '-wal', '-shm'):
+            self.db_file.with_name(self.db_file.name + suffix).unlink(missing_ok=True)
 
-        self.engine = create_engine(f'sqlite:///{self.db_file}')
+        self.engine = self._create_engine()
         Base.metadata.create_all(self.engine)
+        self.Session.configure(bind=self.engine)
         self.session = self.Session()
+        self._dirty = False
+        self._pending_commits = 0
 
     def _ensure_valid(self) -> None:
         """Maintenance method to ensure the database is valid before use."""
@@ -119,18 +200,71 @@ class SQLitePostCache:
             )
             self._reinitialize_db()
 
+    def _load_entries(self) -> None:
+        """Check the database once and load all the cached posts into memory."""
+        self._ensure_valid()
+
+        columns = (
+            _PostCacheEntryModel.post_uuid,
+            _PostCacheEntryModel.last_updated_timestamp,
+            _PostCacheEntryModel.files_downloaded,
+            _PostCacheEntryModel.post_content_downloaded,
+            _PostCacheEntryModel.external_videos_downloaded,
+            _PostCacheEntryModel.boosty_videos_downloaded,
+        )
+
+        self._entries = {}
+        for (
+            post_uuid,
+            last_updated,
+            files,
+            post_content,
+            external_videos,
+            boosty_videos,
+        ) in self.session.execute(select(*columns)):
+            downloaded = {
+                DownloadContentTypeFilter.files: files,
+                DownloadContentTypeFilter.post_content: post_content,
+                DownloadContentTypeFilter.external_videos: external_videos,
+                DownloadContentTypeFilter.boosty_videos: boosty_videos,
+            }
+            self._entries[post_uuid] = _CachedPostState(
+                updated_at=datetime.fromisoformat(last_updated),
+                downloaded=frozenset(part for part, done in downloaded.items() if done),
+            )
+
     def commit(self) -> None:
         """
-        Commit any pending changes to the database if there are modifications.
+        Request a commit of pending changes, grouping them with the following ones.
 
         This method should be called after making changes to the database (e.g., adding,
-        updating, or deleting records) to ensure that the changes are persisted.
+        updating, or deleting records). Changes are actually committed once `commit_every`
+        requests are accumulated or `commit_interval_seconds` passed since the last commit.
+        Use `flush` to commit immediately.
+        """
+        if not self._dirty:
+            return
+
+        self._pending_commits += 1
+        window_elapsed = (
+            time.monotonic() - self._last_commit_time >= self._commit_interval_seconds
+        )
+        if self._pending_commits >= self._commit_every or window_elapsed:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Commit any pending changes to the database immediately if there are modifications.
+
         The `_dirty` flag is used to track whether there are uncommitted changes.
         """
         if self._dirty:
             self.session.commit()
             self._dirty = False
 
+        self._pending_commits = 0
+        self._last_commit_time = time.monotonic()
+
     def cache(
         self,
         post_uuid: str,
@@ -138,47 +272,95 @@ class SQLitePostCache:
         was_downloaded: list[DownloadContentTypeFilter],
     ) -> None:
         """Cache a post by its UUID and updated_at timestamp."""
-        self._ensure_valid()
+        # If post already existed - just update False fields to True.
+        entry = self._entries.get(post_uuid)
+        downloaded = frozenset(was_downloaded)
+        if entry:
+            downloaded |= entry.downloaded
 
-        entry = self.session.get(_PostCacheEntryModel, post_uuid)
+        self._store(post_uuid, updated_at, downloaded)
 
-        files_downloaded = DownloadContentTypeFilter.files in was_downloaded
-        boosty_videos_downloaded = (
-            DownloadContentTypeFilter.boosty_videos in was_downloaded
-        )
-        post_content_downloaded = (
-            DownloadContentTypeFilter.post_content in was_downloaded
+    def forget_parts(
+        self,
+        post_uuid: str,
+        parts: Iterable[DownloadContentTypeFilter],
+    ) -> None:
+        """Mark parts of the cached post as not downloaded, so they are downloaded again."""
+        entry = self._entries.get(post_uuid)
+        if entry is None:
+            return
+
+        self._store(post_uuid, entry.updated_at, entry.downloaded - frozenset(parts))
+
+    def _store(
+        self,
+        post_uuid: str,
+        updated_at: datetime,
+        downloaded: frozenset[DownloadContentTypeFilter],
+    ) -> None:
+        self._entries[post_uuid] = _CachedPostState(
+            updated_at=updated_at,
+            downloaded=downloaded,
         )
-        external_videos_downloaded = (
-            DownloadContentTypeFilter.external_videos in was_downloaded
+
+        values = {
+            'last_updated_timestamp': updated_at.isoformat(),
+            'files_downloaded': DownloadContentTypeFilter.files in downloaded,
+            'boosty_videos_downloaded': (
+                DownloadContentTypeFilter.boosty_videos in downloaded
+            ),
+            'post_content_downloaded': (
+                DownloadContentTypeFilter.post_content in downloaded
+            ),
+            'external_videos_downloaded': (
+                DownloadContentTypeFilter.external_videos in downloaded
+            ),
+        }
+        # Single upsert instead of SELECT + INSERT/UPDATE
+        self.session.execute(
+            sqlite_insert(_PostCacheEntryModel)
+            .values(post_uuid=post_uuid, **values)
+            .on_conflict_do_update(index_elements=['post_uuid'], set_=values)
         )
 
-        # If post already existed - just update False fields to True.
-        if entry:
-            entry.last_updated_timestamp = updated_at.isoformat()
-            entry.files_downloaded = files_downloaded or entry.files_downloaded
-            entry.boosty_videos_downloaded = (
-                boosty_videos_downloaded or entry.boosty_videos_downloaded
-            )
-            entry.post_content_downloaded = (
-                post_content_downloaded or entry.post_content_downloaded
-            )
-            entry.external_videos_downloaded = (
-                external_videos_downloaded or entry.external_videos_downloaded
-            )
-        else:
-            entry = _PostCacheEntryModel(
-                post_uuid=post_uuid,
-                last_updated_timestamp=updated_at.isoformat(),
-                files_downloaded=files_downloaded,
-                boosty_videos_downloaded=boosty_videos_downloaded,
-                post_content_downloaded=post_content_downloaded,
-                external_videos_downloaded=external_videos_downloaded,
-            )
-            self.session.add(entry)
+        self._dirty = True
 
+    def get_downloaded_post_uuids(self, part: DownloadContentTypeFilter) -> set[str]:
+        """Return UUIDs of all the cached posts with the given part downloaded."""
+        return {
+            post_uuid
+            for post_uuid, entry in self._entries.items()
+            if part in entry.downloaded
+        }
+
+    def index_post(self, post: IndexedPost) -> None:
+        """Store (or update) the post in the author index table, committed as the cache is."""
+        values = {
+            'title': post.title,
+            'directory': post.directory,
+            'created_at': post.created_at.isoformat(),
+            'has_html': post.has_html,
+        }
+        self.session.execute(
+            sqlite_insert(_PostIndexEntryModel)
+            .values(post_uuid=post.uuid, **values)
+            .on_conflict_do_update(index_elements=['post_uuid'], set_=values)
+        )
         self._dirty = True
 
+    def get_indexed_posts(self) -> list[IndexedPost]:
+        """Return all the posts of the author index table."""
+        return [
+            IndexedPost(
+                uuid=row.post_uuid,
+                title=row.title,
+                directory=row.directory,
+                created_at=datetime.fromisoformat(row.created_at),
+                has_html=row.has_html,
+            )
+            for row in self.session.scalars(select(_PostIndexEntryModel))
+        ]
+
     def get_missing_parts(
         self,
         post_uuid: str,
@@ -191,43 +373,38 @@ class SQLitePostCache:
         Returns all required parts if the post is missing or outdated; otherwise, returns only those parts that haven't been
         downloaded yet based on the current cache state.
         """
-        self._ensure_valid()
-        post = self.session.get(_PostCacheEntryModel, post_uuid)
+        post = self._entries.get(post_uuid)
         if not post:
             return required
 
         # If cached post is outdated in general, just mark all required parts as missing.
-        if datetime.fromisoformat(post.last_updated_timestamp) < updated_at:
+        if post.updated_at < updated_at:
             return required
 
-        missing: list[DownloadContentTypeFilter] = [
-            part
-            for part in required
-            if (
-                (part is DownloadContentTypeFilter.files and not post.files_downloaded)
-                or (
-                    part is DownloadContentTypeFilter.boosty_videos
-                    and not post.boosty_videos_downloaded
-                )
-                or (
-                    part is DownloadContentTypeFilter.external_videos
-                    and not post.external_videos_downloaded
-                )
-                or (
-                    part is DownloadContentTypeFilter.post_content
-                    and not post.post_content_downloaded
-                )
-            )
-        ]
+        return [part for part in required if part not in post.downloaded]
+
+    def get_missing_parts_many(
+        self,
+        posts: Iterable[tuple[str, datetime]],
+        required: list[DownloadContentTypeFilter],
+    ) -> dict[str, list[DownloadContentTypeFilter]]:
+        """
+        Bulk version of `get_missing_parts` for (post_uuid, updated_at) pairs, e.g. for a whole page.
 
-        return missing
+        Returns missing parts for every given post UUID.
+        """
+        return {
+            post_uuid: self.get_missing_parts(post_uuid, updated_at, required)
+            for post_uuid, updated_at in posts
+        }
 
     def remove_cache_completely(self) -> None:
         """Reinitialize the cache completely in case if user wants to start fresh."""
         self._reinitialize_db()
+        self._entries = {}
 
     def close(self) -> None:
         """Save and close the database connection."""
-        self.commit()
+        self.flush()
         self.session.close()
         self.engine.dispose()
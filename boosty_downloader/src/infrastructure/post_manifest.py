@@ -0,0 +1,173 @@
+"""
+Per-post manifest of downloaded files.
+
+Every post directory gets `manifest.json` with size and SHA-256 of each downloaded file,
+so the archive can be verified later without any network requests.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from enum import Enum
+from pathlib import Path, PurePosixPath
+
+from yarl import URL
+
+MANIFEST_FILENAME = 'manifest.json'
+_HASH_CHUNK_SIZE = 1048576  # 1 MiB
+
+
+class FileIntegrity(Enum):
+    """Result of checking a file against its manifest entry."""
+
+    ok = 'ok'
+    missing = 'missing'
+    damaged = 'damaged'
+
+
+@dataclass
+class ManifestEntry:
+    """Downloaded file as it was written to the disk."""
+
+    path: str  # POSIX path relative to the post directory
+    size: int
+    sha256: str | None  # None if content wasn't hashed (e.g. external videos)
+    url: str  # Source url without query, signed query parts shouldn't be stored
+    etag: str | None = None
+
+    @staticmethod
+    def source_url(url: str) -> str:
+        """Strip query (signatures, tokens) from the source url."""
+        return str(URL(url).with_query(None))
+
+
+@dataclass
+class PostManifest:
+    """All the files downloaded for a single post, by their relative paths."""
+
+    post_uuid: str
+    updated_at: datetime  # Version of the post the files were downloaded for
+    title: str = ''  # Original post title (directory name is sanitized and shortened)
+    created_at: datetime | None = None
+    entries: dict[str, ManifestEntry] = field(default_factory=dict[str, ManifestEntry])
+
+    @classmethod
+    def load(cls, post_directory: Path) -> PostManifest | None:
+        """Load manifest of the post directory, None if it's missing or broken."""
+        try:
+            raw = json.loads(
+                (post_directory / MANIFEST_FILENAME).read_text(encoding='utf-8')
+            )
+            entries = [ManifestEntry(**entry) for entry in raw['files']]
+            return cls(
+                post_uuid=raw['post_uuid'],
+                updated_at=datetime.fromisoformat(raw['updated_at']),
+                title=raw.get('title', ''),
+                created_at=(
+                    datetime.fromisoformat(raw['created_at'])
+                    if raw.get('created_at')
+                    else None
+                ),
+                entries={entry.path: entry for entry in entries},
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def add(  # noqa: PLR0913 (all the recorded fields)
+        self,
+        post_directory: Path,
+        file_path: Path,
+        *,
+        url: str,
+        size: int,
+        sha256: str | None,
+        etag: str | None = None,
+    ) -> None:
+        """Record the file (which is under the post directory) in the manifest."""
+        relative_path = _relative_posix_path(post_directory, file_path)
+        self.entries[relative_path] = ManifestEntry(
+            path=relative_path,
+            size=size,
+            sha256=sha256,
+            url=ManifestEntry.source_url(url),
+            etag=etag,
+        )
+
+    def find_intact(
+        self, post_directory: Path, file_path: Path
+    ) -> ManifestEntry | None:
+        """
+        Return the entry of the file if it's still on the disk with the recorded size.
+
+        It's a cheap check (no hashing), full one is done by `check_file`.
+        """
+        entry = self.entries.get(_relative_posix_path(post_directory, file_path))
+        if entry is None:
+            return None
+        try:
+            size = file_path.stat().st_size
+        except OSError:
+            return None
+        return entry if size == entry.size else None
+
+    def save(self, post_directory: Path) -> None:
+        """Atomically write the manifest into the post directory."""
+        manifest_file = post_directory / MANIFEST_FILENAME
+        tmp_file = manifest_file.with_name(manifest_file.name + '.tmp')
+        tmp_file.write_text(
+            json.dumps(
+                {
+                    'post_uuid': self.post_uuid,
+                    'updated_at': self.updated_at.isoformat(),
+                    'title': self.title,
+                    'created_at': (
+                        self.created_at.isoformat() if self.created_at else None
+                    ),
+                    'files': [asdict(entry) for entry in self.entries.values()],
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding='utf-8',
+        )
+        tmp_file.replace(manifest_file)
+
+
+def _relative_posix_path(post_directory: Path, file_path: Path) -> str:
+    return PurePosixPath(file_path.relative_to(post_directory)).as_posix()
+
+
+def check_file(post_directory: Path, entry: ManifestEntry) -> FileIntegrity:
+    """
+    Check the file against its manifest entry.
+
+    Size is compared first, so truncated files are found without reading them.
+    It's blocking, run it in a thread to check many files in parallel.
+    """
+    file_path = post_directory / entry.path
+    try:
+        size = file_path.stat().st_size
+    except OSError:
+        return FileIntegrity.missing
+
+    if size != entry.size:
+        return FileIntegrity.damaged
+    if entry.sha256 is None:
+        return FileIntegrity.ok
+
+    digest = hashlib.sha256()
+    try:
+        with file_path.open('rb') as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                digest.update(chunk)
+    except OSError:
+        return FileIntegrity.damaged
+
+    return (
+        FileIntegrity.ok
+        if digest.hexdigest() == entry.sha256
+        else FileIntegrity.damaged
+    )
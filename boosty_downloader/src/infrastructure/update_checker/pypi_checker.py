@@ -40,11 +40,16 @@ class CheckFailed:
 
 UpdateResult = UpdateAvailable | NoUpdate | CheckFailed
 
+PYPI_TIMEOUT_SECONDS = 5.0  # The check is optional, it mustn't hold the app on exit
+
 
 def get_pypi_latest_version(package_name: str) -> str | None:
     """Fetch the latest version string of a package from PyPI."""
     try:
-        with urlopen(f'https://pypi.org/pypi/{package_name}/json') as resp:
+        with urlopen(
+            f'https://pypi.org/pypi/{package_name}/json',
+            timeout=PYPI_TIMEOUT_SECONDS,
+        ) as resp:
             data = json.load(resp)
             return data['info']['version']
     except Exception:  # noqa: BLE001 It doesn't matter what exception is raised, we just need to 100% catch it
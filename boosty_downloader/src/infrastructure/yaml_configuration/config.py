@@ -32,6 +32,13 @@ class AuthSettings(BaseModel):
     auth_header: str = Field(default='', min_length=1)
 
 
+class BatchSettings(BaseModel):
+    """Authors downloaded together in a single process (`--batch`)"""
+
+    authors: list[str] = []
+    parallel_authors: int = Field(default=2, ge=1)
+
+
 CONFIG_LOCATION: Path = Path('config.yaml')
 
 
@@ -45,6 +52,7 @@ class Config(BaseSettings):
 
     auth: AuthSettings = AuthSettings()
     downloading_settings: DownloadSettings = DownloadSettings()
+    batch: BatchSettings = BatchSettings()
 
     @classmethod
     def settings_customise_sources(
@@ -7,4 +7,9 @@ auth:
   auth_header: ''
 downloading_settings:
   target_directory: ./boosty-downloads
+batch:
+  # Authors to download with `--batch` (one process, shared connection and download limits)
+  authors: []
+  # How many of them are downloaded at the same time
+  parallel_authors: 2
 """
@@ -0,0 +1,487 @@
+"""
+The whole CLI flow: preparing the app environment and running the use cases.
+
+It's imported by the entry point only when the command is actually run,
+so `--help` and argument errors don't pay for importing aiohttp, SQLAlchemy and yt-dlp.
+The download flow (post cache, renderers, author index) is imported by the branches
+which run it, so `--only-check-total` and `--clean-cache` don't load it either.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.metadata
+import signal
+from contextlib import contextmanager
+from functools import partial
+from typing import TYPE_CHECKING
+
+import aiohttp
+from aiohttp.client_exceptions import ClientConnectorDNSError
+from aiohttp_retry import ExponentialRetry
+
+from boosty_downloader.src.application.di.app_environment import AppEnvironment
+from boosty_downloader.src.application.filtering import DownloadContentTypeFilter
+from boosty_downloader.src.application.use_cases.check_total_posts import (
+    ReportTotalPostsCountUseCase,
+)
+from boosty_downloader.src.application.use_cases.download_authors_batch import (
+    DownloadAuthorsBatchUseCase,
+)
+from boosty_downloader.src.application.use_cases.sync_daemon import SyncDaemonUseCase
+from boosty_downloader.src.infrastructure.boosty_api.core.client import (
+    BoostyAPINoUsernameError,
+    BoostyAPIUnauthorizedError,
+    BoostyAPIUnknownError,
+    BoostyAPIValidationError,
+)
+from boosty_downloader.src.infrastructure.boosty_api.utils.auth_parsers import (
+    parse_auth_header,
+    parse_session_cookie,
+)
+from boosty_downloader.src.infrastructure.loggers import logger_instances
+from boosty_downloader.src.infrastructure.update_checker.pypi_checker import (
+    CheckFailed,
+    NoUpdate,
+    UpdateAvailable,
+    UpdateResult,
+    check_for_updates,
+)
+from boosty_downloader.src.infrastructure.yaml_configuration.config import init_config
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+    from pathlib import Path
+
+    from boosty_downloader.src.application.di.download_context import DownloadContext
+    from boosty_downloader.src.application.filtering import VideoQualityOption
+    from boosty_downloader.src.application.use_cases.sync_daemon import PollSchedule
+    from boosty_downloader.src.infrastructure.content_store import LinkMode
+    from boosty_downloader.src.interfaces.cli_options import PostUrlOption
+    from boosty_downloader.src.interfaces.console_progress_reporter import (
+        ProgressReporter,
+    )
+
+GITHUB_ISSUES_URL = 'https://github.com/Glitchy-Sheep/boosty-downloader/issues'
+
+
+def show_start_summary(
+    pr: ProgressReporter,
+    destination_directory: Path,
+    content_type_filter: list[DownloadContentTypeFilter],
+) -> None:
+    """Just simple review before start downloading"""
+    pr.info(
+        f'[italic]Destination directory[/italic]: [bold green]{destination_directory}[/bold green]'
+    )
+    pr.info(
+        '--------------------------------------------------------------------------\n'
+        'Script will download: [bold green]'
+        + ', '.join(str(item.name) for item in content_type_filter)
+        + '[/bold green]\n'
+        '--------------------------------------------------------------------------\n'
+    )
+    pr.notice(
+        'You can safely interrupt the download at any time with [bold yellow]Ctrl+C[/bold yellow].\n'
+    )
+    if DownloadContentTypeFilter.external_videos in content_type_filter:
+        pr.notice(
+            'Progress bar for external videos downloadings can be glitchy, because yt-dlp downloads them by chunks.\n'
+            "If you see strange progress movement that's normal in most cases, just be patient.\n"
+        )
+
+
+async def verify_downloads(app_environment: AppEnvironment.Environment) -> None:
+    """Verify downloaded files and report which of them will be downloaded again."""
+    from boosty_downloader.src.application.use_cases.verify_downloads import (  # noqa: PLC0415 (lazy import)
+        VerifyDownloadsUseCase,
+    )
+
+    report = await VerifyDownloadsUseCase(
+        destination=app_environment.destination_directory,
+        post_cache=app_environment.post_cache,
+        progress_reporter=app_environment.progress_reporter,
+        content_store=app_environment.content_store,
+    ).execute()
+    app_environment.progress_reporter.info(
+        f'Verified {report.checked} files: '
+        f'{len(report.damaged)} damaged, {len(report.missing)} missing'
+    )
+    if report.damaged or report.missing:
+        app_environment.progress_reporter.log_list(
+            'Queued for re-download', report.damaged + report.missing
+        )
+
+
+def report_download_stats(app_environment: AppEnvironment.Environment) -> None:
+    """Report download queue and API rate metrics at the end of the run."""
+    queue_stats = app_environment.download_scheduler.stats()
+    app_environment.progress_reporter.info(
+        f'Download queue: {queue_stats.total_jobs} downloads, '
+        f'peak depth {queue_stats.peak_queued}, '
+        f'average wait {queue_stats.average_wait_seconds:.1f}s, '
+        f'max wait {queue_stats.max_wait_seconds:.1f}s'
+    )
+    api_rate = app_environment.boosty_api_client.current_request_rate
+    if api_rate is not None:
+        app_environment.progress_reporter.info(
+            f'API request rate at the end: {api_rate:.2f} requests/s'
+        )
+
+
+@contextmanager
+def stop_on_signals(
+    request_stop: Callable[[], None], pr: ProgressReporter
+) -> Generator[None, None, None]:
+    """
+    Request graceful stop on the first SIGINT/SIGTERM, the next one works as usual.
+
+    Signal handlers aren't supported on Windows, so Ctrl+C stops right away there.
+    """
+    loop = asyncio.get_running_loop()
+    installed: list[signal.Signals] = []
+
+    def on_signal() -> None:
+        for sig in installed:
+            loop.remove_signal_handler(sig)
+        pr.notice(
+            'Stopping after the running polls are finished, '
+            'press [bold yellow]Ctrl+C[/bold yellow] again to stop right now'
+        )
+        request_stop()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, on_signal)
+        except NotImplementedError:
+            break
+        installed.append(sig)
+
+    try:
+        yield
+    finally:
+        for sig in installed:
+            loop.remove_signal_handler(sig)
+
+
+def report_update_check(update_check: asyncio.Task[UpdateResult]) -> None:
+    """Notify the user about the result of the background update check."""
+    if update_check.cancelled():
+        return  # The app finished before PyPI answered
+
+    result = update_check.result()
+    match result:
+        case UpdateAvailable():
+            logger_instances.downloader_logger.warning(
+                f'🔔 [bold green]Update available[/bold green]: {result.latest_version} (current: {result.current_version})'
+            )
+            logger_instances.downloader_logger.warning(
+                'You can update with --> [bold]pip install -U boosty-downloader[/bold]'
+            )
+            logger_instances.downloader_logger.warning(
+                'But first, please check the changelog for breaking changes\n'
+            )
+        case NoUpdate():
+            logger_instances.downloader_logger.info(
+                'You are using the latest boosty-downloader version.\n'
+            )
+        case CheckFailed():
+            logger_instances.downloader_logger.error(
+                'Failed to check for updates, please check it manually.\n'
+            )
+
+
+async def typer_cmd_handler(  # noqa: PLR0913, PLR0915, C901 (the whole CLI flow with typer arguments)
+    *,
+    username: str | None,
+    batch: bool,
+    post_url: PostUrlOption | None,
+    check_total_count: bool,
+    clean_cache: bool,
+    incremental: bool,
+    incremental_stop_after: int,
+    resume: bool,
+    verify: bool,
+    build_index: bool,
+    content_type_filter: list[DownloadContentTypeFilter],
+    preferred_video_quality: VideoQualityOption,
+    dedup_link_mode: LinkMode | None,
+    request_delay_seconds: float,
+    min_request_delay_seconds: float,
+    post_concurrency: int,
+    prefetch_pages: int,
+    chunk_concurrency: int,
+    max_downloads: int,
+    max_downloads_per_host: int,
+    download_segments: int,
+    video_min_speed: int,
+    external_videos_parallel: int,
+    destination_directory: Path | None,
+    poll_schedule: PollSchedule | None = None,
+) -> None:
+    """Download all posts from the specified user (or keep polling with `poll_schedule`)"""
+    config = init_config()
+
+    cookie_string = config.auth.cookie
+    auth_header = config.auth.auth_header
+
+    # Set the destination directory if provided
+    if destination_directory is not None:
+        config.downloading_settings.target_directory = destination_directory
+
+    retry_options = ExponentialRetry(
+        attempts=5,
+        exceptions={
+            aiohttp.ClientConnectorError,
+            aiohttp.ClientOSError,
+            aiohttp.ServerDisconnectedError,
+            aiohttp.ClientResponseError,
+            aiohttp.ClientConnectionError,
+        },
+    )
+
+    # --------------------------------------------------------------------------
+    # Check for updates and notify the user
+    # It's a blocking request to PyPI, so it runs in a thread while the app starts
+    update_check = asyncio.create_task(
+        asyncio.to_thread(
+            check_for_updates,
+            importlib.metadata.version('boosty-downloader'),
+            'boosty-downloader',
+        )
+    )
+    update_check.add_done_callback(report_update_check)
+
+    # --------------------------------------------------------------------------
+    # Prepare app environment and start the task
+    use_config_authors = batch or (poll_schedule is not None and not username)
+    authors = config.batch.authors if use_config_authors else [username or '']
+    if not authors:
+        logger_instances.downloader_logger.error(
+            'No authors to download, list them in `batch.authors` of the config file'
+        )
+        return
+
+    environment = AppEnvironment(
+        config=AppEnvironment.AppConfig(
+            author_name=authors[0],
+            target_directory=config.downloading_settings.target_directory.absolute(),
+            boosty_headers=parse_auth_header(auth_header),
+            boosty_cookies_jar=parse_session_cookie(cookie_string),
+            retry_options=retry_options,
+            request_delay_seconds=request_delay_seconds,
+            min_request_delay_seconds=min_request_delay_seconds,
+            logger=logger_instances.downloader_logger,
+            external_videos_parallel_downloads=external_videos_parallel,
+            max_parallel_downloads=max_downloads,
+            max_parallel_downloads_per_host=max_downloads_per_host,
+            content_store_link_mode=dedup_link_mode,
+            build_index=build_index,
+        )
+    )
+
+    def create_download_context(
+        author_environment: AppEnvironment.Environment, author_name: str
+    ) -> DownloadContext:
+        from boosty_downloader.src.application.di.download_context import (  # noqa: PLC0415 (lazy import)
+            DownloadContext,
+        )
+        from boosty_downloader.src.infrastructure.host_failover import (  # noqa: PLC0415 (lazy import)
+            ThroughputFloor,
+        )
+        from boosty_downloader.src.infrastructure.loggers.failed_downloads_logger import (  # noqa: PLC0415 (lazy import)
+            FailedDownloadsLogger,
+        )
+
+        return DownloadContext(
+            author_name=author_name,
+            downloader_session=author_environment.downloading_retry_client,
+            external_videos_downloader=author_environment.external_videos_downloader,
+            filters=content_type_filter,
+            post_cache=author_environment.post_cache,
+            preferred_video_quality=preferred_video_quality.to_ok_video_type(),
+            progress_reporter=author_environment.progress_reporter,
+            failed_logger=FailedDownloadsLogger(
+                log_file_path=author_environment.destination_directory
+                / 'failed_downloads.log',
+            ),
+            download_scheduler=author_environment.download_scheduler,
+            download_segments=download_segments,
+            video_throughput_floor=(
+                ThroughputFloor(bytes_per_second=video_min_speed * 1024)
+                if video_min_speed
+                else None
+            ),
+            chunk_concurrency=chunk_concurrency,
+            content_store=author_environment.content_store,
+            author_index=author_environment.author_index,
+        )
+
+    async def download_all_posts(author_name: str, *, polling: bool = False) -> None:
+        """Sync posts of the author, daemon polls only check posts newer than the cached ones."""
+        from boosty_downloader.src.application.use_cases.download_all_posts import (  # noqa: PLC0415 (lazy import)
+            DownloadAllPostUseCase,
+        )
+
+        with environment.open_author(author_name) as author_environment:
+            # Integrity check, broken files are downloaded by the sync below
+            if verify and not polling:
+                await verify_downloads(author_environment)
+
+            await DownloadAllPostUseCase(
+                author_name=author_name,
+                boosty_api=author_environment.boosty_api_client,
+                destination=author_environment.destination_directory,
+                download_context=create_download_context(
+                    author_environment, author_name
+                ),
+                post_concurrency=post_concurrency,
+                prefetch_pages=prefetch_pages,
+                stop_after_cached_posts=(
+                    incremental_stop_after if incremental or polling else None
+                ),
+                # Incremental runs and daemon polls must not touch the checkpoint of a full run,
+                # a resumed incremental run moves it forward, but never clears it
+                checkpoint=(
+                    author_environment.pagination_checkpoint
+                    if resume or not (incremental or polling)
+                    else None
+                ),
+                resume=resume,
+            ).execute()
+
+    # --------------------------------------------------------------------------
+    # Total Checker (doesn't need the cache, so it's not opened)
+    if check_total_count:
+        async with environment.boosty_api_only() as boosty_api_client:
+            await ReportTotalPostsCountUseCase(
+                author_name=authors[0],
+                logger=logger_instances.downloader_logger,
+                boosty_api=boosty_api_client,
+            ).execute()
+        return
+
+    async with environment as app_environment:
+        # ------------------------------------------------------------------
+        # Keep polling the authors until stopped
+        if poll_schedule is not None:
+            daemon = SyncDaemonUseCase(
+                authors=authors,
+                poll_author=partial(download_all_posts, polling=True),
+                progress_reporter=app_environment.progress_reporter,
+                schedule=poll_schedule,
+                parallel_authors=config.batch.parallel_authors,
+            )
+            with stop_on_signals(
+                daemon.request_stop, app_environment.progress_reporter
+            ):
+                await daemon.execute()
+            report_download_stats(app_environment)
+            return
+
+        # ------------------------------------------------------------------
+        # Download all the authors of the config in a single process
+        if batch:
+            show_start_summary(
+                pr=app_environment.progress_reporter,
+                destination_directory=environment.target_directory,
+                content_type_filter=content_type_filter,
+            )
+            failed_authors = await DownloadAuthorsBatchUseCase(
+                authors=authors,
+                download_author=download_all_posts,
+                progress_reporter=app_environment.progress_reporter,
+                parallel_authors=config.batch.parallel_authors,
+            ).execute()
+            if failed_authors:
+                app_environment.progress_reporter.log_list(
+                    'Failed authors', failed_authors
+                )
+            report_download_stats(app_environment)
+            return
+
+        # ------------------------------------------------------------------
+        # Cache cleaning
+        if clean_cache:
+            app_environment.post_cache.remove_cache_completely()
+            app_environment.pagination_checkpoint.clear()
+            logger_instances.downloader_logger.success(
+                f'Cache for {username} has been cleaned successfully'
+            )
+            return
+
+        # ------------------------------------------------------------------
+        # Download specific post by URL
+        if post_url is not None:
+            from boosty_downloader.src.application.use_cases.download_specific_post import (  # noqa: PLC0415 (lazy import)
+                DownloadPostByUrlUseCase,
+            )
+
+            if verify:
+                await verify_downloads(app_environment)
+            await DownloadPostByUrlUseCase(
+                post_url=post_url,
+                boosty_api=app_environment.boosty_api_client,
+                destination=app_environment.destination_directory,
+                download_context=create_download_context(app_environment, authors[0]),
+            ).execute()
+            return
+
+        # ------------------------------------------------------------------
+        # Download all posts
+
+        show_start_summary(
+            pr=app_environment.progress_reporter,
+            destination_directory=app_environment.destination_directory,
+            content_type_filter=content_type_filter,
+        )
+        await download_all_posts(authors[0])
+        report_download_stats(app_environment)
+
+
+def report_app_error(error: Exception) -> bool:
+    """Explain the error which stopped the app to the user, tell whether it's a known one."""
+    # Cache errors can only come from the download flow, which has already imported SQLAlchemy
+    from sqlalchemy.exc import (  # noqa: PLC0415 (lazy import)
+        DatabaseError,
+        IntegrityError,
+        OperationalError,
+    )
+
+    match error:
+        case BoostyAPINoUsernameError():
+            logger_instances.downloader_logger.error('Username not found')
+        case BoostyAPIUnauthorizedError():
+            logger_instances.downloader_logger.error(
+                'Unauthorized: Bad credentials, please relogin and update your config file'
+            )
+        case BoostyAPIUnknownError():
+            logger_instances.downloader_logger.error(
+                f'Unknown error occurred, please report this at GitHub issues of the project: {GITHUB_ISSUES_URL}'
+            )
+        case BoostyAPIValidationError():
+            logger_instances.downloader_logger.error(
+                'Boosty API returned unexpected structures, the client probably needs to be updated.\n'
+                f'Please report this at GitHub issues of the project: {GITHUB_ISSUES_URL}\n'
+                '\n'
+                f'Details: {error.errors!s}'
+            )
+        case ClientConnectorDNSError():
+            logger_instances.downloader_logger.error(
+                'Network error: Unable to connect to Boosty API, please check your internet connection.'
+            )
+        case OperationalError() | DatabaseError() | IntegrityError():
+            logger_instances.downloader_logger.error('⚠️  Cache Error!\n' + str(error))
+            logger_instances.downloader_logger.warning(
+                'Cache format may be outdated after application update.'
+            )
+            logger_instances.downloader_logger.info(
+                '👉 You can clean outdated cache with --clean-cache flag'
+            )
+            logger_instances.downloader_logger.info(
+                '👉 If this will still happen - please report it at GitHub issues:'
+            )
+            logger_instances.downloader_logger.info(f'👉 {GITHUB_ISSUES_URL}')
+        case _:
+            return False
+    return True
@@ -9,14 +9,15 @@ from boosty_downloader.src.application.filtering import (
     DownloadContentTypeFilter,
     VideoQualityOption,
 )
+from boosty_downloader.src.infrastructure.content_store import LinkMode
 from boosty_downloader.src.interfaces.help_panels import HelpPanels
 
 UsernameOption = Annotated[
-    str,
+    str | None,
     typer.Option(
         '--username',
         '-u',
-        help='Username to download posts from.',
+        help='Username to download posts from (not needed with --batch).',
     ),
 ]
 
@@ -31,6 +32,99 @@ RequestDelaySecondsOption = Annotated[
     ),
 ]
 
+MinRequestDelaySecondsOption = Annotated[
+    float,
+    typer.Option(
+        '--min-request-delay-seconds',
+        help='Request delay can go down to this value while the API responds fine (it goes up on errors)',
+        min=0.5,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
+PostConcurrencyOption = Annotated[
+    int,
+    typer.Option(
+        '--post-concurrency',
+        '-j',
+        help='How many posts can be downloaded at the same time',
+        min=1,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
+PrefetchPagesOption = Annotated[
+    int,
+    typer.Option(
+        '--prefetch-pages',
+        help='How many pages of posts to request ahead while current ones are downloading (0 to disable)',
+        min=0,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
+ChunkConcurrencyOption = Annotated[
+    int,
+    typer.Option(
+        '--chunk-concurrency',
+        help='How many images/files/videos of a single post can be downloaded at the same time',
+        min=1,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
+MaxDownloadsOption = Annotated[
+    int,
+    typer.Option(
+        '--max-downloads',
+        help='How many connections downloads can open at the same time in total',
+        min=1,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
+MaxDownloadsPerHostOption = Annotated[
+    int,
+    typer.Option(
+        '--max-downloads-per-host',
+        help='How many connections downloads can open at the same time to a single host (CDN), '
+        'a segmented or HLS/DASH download holds one for each of its parallel parts',
+        min=1,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
+DownloadSegmentsOption = Annotated[
+    int,
+    typer.Option(
+        '--download-segments',
+        help='Split big files and boosty videos into N parts downloaded in parallel (1 to disable), '
+        'each of these downloads takes N of the --max-downloads-per-host slots',
+        min=1,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
+VideoMinSpeedOption = Annotated[
+    int,
+    typer.Option(
+        '--video-min-speed',
+        help='Switch boosty videos to the failover CDN host if the primary one stays slower than this, in KiB/s (0 - only on errors)',
+        min=0,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
+ExternalVideosParallelDownloadsOption = Annotated[
+    int,
+    typer.Option(
+        '--external-videos-parallel',
+        help='How many external videos (YouTube, Vimeo) can be downloaded at the same time',
+        min=1,
+        rich_help_panel=HelpPanels.network,
+    ),
+]
+
 
 ContentTypeFilterOption = Annotated[
     list[DownloadContentTypeFilter] | None,
@@ -56,6 +150,25 @@ PreferredVideoQualityOption = Annotated[
     ),
 ]
 
+DeduplicateOption = Annotated[
+    bool,
+    typer.Option(
+        '--dedup',
+        help='Store each unique image/file once per author and link repeated ones instead of downloading them again',
+        rich_help_panel=HelpPanels.filtering,
+    ),
+]
+
+DedupLinkModeOption = Annotated[
+    LinkMode,
+    typer.Option(
+        '--dedup-link-mode',
+        help='How deduplicated files appear in post directories (falls back to copy if not supported)',
+        metavar='Available options:\n- hardlink\n- reflink\n- symlink',
+        rich_help_panel=HelpPanels.filtering,
+    ),
+]
+
 PostUrlOption = Annotated[
     str | None,
     typer.Option(
@@ -78,6 +191,64 @@ CheckTotalCountOption = Annotated[
     ),
 ]
 
+IncrementalOption = Annotated[
+    bool,
+    typer.Option(
+        '--incremental',
+        '-i',
+        help='Stop paging through posts once several newest posts in a row are cached and up-to-date',
+        rich_help_panel=HelpPanels.actions,
+    ),
+]
+
+IncrementalStopAfterOption = Annotated[
+    int,
+    typer.Option(
+        '--incremental-stop-after',
+        help='How many cached and up-to-date posts in a row stop the [italic]--incremental[/italic] sync',
+        min=1,
+        rich_help_panel=HelpPanels.actions,
+    ),
+]
+
+ResumeOption = Annotated[
+    bool,
+    typer.Option(
+        '--resume',
+        '-r',
+        help='Continue interrupted full download from the last completed page instead of the newest posts',
+        rich_help_panel=HelpPanels.actions,
+    ),
+]
+
+VerifyOption = Annotated[
+    bool,
+    typer.Option(
+        '--verify',
+        help='Check downloaded files against post manifests and download damaged/missing ones again '
+        '(external videos and remuxed HLS/DASH videos are checked by size only)',
+        rich_help_panel=HelpPanels.actions,
+    ),
+]
+
+BuildIndexOption = Annotated[
+    bool,
+    typer.Option(
+        '--index',
+        help='Keep index.html with all downloaded posts of the author (paginated, with search by title)',
+        rich_help_panel=HelpPanels.actions,
+    ),
+]
+
+BatchOption = Annotated[
+    bool,
+    typer.Option(
+        '--batch',
+        help='Download all the authors listed in `batch.authors` of the config file in a single process',
+        rich_help_panel=HelpPanels.actions,
+    ),
+]
+
 CleanCacheOption = Annotated[
     bool,
     typer.Option(
@@ -101,3 +272,21 @@ DestinationDirectoryOption = Annotated[
         show_default=False,
     ),
 ]
+
+PollIntervalMinutesOption = Annotated[
+    float,
+    typer.Option(
+        '--interval-minutes',
+        help='How often every author is polled for new or updated posts',
+        min=1,
+    ),
+]
+
+MaxBackoffMinutesOption = Annotated[
+    float,
+    typer.Option(
+        '--max-backoff-minutes',
+        help='Longest delay between polls of an author which keeps failing',
+        min=1,
+    ),
+]
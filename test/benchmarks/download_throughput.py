@@ -0,0 +1,218 @@
+"""
+End-to-end throughput benchmark of `DownloadAllPostUseCase` against the local fake Boosty.
+
+Run it from the repository root:
+
+    PYTHONPATH=test python -m benchmarks.download_throughput --posts 50 --latency 0.05
+
+It reports posts/s and MB/s of a full download into a temporary directory,
+nothing is sent to the real Boosty.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiohttp
+import typer
+from aiohttp_retry import ExponentialRetry
+
+from boosty_downloader.src.application.di.app_environment import AppEnvironment
+from boosty_downloader.src.application.di.download_context import DownloadContext
+from boosty_downloader.src.application.filtering import (
+    BoostyOkVideoType,
+    DownloadContentTypeFilter,
+)
+from boosty_downloader.src.application.use_cases.download_all_posts import (
+    DownloadAllPostUseCase,
+)
+from boosty_downloader.src.infrastructure.loggers.base import RichLogger
+from boosty_downloader.src.infrastructure.loggers.failed_downloads_logger import (
+    FailedDownloadsLogger,
+)
+
+from .fake_boosty import FakeBoostyConfig, FakeBoostyServer, SyntheticPostsConfig
+
+_MEGABYTE = 1048576
+_CONTENT_DIRECTORIES = ('images', 'files', 'boosty_videos')
+
+
+@dataclass
+class DownloadSettings:
+    """Downloader knobs to compare."""
+
+    post_concurrency: int = 1
+    chunk_concurrency: int = 4
+    prefetch_pages: int = 1
+    max_downloads: int = 8
+    max_downloads_per_host: int = 4
+    download_segments: int = 1
+    request_delay_seconds: float = 0.0
+
+
+@dataclass
+class BenchmarkResult:
+    """Measured throughput of a single run."""
+
+    posts: int
+    downloaded_bytes: int
+    elapsed_seconds: float
+    api_requests: int
+    cdn_requests: int
+    injected_errors: int
+
+    @property
+    def posts_per_second(self) -> float:
+        return self.posts / self.elapsed_seconds
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.downloaded_bytes / _MEGABYTE / self.elapsed_seconds
+
+
+def _downloaded_content(author_directory: Path) -> tuple[int, int]:
+    """Count posts and bytes of their content files in the downloaded tree."""
+    posts = 0
+    downloaded_bytes = 0
+    for post_directory in author_directory.iterdir():
+        if not post_directory.is_dir() or post_directory.name.startswith('.'):
+            continue
+        posts += 1
+        for content_directory in _CONTENT_DIRECTORIES:
+            downloaded_bytes += sum(
+                file.stat().st_size
+                for file in (post_directory / content_directory).glob('*')
+                if file.is_file()
+            )
+    return posts, downloaded_bytes
+
+
+async def run_benchmark(
+    fake_config: FakeBoostyConfig,
+    settings: DownloadSettings,
+    target_directory: Path,
+) -> BenchmarkResult:
+    """Download all the posts of the fake author and measure it."""
+    logger = RichLogger('benchmark')
+    logger.console.quiet = True
+
+    async with (
+        FakeBoostyServer(fake_config) as server,
+        AppEnvironment(
+            config=AppEnvironment.AppConfig(
+                author_name=fake_config.author_name,
+                target_directory=target_directory,
+                boosty_headers={},
+                boosty_cookies_jar=aiohttp.CookieJar(),
+                retry_options=ExponentialRetry(attempts=5, start_timeout=0.05),
+                request_delay_seconds=settings.request_delay_seconds,
+                logger=logger,
+                max_parallel_downloads=settings.max_downloads,
+                max_parallel_downloads_per_host=settings.max_downloads_per_host,
+                boosty_base_url=server.base_url,
+            )
+        ) as app_environment,
+    ):
+        download_context = DownloadContext(
+            author_name=fake_config.author_name,
+            downloader_session=app_environment.downloading_retry_client,
+            external_videos_downloader=app_environment.external_videos_downloader,
+            post_cache=app_environment.post_cache,
+            filters=list(DownloadContentTypeFilter),
+            preferred_video_quality=BoostyOkVideoType.medium,
+            progress_reporter=app_environment.progress_reporter,
+            failed_logger=FailedDownloadsLogger(
+                log_file_path=app_environment.destination_directory
+                / 'failed_downloads.log',
+            ),
+            download_scheduler=app_environment.download_scheduler,
+            download_segments=settings.download_segments,
+            chunk_concurrency=settings.chunk_concurrency,
+        )
+
+        started_at = time.perf_counter()
+        await DownloadAllPostUseCase(
+            author_name=fake_config.author_name,
+            boosty_api=app_environment.boosty_api_client,
+            destination=app_environment.destination_directory,
+            download_context=download_context,
+            post_concurrency=settings.post_concurrency,
+            prefetch_pages=settings.prefetch_pages,
+        ).execute()
+        elapsed_seconds = time.perf_counter() - started_at
+
+        posts, downloaded_bytes = _downloaded_content(
+            app_environment.destination_directory
+        )
+        return BenchmarkResult(
+            posts=posts,
+            downloaded_bytes=downloaded_bytes,
+            elapsed_seconds=elapsed_seconds,
+            api_requests=server.stats.api_requests,
+            cdn_requests=server.stats.cdn_requests,
+            injected_errors=server.stats.injected_errors,
+        )
+
+
+def main(  # noqa: PLR0913 (benchmark knobs)
+    *,
+    posts: int = 20,
+    images_per_post: int = 3,
+    files_per_post: int = 1,
+    videos_per_post: int = 0,
+    image_kb: int = 256,
+    file_kb: int = 2048,
+    video_kb: int = 16384,
+    latency: float = 0.0,
+    bandwidth_kb: int | None = None,
+    error_rate: float = 0.0,
+    post_concurrency: int = 1,
+    chunk_concurrency: int = 4,
+    max_downloads: int = 8,
+    max_downloads_per_host: int = 4,
+    segments: int = 1,
+) -> None:
+    """Run the benchmark once and print posts/s and MB/s."""
+    fake_config = FakeBoostyConfig(
+        posts_count=posts,
+        posts=SyntheticPostsConfig(
+            images_per_post=images_per_post,
+            files_per_post=files_per_post,
+            videos_per_post=videos_per_post,
+        ),
+        image_size_bytes=image_kb * 1024,
+        file_size_bytes=file_kb * 1024,
+        video_size_bytes=video_kb * 1024,
+        latency_seconds=latency,
+        bandwidth_bytes_per_second=bandwidth_kb * 1024 if bandwidth_kb else None,
+        error_rate=error_rate,
+    )
+    settings = DownloadSettings(
+        post_concurrency=post_concurrency,
+        chunk_concurrency=chunk_concurrency,
+        max_downloads=max_downloads,
+        max_downloads_per_host=max_downloads_per_host,
+        download_segments=segments,
+    )
+
+    with tempfile.TemporaryDirectory(prefix='boosty-benchmark-') as target_directory:
+        result = asyncio.run(
+            run_benchmark(fake_config, settings, Path(target_directory))
+        )
+
+    typer.echo(
+        f'posts: {result.posts} in {result.elapsed_seconds:.2f}s '
+        f'({result.posts_per_second:.2f} posts/s)\n'
+        f'content: {result.downloaded_bytes / _MEGABYTE:.1f} MB '
+        f'({result.megabytes_per_second:.2f} MB/s)\n'
+        f'requests: {result.api_requests} api, {result.cdn_requests} cdn, '
+        f'{result.injected_errors} injected errors'
+    )
+
+
+if __name__ == '__main__':
+    typer.run(main)
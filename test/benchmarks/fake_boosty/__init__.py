@@ -0,0 +1,12 @@
+"""Local stand-in for Boosty API and its CDN, used by benchmarks and tests."""
+
+from .posts import SyntheticPostsConfig, build_post, build_styled_text
+from .server import FakeBoostyConfig, FakeBoostyServer
+
+__all__ = [
+    'FakeBoostyConfig',
+    'FakeBoostyServer',
+    'SyntheticPostsConfig',
+    'build_post',
+    'build_styled_text',
+]
@@ -0,0 +1,165 @@
+"""
+Synthetic posts in the raw Boosty API format (as `PostDTO` expects them).
+
+Everything is generated from the post index, so the same config always gives the same posts.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass
+from typing import Any
+
+# Newest post is the first one on the first page, like the real API returns them
+_NEWEST_POST_TIMESTAMP = 1735689600  # 2025-01-01
+_STYLE_IDS = (0, 2, 4)  # bold / italic / underline
+_WORDS = ('boosty', 'post', 'content', 'lorem', 'ipsum', 'dolor', 'sit', 'amet')
+
+
+@dataclass
+class SyntheticPostsConfig:
+    """Shape of every generated post."""
+
+    images_per_post: int = 3
+    files_per_post: int = 1
+    videos_per_post: int = 0
+    # Qualities of ok videos which have urls (e.g. only 'hls' for streams)
+    video_qualities: tuple[str, ...] = ('low', 'medium', 'high')
+    text_blocks_per_post: int = 3
+    words_per_text_block: int = 50
+    styles_per_text_block: int = 5  # Style ranges of each text block
+    list_depth: int = 0  # Depth of the nested list, 0 - no lists
+    list_breadth: int = 2  # Items on every level of the nested list
+
+
+def _text_content(
+    rng: random.Random, words_count: int, styles_count: int, style: str = 'unstyled'
+) -> str:
+    text = ' '.join(rng.choice(_WORDS) for _ in range(words_count))
+    styles: list[list[int]] = []
+    for _ in range(styles_count):
+        start = rng.randrange(max(1, len(text)))
+        end = min(len(text), start + rng.randint(1, 40))
+        styles.append([rng.choice(_STYLE_IDS), start, end])
+    return json.dumps([text, style, styles])
+
+
+def build_styled_text(words_count: int, styles_count: int, seed: int = 0) -> str:
+    """Build `content` of a text block with the given number of style ranges."""
+    rng = random.Random(seed)  # noqa: S311 (not for security, same text every run)
+    return _text_content(rng, words_count, styles_count)
+
+
+def _list_items(rng: random.Random, depth: int, breadth: int) -> list[dict[str, Any]]:
+    if depth <= 0:
+        return []
+    return [
+        {
+            'data': [
+                {
+                    'type': 'text',
+                    'modificator': '',
+                    'content': _text_content(rng, words_count=8, styles_count=1),
+                }
+            ],
+            'items': _list_items(rng, depth - 1, breadth),
+        }
+        for _ in range(breadth)
+    ]
+
+
+def _ok_video(
+    cdn_url: str, video_id: str, available: tuple[str, ...]
+) -> dict[str, Any]:
+    # Only some of the qualities have urls, as it usually happens with real videos
+    qualities = ('ultra_hd', 'full_hd', 'high', 'medium', 'low', 'hls', 'dash')
+    return {
+        'type': 'ok_video',
+        'title': f'video-{video_id}',
+        'failoverHost': '',
+        'duration': 60,
+        'uploadStatus': 'ok',
+        'complete': True,
+        'playerUrls': [
+            {
+                'type': quality,
+                'url': f'{cdn_url}/videos/{video_id}-{quality}'
+                if quality in available
+                else '',
+            }
+            for quality in qualities
+        ],
+    }
+
+
+def build_post(
+    index: int, cdn_url: str, config: SyntheticPostsConfig
+) -> dict[str, Any]:
+    """Build a raw post (as it comes in the `data` field of the posts page)."""
+    rng = random.Random(index)  # noqa: S311 (not for security, same posts every run)
+    post_id = f'00000000-0000-4000-8000-{index:012d}'
+    timestamp = _NEWEST_POST_TIMESTAMP - index * 3600
+
+    data: list[dict[str, Any]] = [
+        {
+            'type': 'text',
+            'modificator': '',
+            'content': _text_content(
+                rng, words_count=5, styles_count=0, style='header-two'
+            ),
+        },
+        {'type': 'text', 'modificator': 'BLOCK_END', 'content': ''},
+    ]
+    for _ in range(config.text_blocks_per_post):
+        data.append(
+            {
+                'type': 'text',
+                'modificator': '',
+                'content': _text_content(
+                    rng, config.words_per_text_block, config.styles_per_text_block
+                ),
+            }
+        )
+        data.append({'type': 'text', 'modificator': 'BLOCK_END', 'content': ''})
+
+    if config.list_depth > 0:
+        data.append(
+            {
+                'type': 'list',
+                'style': 'unordered',
+                'items': _list_items(rng, config.list_depth, config.list_breadth),
+            }
+        )
+
+    data.extend(
+        {
+            'type': 'image',
+            'url': f'{cdn_url}/images/{index}-{n}',
+            'width': 1280,
+            'height': 720,
+        }
+        for n in range(config.images_per_post)
+    )
+    data.extend(
+        {
+            'type': 'file',
+            'url': f'{cdn_url}/files/{index}-{n}',
+            'title': f'file-{index}-{n}.bin',
+        }
+        for n in range(config.files_per_post)
+    )
+    data.extend(
+        _ok_video(cdn_url, f'{index}-{n}', config.video_qualities)
+        for n in range(config.videos_per_post)
+    )
+
+    return {
+        'id': post_id,
+        'title': f'Synthetic post #{index}',
+        'createdAt': timestamp,
+        'updatedAt': timestamp,
+        'hasAccess': True,
+        'signedQuery': f'?sign=fake-signature-{index}',
+        'data': data,
+    }
@@ -0,0 +1,252 @@
+"""
+aiohttp server pretending to be Boosty API and its CDN.
+
+API part serves `blog/{author}/post/` pages, CDN part serves synthetic payloads
+for images/files/videos (with Range support), both with configurable latency,
+bandwidth and share of failing (503) responses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import zlib
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+from yarl import URL
+
+from .posts import SyntheticPostsConfig, build_post
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from types import TracebackType
+
+_PAYLOAD_BLOCK_SIZE = 65536
+_CONTENT_TYPES = {
+    'images': 'image/jpeg',
+    'files': 'application/octet-stream',
+    'videos': 'video/mp4',
+}
+
+
+@dataclass
+class FakeBoostyConfig:
+    """What the fake serves and how fast."""
+
+    author_name: str = 'fake_author'
+    posts_count: int = 20
+    posts: SyntheticPostsConfig = field(default_factory=SyntheticPostsConfig)
+
+    image_size_bytes: int = 262144  # 256 KiB
+    file_size_bytes: int = 2097152  # 2 MiB
+    video_size_bytes: int = 16777216  # 16 MiB
+
+    latency_seconds: float = 0.0  # Before every response
+    bandwidth_bytes_per_second: int | None = None  # Of every response, None - unlimited
+    error_rate: float = 0.0  # Share of requests answered with 503
+
+    # Content of these posts (by index, 0 - the newest) is answered with 404
+    missing_content_posts: frozenset[int] = frozenset()
+    # Content of these posts isn't answered until `release_stalled()` is called
+    stalled_content_posts: frozenset[int] = frozenset()
+
+    # Misbehaving CDN: range responses are capped to this size (as the Content-Range says)
+    max_range_bytes: int | None = None
+    # Misbehaving CDN: range responses miss this many bytes at the end (Content-Range doesn't)
+    range_body_shortfall_bytes: int = 0
+    seed: int = 0
+
+
+@dataclass
+class FakeBoostyStats:
+    """Counters of the served requests."""
+
+    api_requests: int = 0
+    cdn_requests: int = 0
+    injected_errors: int = 0
+    stalled_requests: int = 0  # Waiting for `release_stalled()` right now
+    bytes_served: int = 0
+
+
+class FakeBoostyServer:
+    """
+    Local Boosty stand-in, use it as an async context manager.
+
+    Point `BoostyAPIClient` to it with `base_url=server.base_url`,
+    all the content urls in the posts lead to the same server.
+    """
+
+    def __init__(
+        self, config: FakeBoostyConfig | None = None, host: str = '127.0.0.1'
+    ) -> None:
+        self.config = config or FakeBoostyConfig()
+        self.stats = FakeBoostyStats()
+        self._host = host
+        # Not for security, just reproducible runs
+        self._rng = random.Random(self.config.seed)  # noqa: S311
+        self._payload_block = random.Random(self.config.seed).randbytes(  # noqa: S311
+            _PAYLOAD_BLOCK_SIZE
+        )
+        self._posts: list[dict[str, Any]] = []
+        self._root_url = URL()
+        self._stall_released = asyncio.Event()
+
+        app = web.Application()
+        app.router.add_get('/v1/blog/{author}/post/', self._handle_posts)
+        app.router.add_get('/cdn/{kind}/{name}', self._handle_content)
+        # Stalled requests are dropped together with the connection of a cancelled client
+        self._runner = web.AppRunner(app, handler_cancellation=True)
+
+    @property
+    def base_url(self) -> URL:
+        """API base url for `BoostyAPIClient`."""
+        return self._root_url / 'v1' / ''
+
+    @property
+    def cdn_url(self) -> str:
+        """Root of all the content urls."""
+        return str(self._root_url / 'cdn')
+
+    @property
+    def total_payload_bytes(self) -> int:
+        """Size of all the content of all the posts."""
+        posts = self.config.posts
+        return self.config.posts_count * (
+            posts.images_per_post * self.config.image_size_bytes
+            + posts.files_per_post * self.config.file_size_bytes
+            + posts.videos_per_post * self.config.video_size_bytes
+        )
+
+    async def __aenter__(self) -> FakeBoostyServer:  # noqa: PYI034 (not subclassed)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self._root_url = URL.build(scheme='http', host=self._host, port=port)
+
+        self._posts = [
+            build_post(index, self.cdn_url, self.config.posts)
+            for index in range(self.config.posts_count)
+        ]
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.release_stalled()  # Otherwise the cleanup waits for them
+        await self._runner.cleanup()
+
+    def release_stalled(self) -> None:
+        """Answer the stalled and all the following requests of `stalled_content_posts`."""
+        self._stall_released.set()
+
+    async def _delay_or_fail(self) -> web.Response | None:
+        if self.config.latency_seconds > 0:
+            await asyncio.sleep(self.config.latency_seconds)
+        if self._rng.random() < self.config.error_rate:
+            self.stats.injected_errors += 1
+            return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE)
+        return None
+
+    async def _handle_posts(self, request: web.Request) -> web.Response:
+        self.stats.api_requests += 1
+        if (error := await self._delay_or_fail()) is not None:
+            return error
+
+        if request.match_info['author'] != self.config.author_name:
+            return web.json_response(
+                {'error': 'blog_not_found'}, status=HTTPStatus.NOT_FOUND
+            )
+
+        start = int(request.query.get('offset', '0') or 0)
+        limit = int(request.query.get('limit', '5'))
+        end = min(start + limit, len(self._posts))
+        return web.json_response(
+            {
+                'data': self._posts[start:end],
+                'extra': {'isLast': end >= len(self._posts), 'offset': str(end)},
+            }
+        )
+
+    def _payload_size(self, kind: str) -> int | None:
+        return {
+            'images': self.config.image_size_bytes,
+            'files': self.config.file_size_bytes,
+            'videos': self.config.video_size_bytes,
+        }.get(kind)
+
+    def payload(self, kind: str, name: str) -> bytes:
+        """Full content the CDN serves for the url `{cdn_url}/{kind}/{name}`."""
+        size = self._payload_size(kind) or 0
+        return b''.join(self._payload_chunks(name, 0, size))
+
+    def _payload_chunks(self, name: str, start: int, end: int) -> Iterator[bytes]:
+        # Content is the cyclic block shifted by the name hash, so it differs between names
+        block = self._payload_block
+        position = start
+        shift = zlib.crc32(name.encode())
+        while position < end:
+            offset = (position + shift) % len(block)
+            chunk = block[offset : offset + min(end - position, len(block) - offset)]
+            yield chunk
+            position += len(chunk)
+
+    async def _handle_content(self, request: web.Request) -> web.StreamResponse:
+        self.stats.cdn_requests += 1
+        if (error := await self._delay_or_fail()) is not None:
+            return error
+
+        kind, name = request.match_info['kind'], request.match_info['name']
+        size = self._payload_size(kind)
+        post_index = name.partition('-')[0]  # Names are `{post index}-{n}[-quality]`
+        if size is None or (
+            post_index.isdigit()
+            and int(post_index) in self.config.missing_content_posts
+        ):
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        if (
+            post_index.isdigit()
+            and int(post_index) in self.config.stalled_content_posts
+        ):
+            self.stats.stalled_requests += 1
+            try:
+                await self._stall_released.wait()
+            finally:
+                self.stats.stalled_requests -= 1
+
+        start, end = 0, size
+        status = HTTPStatus.OK
+        headers = {
+            'Content-Type': _CONTENT_TYPES[kind],
+            'ETag': f'"{kind}-{name}-{size}"',
+            'Accept-Ranges': 'bytes',
+        }
+        if request.http_range.start is not None or request.http_range.stop is not None:
+            requested = request.http_range
+            start = requested.start or 0
+            end = min(size, requested.stop if requested.stop is not None else size)
+            if self.config.max_range_bytes is not None:
+                end = min(end, start + self.config.max_range_bytes)
+            status = HTTPStatus.PARTIAL_CONTENT
+            headers['Content-Range'] = f'bytes {start}-{end - 1}/{size}'
+            end = max(start, end - self.config.range_body_shortfall_bytes)
+
+        response = web.StreamResponse(status=status, headers=headers)
+        response.content_length = end - start
+        await response.prepare(request)
+
+        bandwidth = self.config.bandwidth_bytes_per_second
+        for chunk in self._payload_chunks(name, start, end):
+            await response.write(chunk)
+            self.stats.bytes_served += len(chunk)
+            if bandwidth:
+                await asyncio.sleep(len(chunk) / bandwidth)
+
+        await response.write_eof()
+        return response
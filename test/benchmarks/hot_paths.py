@@ -0,0 +1,129 @@
+"""
+Micro-benchmark cases of the CPU-bound hot paths.
+
+Inputs are big synthetic posts: long-form text with thousands of style ranges,
+deeply nested lists, lots of media and videos with all the qualities.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from boosty_downloader.src.application.mappers import (
+    map_post_dto_to_domain,
+    to_domain_text_chunk,
+)
+from boosty_downloader.src.application.mappers.html_converter import (
+    convert_file_to_html,
+    convert_image_to_html,
+    convert_list_to_html,
+    convert_text_to_html,
+)
+from boosty_downloader.src.application.ok_video_ranking import get_best_video
+from boosty_downloader.src.domain.post_data_chunks import (
+    PostDataChunkFile,
+    PostDataChunkImage,
+    PostDataChunkText,
+    PostDataChunkTextualList,
+)
+from boosty_downloader.src.infrastructure.boosty_api.models.post.post import PostDTO
+from boosty_downloader.src.infrastructure.boosty_api.models.post.post_data_types import (
+    BoostyPostDataTextDTO,
+)
+from boosty_downloader.src.infrastructure.boosty_api.models.post.post_data_types.post_data_ok_video import (
+    BoostyOkVideoType,
+    BoostyOkVideoUrl,
+)
+from boosty_downloader.src.infrastructure.html_generator import (
+    HtmlGenChunk,
+    render_html,
+)
+
+from .fake_boosty import SyntheticPostsConfig, build_post, build_styled_text
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from boosty_downloader.src.domain.post import Post
+
+LONG_POST = SyntheticPostsConfig(
+    images_per_post=50,
+    files_per_post=10,
+    videos_per_post=5,
+    text_blocks_per_post=200,
+    words_per_text_block=200,
+    styles_per_text_block=50,
+    list_depth=6,
+    list_breadth=3,
+)
+
+
+@dataclass
+class BenchmarkCase:
+    """Named function to time, its input is prepared in advance."""
+
+    name: str
+    run: Callable[[], object]
+
+
+def _to_html_chunks(post: Post) -> list[HtmlGenChunk]:
+    html_chunks: list[HtmlGenChunk] = []
+    for chunk in post.post_data_chunks:
+        if isinstance(chunk, PostDataChunkText):
+            html_chunks.append(convert_text_to_html(chunk))
+        elif isinstance(chunk, PostDataChunkTextualList):
+            html_chunks.append(convert_list_to_html(chunk))
+        elif isinstance(chunk, PostDataChunkImage):
+            html_chunks.append(convert_image_to_html(chunk))
+        elif isinstance(chunk, PostDataChunkFile):
+            html_chunks.append(convert_file_to_html(chunk))
+    return html_chunks
+
+
+def build_cases() -> list[BenchmarkCase]:
+    """Prepare inputs and return all the benchmark cases."""
+    raw_post = build_post(0, 'https://cdn.example', LONG_POST)
+    post_dto = PostDTO.model_validate(raw_post)
+    post = map_post_dto_to_domain(post_dto, BoostyOkVideoType.medium)
+    html_chunks = _to_html_chunks(post)
+
+    styled_text = BoostyPostDataTextDTO(
+        type='text',
+        modificator='BLOCK_END',
+        content=build_styled_text(words_count=20000, styles_count=5000),
+    )
+
+    all_video_urls = [
+        BoostyOkVideoUrl(
+            url=f'https://cdn.example/videos/{quality.value}', type=quality
+        )
+        for quality in BoostyOkVideoType
+    ]
+
+    def rank_videos_for_all_qualities() -> None:
+        for quality in BoostyOkVideoType:
+            get_best_video(all_video_urls, preferred_quality=quality)
+
+    return [
+        BenchmarkCase(
+            'PostDTO.model_validate[long post]',
+            lambda: PostDTO.model_validate(raw_post),
+        ),
+        BenchmarkCase(
+            'map_post_dto_to_domain[long post]',
+            lambda: map_post_dto_to_domain(post_dto, BoostyOkVideoType.medium),
+        ),
+        BenchmarkCase(
+            'to_domain_text_chunk[5000 style ranges]',
+            lambda: to_domain_text_chunk(styled_text),
+        ),
+        BenchmarkCase(
+            'get_best_video[all qualities]',
+            rank_videos_for_all_qualities,
+        ),
+        BenchmarkCase(
+            'render_html[long post]',
+            lambda: render_html(html_chunks),
+        ),
+    ]
@@ -0,0 +1,99 @@
+"""
+Micro-benchmarks of the hot paths (see `hot_paths.py`) with a stored baseline.
+
+Run it from the repository root:
+
+    PYTHONPATH=test python -m benchmarks.micro             # just measure
+    PYTHONPATH=test python -m benchmarks.micro --save      # store the results as the baseline
+    PYTHONPATH=test python -m benchmarks.micro --compare   # fail if slower than the baseline
+
+Timings depend on the machine, so the baseline isn't committed (it's git-ignored):
+save it locally before the change (e.g. on the main branch) and compare on the same machine.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import timeit
+from pathlib import Path
+
+import typer
+
+from .hot_paths import build_cases
+
+BASELINE_FILE = Path(__file__).with_name('micro_baseline.json')
+
+
+def _measure(repeat: int) -> dict[str, float]:
+    """Return the best time per call (in seconds) of every case."""
+    results: dict[str, float] = {}
+    for case in build_cases():
+        timer = timeit.Timer(case.run)
+        number, _ = timer.autorange()
+        results[case.name] = min(timer.repeat(repeat=repeat, number=number)) / number
+    return results
+
+
+def _load_baseline() -> dict[str, float]:
+    try:
+        baseline = json.loads(BASELINE_FILE.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        typer.echo(f'No baseline to compare with ({e}), run with --save first')
+        raise typer.Exit(code=2) from e
+
+    if baseline.get('python') != platform.python_version():
+        typer.echo(
+            f'Warning: baseline was measured with Python {baseline.get("python")}, '
+            f'current is {platform.python_version()}'
+        )
+    return baseline['results']
+
+
+def main(
+    *,
+    save: bool = False,
+    compare: bool = False,
+    repeat: int = 5,
+    max_slowdown: float = 0.2,
+) -> None:
+    """Measure the hot paths, optionally store or compare with the baseline."""
+    baseline = _load_baseline() if compare else {}
+    results = _measure(repeat)
+
+    regressions: list[str] = []
+    for name, seconds in results.items():
+        line = f'{name:<45} {seconds * 1000:>10.3f} ms'
+        if name in baseline:
+            ratio = seconds / baseline[name]
+            line += f'  (baseline {baseline[name] * 1000:.3f} ms, x{ratio:.2f})'
+            if ratio > 1 + max_slowdown:
+                regressions.append(name)
+                line += '  SLOWER'
+        typer.echo(line)
+
+    if save:
+        BASELINE_FILE.write_text(
+            json.dumps(
+                {
+                    'python': platform.python_version(),
+                    'machine': platform.machine(),
+                    'results': results,
+                },
+                indent=2,
+            )
+            + '\n',
+            encoding='utf-8',
+        )
+        typer.echo(f'Baseline saved to {BASELINE_FILE}')
+
+    if regressions:
+        typer.echo(
+            f'{len(regressions)} case(s) are more than {max_slowdown:.0%} slower '
+            'than the baseline'
+        )
+        raise typer.Exit(code=1)
+
+
+if __name__ == '__main__':
+    typer.run(main)
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp_retry import ExponentialRetry, RetryClient
+from yarl import URL
+
+from boosty_downloader.src.infrastructure.boosty_api.core.adaptive_limiter import (
+    AdaptiveRateLimiter,
+    parse_retry_after,
+)
+from boosty_downloader.src.infrastructure.boosty_api.core.client import BoostyAPIClient
+
+
+def test_limiter_speeds_up_and_backs_off() -> None:
+    limiter = AdaptiveRateLimiter(initial_delay_seconds=2.0, min_delay_seconds=1.0)
+
+    for _ in range(30):
+        limiter.record_response(HTTPStatus.OK)
+    assert limiter.current_delay_seconds == 1.0
+    assert limiter.current_rate == 1.0
+
+    limiter.record_response(HTTPStatus.TOO_MANY_REQUESTS)
+    assert limiter.current_delay_seconds == 2.0
+
+    limiter.record_response(HTTPStatus.BAD_GATEWAY)
+    assert limiter.current_delay_seconds == 4.0
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.asyncio
+async def test_client_retries_too_many_requests() -> None:
+    calls = 0
+
+    async def handler(_: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return web.json_response(
+                {}, status=HTTPStatus.TOO_MANY_REQUESTS, headers={'Retry-After': '0'}
+            )
+        return web.json_response({'data': [], 'extra': {'isLast': True, 'offset': ''}})
+
+    app = web.Application()
+    app.router.add_get('/v1/blog/{author}/post/', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    try:
+        async with ClientSession() as session:
+            client = BoostyAPIClient(
+                RetryClient(session, retry_options=ExponentialRetry(attempts=1)),
+                request_delay_seconds=0.01,
+                base_url=URL(f'http://127.0.0.1:{port}/v1/'),
+            )
+            response = await client.get_author_posts('author', limit=5)
+    finally:
+        await runner.cleanup()
+
+    assert calls == 2
+    assert response.extra.is_last
+    assert client.current_request_rate == pytest.approx(1 / 0.02)
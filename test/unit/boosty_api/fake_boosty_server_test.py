@@ -0,0 +1,75 @@
+import aiohttp
+import pytest
+from aiohttp_retry import ExponentialRetry, RetryClient
+from benchmarks.fake_boosty import (
+    FakeBoostyConfig,
+    FakeBoostyServer,
+    SyntheticPostsConfig,
+)
+
+from boosty_downloader.src.application.filtering import BoostyOkVideoType
+from boosty_downloader.src.application.mappers import map_post_dto_to_domain
+from boosty_downloader.src.domain.post_data_chunks import (
+    PostDataChunkBoostyVideo,
+    PostDataChunkFile,
+    PostDataChunkImage,
+)
+from boosty_downloader.src.infrastructure.boosty_api.core.client import BoostyAPIClient
+
+
+@pytest.mark.asyncio
+async def test_fake_serves_posts_and_content_the_client_understands() -> None:
+    config = FakeBoostyConfig(
+        posts_count=7,
+        posts=SyntheticPostsConfig(videos_per_post=1, list_depth=2),
+        image_size_bytes=1000,
+        file_size_bytes=3000,
+        video_size_bytes=5000,
+        error_rate=0.2,
+    )
+    async with (
+        FakeBoostyServer(config) as server,
+        aiohttp.ClientSession() as session,
+    ):
+        # Injected 503 are retried like the real ones
+        client = RetryClient(
+            session, retry_options=ExponentialRetry(attempts=10, start_timeout=0.01)
+        )
+        api = BoostyAPIClient(client, base_url=server.base_url)
+
+        posts = [
+            post
+            async for page in api.iterate_over_posts(
+                config.author_name, posts_per_page=3
+            )
+            for post in page.posts
+        ]
+        assert len(posts) == config.posts_count
+        assert posts[0].updated_at > posts[-1].updated_at  # Newest first
+
+        post = map_post_dto_to_domain(posts[0], BoostyOkVideoType.medium)
+        image = next(
+            c for c in post.post_data_chunks if isinstance(c, PostDataChunkImage)
+        )
+        file = next(
+            c for c in post.post_data_chunks if isinstance(c, PostDataChunkFile)
+        )
+        video = next(
+            c for c in post.post_data_chunks if isinstance(c, PostDataChunkBoostyVideo)
+        )
+        assert video.quality == 'medium'
+
+        async with client.get(file.url) as response:
+            file_content = await response.read()
+        assert file_content == server.payload(
+            'files', file.url.split('/')[-1].split('?')[0]
+        )
+        assert len(file_content) == config.file_size_bytes
+
+        async with client.get(image.url, headers={'Range': 'bytes=100-'}) as response:
+            assert response.status == 206
+            assert response.headers['Content-Range'] == 'bytes 100-999/1000'
+            assert (
+                await response.read()
+                == server.payload('images', image.url.split('/')[-1])[100:]
+            )
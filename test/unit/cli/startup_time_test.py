@@ -0,0 +1,77 @@
+import subprocess
+import sys
+
+# The entry point imports little more than typer, it was ~6x typer with everything imported eagerly
+STARTUP_BUDGET_TYPER_RATIO = 4
+
+# Imported by the CLI flow only when a command is actually run
+HEAVY_MODULES = ('aiohttp', 'sqlalchemy', 'yt_dlp', 'jinja2')
+
+# Modules `--only-check-total` imports to run, the download flow isn't among them
+CHECK_TOTAL_MODULES = (
+    'boosty_downloader.main',
+    'boosty_downloader.src.interfaces.cli_handler',
+    'boosty_downloader.src.application.di.app_environment',
+    'boosty_downloader.src.application.use_cases.check_total_posts',
+)
+
+# Used only by the download flow and never needed just to count the posts
+DOWNLOAD_FLOW_MODULES = ('sqlalchemy', 'jinja2', 'yt_dlp')
+
+
+def _import_entry_point() -> dict[str, int]:
+    """Import the entry point in a fresh interpreter and return cumulative import times."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import boosty_downloader.main'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.removeprefix('import time:').split('|')
+        cumulative_times[module.strip()] = int(cumulative)
+    return cumulative_times
+
+
+def _imported_modules(*modules: str) -> set[str]:
+    """Import the modules in a fresh interpreter and return everything it has imported."""
+    script = '\n'.join(
+        [
+            'import importlib, sys',
+            *(f'importlib.import_module({module!r})' for module in modules),
+            'print("\\n".join(sys.modules))',
+        ]
+    )
+    result = subprocess.run(  # noqa: S603 (the script only imports our own modules)
+        [sys.executable, '-c', script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.splitlines())
+
+
+def test_heavy_modules_are_not_imported_on_startup():
+    imported = _import_entry_point()
+
+    assert [module for module in HEAVY_MODULES if module in imported] == []
+
+
+def test_check_total_does_not_import_download_flow():
+    imported = _imported_modules(*CHECK_TOTAL_MODULES)
+
+    assert [module for module in DOWNLOAD_FLOW_MODULES if module in imported] == []
+
+
+def test_startup_fits_the_budget():
+    # Relative to typer imported in the same run, so a slow or busy machine doesn't fail the test
+    ratios = [
+        times['boosty_downloader.main'] / times['typer']
+        for times in (_import_entry_point() for _ in range(3))
+    ]
+
+    assert min(ratios) < STARTUP_BUDGET_TYPER_RATIO
@@ -0,0 +1,244 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp_retry import ExponentialRetry, RetryClient
+
+from boosty_downloader.src.infrastructure.adaptive_streams import (
+    download_adaptive_stream,
+)
+from boosty_downloader.src.infrastructure.adaptive_streams.manifests import (
+    StreamManifestError,
+    StreamSegment,
+    parse_dash,
+    parse_hls_media,
+)
+from boosty_downloader.src.infrastructure.file_downloader import (
+    DownloadedFile,
+    DownloadFileConfig,
+    DownloadUnexpectedStatusError,
+)
+
+MASTER_PLAYLIST = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=4000000,RESOLUTION=1280x720
+high/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360
+low/index.m3u8
+"""
+
+MEDIA_PLAYLIST = """#EXTM3U
+#EXT-X-TARGETDURATION:4
+#EXT-X-MAP:URI="init.mp4"
+{segments}
+#EXT-X-ENDLIST
+"""
+
+
+def _file_names(directory: Path) -> list[str]:
+    return sorted(p.name for p in directory.iterdir())
+
+
+def _assert_downloaded(downloaded: DownloadedFile, expected: bytes) -> None:
+    """Check the file content and that no temporary files are left next to it."""
+    assert downloaded.path.read_bytes() == expected
+    assert _file_names(downloaded.path.parent) == [downloaded.path.name]
+
+
+def _segment(quality: str, number: int) -> bytes:
+    return f'{quality}-segment-{number};'.encode() * 1000
+
+
+def _make_app(segments_count: int) -> web.Application:
+    async def master(_: web.Request) -> web.Response:
+        return web.Response(text=MASTER_PLAYLIST)
+
+    async def media(_: web.Request) -> web.Response:
+        segments = '\n'.join(
+            f'#EXTINF:4.0,\n{number}.m4s' for number in range(segments_count)
+        )
+        return web.Response(text=MEDIA_PLAYLIST.format(segments=segments))
+
+    async def init(request: web.Request) -> web.Response:
+        return web.Response(body=f'{request.match_info["quality"]}-init;'.encode())
+
+    async def segment(request: web.Request) -> web.Response:
+        quality = request.match_info['quality']
+        number = int(request.match_info['number'])
+        # The best rendition is broken in the middle
+        if quality == 'high' and number == segments_count // 2:
+            raise web.HTTPNotFound
+        return web.Response(body=_segment(quality, number))
+
+    app = web.Application()
+    app.router.add_get('/master.m3u8', master)
+    app.router.add_get('/{quality}/index.m3u8', media)
+    app.router.add_get('/{quality}/init.mp4', init)
+    app.router.add_get('/{quality}/{number}.m4s', segment)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_hls_falls_back_to_next_rendition_and_joins_segments(tmp_path: Path):
+    segments_count = 9
+    runner = web.AppRunner(_make_app(segments_count))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    try:
+        async with ClientSession() as session:
+            downloaded = await download_adaptive_stream(
+                DownloadFileConfig(
+                    session=RetryClient(
+                        session, retry_options=ExponentialRetry(attempts=1)
+                    ),
+                    url=f'http://127.0.0.1:{port}/master.m3u8',
+                    filename='video',
+                    destination=tmp_path,
+                    compute_sha256=True,
+                ),
+                parallel_segments=3,
+                max_height=1080,
+            )
+    finally:
+        await runner.cleanup()
+
+    expected = b'low-init;' + b''.join(
+        _segment('low', number) for number in range(segments_count)
+    )
+    assert downloaded.path == tmp_path / 'video.mp4'
+    assert downloaded.sha256 == hashlib.sha256(expected).hexdigest()
+    _assert_downloaded(downloaded, expected)
+
+
+BYTE_RANGE_PLAYLIST = """#EXTM3U
+#EXT-X-MAP:URI="init.mp4"
+#EXT-X-BYTERANGE:1000@0
+all.m4s
+#EXT-X-BYTERANGE:1000
+all.m4s
+#EXT-X-ENDLIST
+"""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('server_honors_ranges', [True, False])
+async def test_hls_byte_range_segments_require_partial_content(
+    tmp_path: Path, *, server_honors_ranges: bool
+):
+    resource = bytes(range(256)) * 10
+
+    async def playlist(_: web.Request) -> web.Response:
+        return web.Response(text=BYTE_RANGE_PLAYLIST)
+
+    async def init(_: web.Request) -> web.Response:
+        return web.Response(body=b'init;')
+
+    async def all_segments(request: web.Request) -> web.Response:
+        requested = request.http_range
+        if not server_honors_ranges or requested.start is None:
+            return web.Response(body=resource)
+        return web.Response(
+            status=206,
+            body=resource[requested],
+            headers={
+                'Content-Range': f'bytes {requested.start}-{requested.stop - 1}/{len(resource)}'
+            },
+        )
+
+    app = web.Application()
+    app.router.add_get('/index.m3u8', playlist)
+    app.router.add_get('/init.mp4', init)
+    app.router.add_get('/all.m4s', all_segments)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    try:
+        async with ClientSession() as session:
+            download = download_adaptive_stream(
+                DownloadFileConfig(
+                    session=RetryClient(
+                        session, retry_options=ExponentialRetry(attempts=1)
+                    ),
+                    url=f'http://127.0.0.1:{port}/index.m3u8',
+                    filename='video',
+                    destination=tmp_path,
+                )
+            )
+            if server_honors_ranges:
+                downloaded = await download
+                _assert_downloaded(downloaded, b'init;' + resource[:2000])
+            else:
+                # The whole resource must not be joined as a segment
+                with pytest.raises(DownloadUnexpectedStatusError):
+                    await download
+                assert _file_names(tmp_path) == []
+    finally:
+        await runner.cleanup()
+
+
+def test_hls_byte_ranges_continue_previous_segment():
+    track = parse_hls_media(
+        '#EXTM3U\n'
+        '#EXT-X-BYTERANGE:100@0\nall.ts\n'
+        '#EXT-X-BYTERANGE:50\nall.ts\n'
+        '#EXT-X-ENDLIST\n',
+        'https://cdn.example/video/index.m3u8',
+    )
+
+    assert track.extension == '.ts'
+    assert track.segments == [
+        StreamSegment('https://cdn.example/video/all.ts', (0, 99)),
+        StreamSegment('https://cdn.example/video/all.ts', (100, 149)),
+    ]
+
+
+def test_live_hls_playlist_is_rejected():
+    # No end tag: the playlist still grows, its current segments are only a part of the video
+    with pytest.raises(StreamManifestError, match='Live HLS'):
+        parse_hls_media(
+            '#EXTM3U\n#EXT-X-TARGETDURATION:6\n#EXTINF:6,\n0.ts\n#EXTINF:6,\n1.ts\n',
+            'https://cdn.example/video/index.m3u8',
+        )
+
+
+def test_dash_template_with_timeline_and_separate_audio():
+    manifest = """<?xml version="1.0"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" mediaPresentationDuration="PT8S">
+  <Period>
+    <BaseURL>media/</BaseURL>
+    <AdaptationSet mimeType="video/mp4">
+      <SegmentTemplate initialization="$RepresentationID$/init.mp4"
+                       media="$RepresentationID$/$Number%03d$-$Time$.m4s" startNumber="1">
+        <SegmentTimeline><S t="0" d="4000" r="1"/></SegmentTimeline>
+      </SegmentTemplate>
+      <Representation id="v720" bandwidth="3000000" height="720"/>
+      <Representation id="v360" bandwidth="700000" height="360"/>
+    </AdaptationSet>
+    <AdaptationSet mimeType="audio/mp4">
+      <Representation id="a" bandwidth="128000">
+        <BaseURL>audio.m4a</BaseURL>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>"""
+
+    renditions = parse_dash(manifest, 'https://cdn.example/v/manifest.mpd')
+
+    assert [(r.height, r.bandwidth) for r in renditions] == [
+        (720, 3000000),
+        (360, 700000),
+    ]
+    video, audio = renditions[0].tracks
+    assert [segment.url for segment in video.segments] == [
+        'https://cdn.example/v/media/v720/init.mp4',
+        'https://cdn.example/v/media/v720/001-0.m4s',
+        'https://cdn.example/v/media/v720/002-4000.m4s',
+    ]
+    assert audio.extension == '.m4a'
+    assert audio.segments == [StreamSegment('https://cdn.example/v/media/audio.m4a')]
@@ -0,0 +1,122 @@
+import asyncio
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp_retry import ExponentialRetry
+from benchmarks.fake_boosty import (
+    FakeBoostyConfig,
+    FakeBoostyServer,
+    SyntheticPostsConfig,
+)
+
+from boosty_downloader.src.application.di.app_environment import AppEnvironment
+from boosty_downloader.src.application.di.download_context import DownloadContext
+from boosty_downloader.src.application.filtering import (
+    BoostyOkVideoType,
+    DownloadContentTypeFilter,
+)
+from boosty_downloader.src.application.use_cases.download_all_posts import (
+    DownloadAllPostUseCase,
+)
+from boosty_downloader.src.application.use_cases.download_authors_batch import (
+    DownloadAuthorsBatchUseCase,
+)
+from boosty_downloader.src.infrastructure.loggers.base import RichLogger
+from boosty_downloader.src.infrastructure.loggers.failed_downloads_logger import (
+    FailedDownloadsLogger,
+)
+from boosty_downloader.src.interfaces.console_progress_reporter import (
+    ProgressReporter,
+)
+
+
+@pytest.mark.asyncio
+async def test_batch_shares_environment_and_isolates_failed_author(tmp_path: Path):
+    config = FakeBoostyConfig(
+        posts_count=3,
+        posts=SyntheticPostsConfig(images_per_post=1, files_per_post=0),
+        image_size_bytes=1000,
+    )
+    logger = RichLogger('batch-test')
+    logger.console.quiet = True
+
+    async with FakeBoostyServer(config) as server:
+        environment = AppEnvironment(
+            config=AppEnvironment.AppConfig(
+                author_name='missing_author',
+                target_directory=tmp_path,
+                boosty_headers={},
+                boosty_cookies_jar=aiohttp.CookieJar(),
+                retry_options=ExponentialRetry(attempts=1),
+                request_delay_seconds=0,
+                logger=logger,
+                boosty_base_url=server.base_url,
+            )
+        )
+
+        async def download_author(author_name: str) -> None:
+            with environment.open_author(author_name) as author_environment:
+                await DownloadAllPostUseCase(
+                    author_name=author_name,
+                    boosty_api=author_environment.boosty_api_client,
+                    destination=author_environment.destination_directory,
+                    download_context=DownloadContext(
+                        author_name=author_name,
+                        downloader_session=author_environment.downloading_retry_client,
+                        external_videos_downloader=author_environment.external_videos_downloader,
+                        post_cache=author_environment.post_cache,
+                        filters=list(DownloadContentTypeFilter),
+                        preferred_video_quality=BoostyOkVideoType.medium,
+                        progress_reporter=author_environment.progress_reporter,
+                        failed_logger=FailedDownloadsLogger(
+                            log_file_path=author_environment.destination_directory
+                            / 'failed_downloads.log',
+                        ),
+                        download_scheduler=author_environment.download_scheduler,
+                    ),
+                ).execute()
+
+        async with environment as app_environment:
+            failed_authors = await DownloadAuthorsBatchUseCase(
+                authors=['missing_author', config.author_name, config.author_name],
+                download_author=download_author,
+                progress_reporter=app_environment.progress_reporter,
+            ).execute()
+            queue_stats = app_environment.download_scheduler.stats()
+
+    assert failed_authors == ['missing_author']
+    author_directory = tmp_path / config.author_name
+    assert (
+        len([p for p in author_directory.iterdir() if p.is_dir()]) == config.posts_count
+    )
+    # Downloads of all the authors go through the single shared scheduler
+    assert queue_stats.total_jobs == config.posts_count
+
+
+@pytest.mark.asyncio
+async def test_batch_continues_after_network_errors_of_author():
+    logger = RichLogger('batch-test')
+    logger.console.quiet = True
+    errors: dict[str, Exception] = {
+        'unreachable': aiohttp.ClientConnectionError('Connection reset'),
+        'stalled': asyncio.TimeoutError(),
+    }
+    synced_authors: list[str] = []
+
+    async def download_author(author_name: str) -> None:
+        if author_name in errors:
+            raise errors[author_name]
+        synced_authors.append(author_name)
+
+    failed_authors = await DownloadAuthorsBatchUseCase(
+        authors=['unreachable', 'stalled', 'author'],
+        download_author=download_author,
+        progress_reporter=ProgressReporter(
+            logger=logger.logging_logger_obj, console=logger.console
+        ),
+        parallel_authors=1,
+    ).execute()
+
+    assert failed_authors == ['unreachable', 'stalled']
+    assert synced_authors == ['author']
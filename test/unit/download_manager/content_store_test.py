@@ -0,0 +1,94 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp_retry import RetryClient
+
+from boosty_downloader.src.infrastructure.content_store import ContentStore, LinkMode
+from boosty_downloader.src.infrastructure.file_downloader import (
+    DownloadFileConfig,
+    download_file_with_info,
+)
+
+CONTENT = b'same banner in every post'
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.mark.parametrize('link_mode', list(LinkMode))
+def test_repeated_content_is_stored_once(tmp_path: Path, link_mode: LinkMode) -> None:
+    first = tmp_path / 'post-1' / 'banner.jpg'
+    second = tmp_path / 'post-2' / 'banner-copy.jpg'
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_bytes(CONTENT)
+
+    with ContentStore(tmp_path, link_mode=link_mode) as store:
+        store.add('https://cdn/banner.jpg', first, SHA256)
+        store.add('https://cdn/banner-copy.jpg', second, SHA256)
+
+    objects = [
+        p for p in (tmp_path / '.content_store' / 'objects').rglob('*') if p.is_file()
+    ]
+    assert [p.name for p in objects] == [SHA256]
+    assert first.read_bytes() == second.read_bytes() == CONTENT
+
+    # Next run finds the content by its key without downloading it
+    reopened = ContentStore(tmp_path, link_mode=link_mode)
+    stored = reopened.find('https://cdn/banner.jpg')
+    assert stored is not None
+    assert stored.suffix == '.jpg'
+
+    target = reopened.link_to(stored, tmp_path / 'post-3' / 'banner.jpg')
+    assert target.read_bytes() == CONTENT
+    assert reopened.find('https://cdn/unknown.jpg') is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('link_mode', list(LinkMode))
+async def test_updated_post_does_not_change_linked_files_of_other_posts(
+    tmp_path: Path, link_mode: LinkMode
+) -> None:
+    first = tmp_path / 'post-1' / 'banner.jpg'
+    second = tmp_path / 'post-2' / 'banner.jpg'
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_bytes(CONTENT)
+
+    store = ContentStore(tmp_path, link_mode=link_mode)
+    store.add('https://cdn/banner.jpg', first, SHA256)
+    store.add('https://cdn/banner.jpg', second, SHA256)
+
+    async def updated_banner(_: web.Request) -> web.Response:
+        return web.Response(body=b'banner of the updated post')
+
+    app = web.Application()
+    app.router.add_get('/banner.jpg', updated_banner)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    try:
+        async with ClientSession() as session:
+            # The first post was updated and is downloaded again over its linked file
+            await download_file_with_info(
+                DownloadFileConfig(
+                    session=RetryClient(session),
+                    url=f'http://127.0.0.1:{port}/banner.jpg',
+                    filename='banner.jpg',
+                    destination=first.parent,
+                    guess_extension=False,
+                )
+            )
+    finally:
+        await runner.cleanup()
+
+    assert first.read_bytes() == b'banner of the updated post'
+    assert second.read_bytes() == CONTENT
+    stored = store.find('https://cdn/banner.jpg')
+    assert stored is not None
+    assert store.link_to(stored, tmp_path / 'post-3' / 'banner.jpg').read_bytes() == (
+        CONTENT
+    )
@@ -0,0 +1,449 @@
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import pytest
+from aiohttp_retry import ExponentialRetry
+from benchmarks.fake_boosty import (
+    FakeBoostyConfig,
+    FakeBoostyServer,
+    SyntheticPostsConfig,
+)
+
+from boosty_downloader.src.application.di.app_environment import AppEnvironment
+from boosty_downloader.src.application.di.download_context import DownloadContext
+from boosty_downloader.src.application.exceptions.application_errors import (
+    ApplicationCancelledError,
+)
+from boosty_downloader.src.application.filtering import (
+    BoostyOkVideoType,
+    DownloadContentTypeFilter,
+)
+from boosty_downloader.src.application.use_cases.download_all_posts import (
+    DownloadAllPostUseCase,
+)
+from boosty_downloader.src.application.use_cases.verify_downloads import (
+    VerifyDownloadsUseCase,
+)
+from boosty_downloader.src.infrastructure.loggers.base import RichLogger
+from boosty_downloader.src.infrastructure.loggers.failed_downloads_logger import (
+    FailedDownloadsLogger,
+)
+
+
+@asynccontextmanager
+async def _author_environment(
+    server: FakeBoostyServer, target_directory: Path
+) -> AsyncGenerator[AppEnvironment.Environment, None]:
+    logger = RichLogger('download-all-posts-test')
+    logger.console.quiet = True
+    environment = AppEnvironment(
+        config=AppEnvironment.AppConfig(
+            author_name=server.config.author_name,
+            target_directory=target_directory,
+            boosty_headers={},
+            boosty_cookies_jar=aiohttp.CookieJar(),
+            retry_options=ExponentialRetry(attempts=1),
+            request_delay_seconds=0,
+            logger=logger,
+            boosty_base_url=server.base_url,
+        )
+    )
+    async with environment as author_environment:
+        yield author_environment
+
+
+def _download_all_posts(
+    author_environment: AppEnvironment.Environment,
+    author_name: str,
+    chunk_concurrency: int = 1,
+    filters: list[DownloadContentTypeFilter] | None = None,
+    **options: Any,  # noqa: ANN401 (any options of the use case)
+) -> DownloadAllPostUseCase:
+    return DownloadAllPostUseCase(
+        author_name=author_name,
+        boosty_api=author_environment.boosty_api_client,
+        destination=author_environment.destination_directory,
+        download_context=DownloadContext(
+            author_name=author_name,
+            downloader_session=author_environment.downloading_retry_client,
+            external_videos_downloader=author_environment.external_videos_downloader,
+            post_cache=author_environment.post_cache,
+            filters=filters or list(DownloadContentTypeFilter),
+            preferred_video_quality=BoostyOkVideoType.medium,
+            progress_reporter=author_environment.progress_reporter,
+            failed_logger=FailedDownloadsLogger(
+                log_file_path=author_environment.destination_directory
+                / 'failed_downloads.log',
+            ),
+            download_scheduler=author_environment.download_scheduler,
+            chunk_concurrency=chunk_concurrency,
+        ),
+        retry_delay_seconds=0,
+        **options,
+    )
+
+
+async def _wait_until(condition: Callable[[], bool]) -> None:
+    async def poll() -> None:
+        while not condition():  # noqa: ASYNC110 (state of the server and the files)
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout=5)
+
+
+def _finished_posts(author_environment: AppEnvironment.Environment) -> int:
+    # Manifest is saved at the very end of the post processing
+    return len(list(author_environment.destination_directory.glob('*/manifest.json')))
+
+
+@pytest.mark.asyncio
+async def test_post_with_unsupported_stream_is_skipped_without_aborting_run(
+    tmp_path: Path,
+):
+    config = FakeBoostyConfig(
+        posts_count=3,
+        # The only video format is HLS, but the CDN serves a plain file instead of the manifest
+        posts=SyntheticPostsConfig(
+            images_per_post=1,
+            files_per_post=0,
+            videos_per_post=1,
+            video_qualities=('hls',),
+        ),
+        image_size_bytes=1000,
+        video_size_bytes=1000,
+    )
+
+    async with (
+        FakeBoostyServer(config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        await _download_all_posts(author_environment, config.author_name).execute()
+
+    author_directory = tmp_path / config.author_name
+    failed_log = (author_directory / 'failed_downloads.log').read_text()
+    assert failed_log.count('Video stream is not supported') == config.posts_count
+    assert (
+        len([p for p in author_directory.iterdir() if p.is_dir()]) == config.posts_count
+    )
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_stays_before_page_with_skipped_posts(tmp_path: Path):
+    posts = SyntheticPostsConfig(images_per_post=1, files_per_post=0)
+    # 5 posts per page, the post #12 is on the 3rd page
+    broken_config = FakeBoostyConfig(
+        posts_count=20,
+        posts=posts,
+        image_size_bytes=1000,
+        missing_content_posts=frozenset({12}),
+    )
+
+    async with (
+        FakeBoostyServer(broken_config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        await _download_all_posts(
+            author_environment,
+            broken_config.author_name,
+            post_concurrency=3,
+            checkpoint=author_environment.pagination_checkpoint,
+        ).execute()
+
+        assert author_environment.pagination_checkpoint.load() == '10'
+
+    # The resumed run gets back to the skipped post and completes the run
+    fixed_config = FakeBoostyConfig(posts_count=20, posts=posts, image_size_bytes=1000)
+    async with (
+        FakeBoostyServer(fixed_config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        await _download_all_posts(
+            author_environment,
+            fixed_config.author_name,
+            checkpoint=author_environment.pagination_checkpoint,
+            resume=True,
+        ).execute()
+
+        assert server.stats.api_requests == 2  # Only the 3rd and 4th pages
+        assert server.stats.cdn_requests == 1  # Only the skipped post
+        assert author_environment.pagination_checkpoint.load() is None
+
+
+@pytest.mark.asyncio
+async def test_file_damaged_after_verification_is_downloaded_again(tmp_path: Path):
+    config = FakeBoostyConfig(
+        posts_count=1,
+        posts=SyntheticPostsConfig(images_per_post=2, files_per_post=0),
+        image_size_bytes=1000,
+    )
+
+    async with (
+        FakeBoostyServer(config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        await _download_all_posts(author_environment, config.author_name).execute()
+        first_image, second_image = sorted(
+            author_environment.destination_directory.glob('*/images/*')
+        )
+
+        # Same size, different content: only the hash can tell it
+        first_image.write_bytes(bytes(1000))
+        await VerifyDownloadsUseCase(
+            destination=author_environment.destination_directory,
+            post_cache=author_environment.post_cache,
+            progress_reporter=author_environment.progress_reporter,
+        ).execute()
+        second_image.write_bytes(bytes(1000))
+
+        cdn_requests = server.stats.cdn_requests
+        await _download_all_posts(author_environment, config.author_name).execute()
+
+        assert server.stats.cdn_requests - cdn_requests == 2
+        assert first_image.read_bytes() == server.payload('images', '0-0')
+        assert second_image.read_bytes() == server.payload('images', '0-1')
+
+
+@pytest.mark.asyncio
+async def test_posts_are_downloaded_by_bounded_pool_of_workers(tmp_path: Path):
+    config = FakeBoostyConfig(
+        posts_count=6,
+        posts=SyntheticPostsConfig(images_per_post=1, files_per_post=0),
+        image_size_bytes=1000,
+        stalled_content_posts=frozenset({0, 1, 2}),
+    )
+
+    async with (
+        FakeBoostyServer(config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        run = asyncio.create_task(
+            _download_all_posts(
+                author_environment, config.author_name, post_concurrency=3
+            ).execute()
+        )
+
+        # All the workers are busy with the stalled posts, so nothing else is requested
+        await _wait_until(lambda: server.stats.stalled_requests == 3)
+        assert server.stats.cdn_requests == 3
+
+        server.release_stalled()
+        await run
+
+        assert _finished_posts(author_environment) == config.posts_count
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('stalled_post', 'saved_offset'),
+    [
+        (0, None),  # The 1st page isn't completed, the later ones don't count
+        (5, '5'),
+        (10, '10'),
+    ],
+)
+async def test_cancelled_run_saves_only_pages_completed_in_order(
+    tmp_path: Path, stalled_post: int, saved_offset: str | None
+):
+    # 5 posts per page
+    config = FakeBoostyConfig(
+        posts_count=15,
+        posts=SyntheticPostsConfig(images_per_post=1, files_per_post=0),
+        image_size_bytes=1000,
+        stalled_content_posts=frozenset({stalled_post}),
+    )
+
+    async with (
+        FakeBoostyServer(config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        run = asyncio.create_task(
+            _download_all_posts(
+                author_environment,
+                config.author_name,
+                post_concurrency=5,
+                checkpoint=author_environment.pagination_checkpoint,
+            ).execute()
+        )
+
+        # Pages after the stalled post are completed before it
+        await _wait_until(
+            lambda: _finished_posts(author_environment) == config.posts_count - 1
+        )
+        assert server.stats.stalled_requests == 1
+
+        run.cancel()
+        with pytest.raises(ApplicationCancelledError):
+            await run
+
+        assert author_environment.pagination_checkpoint.load() == saved_offset
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('post_concurrency', [1, 3])
+async def test_cancelled_run_raises_application_cancelled_error(
+    tmp_path: Path, post_concurrency: int
+):
+    config = FakeBoostyConfig(
+        posts_count=3,
+        posts=SyntheticPostsConfig(images_per_post=1, files_per_post=0),
+        image_size_bytes=1000,
+        stalled_content_posts=frozenset({0, 1, 2}),
+    )
+
+    async with (
+        FakeBoostyServer(config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        run = asyncio.create_task(
+            _download_all_posts(
+                author_environment,
+                config.author_name,
+                post_concurrency=post_concurrency,
+            ).execute()
+        )
+        await _wait_until(lambda: server.stats.stalled_requests == post_concurrency)
+
+        run.cancel()
+        with pytest.raises(ApplicationCancelledError):
+            await run
+
+        assert list(author_environment.destination_directory.glob('*/images/*')) == []
+
+
+@pytest.mark.asyncio
+async def test_chunks_of_post_are_downloaded_concurrently_in_order(tmp_path: Path):
+    config = FakeBoostyConfig(
+        posts_count=1,
+        posts=SyntheticPostsConfig(images_per_post=4, files_per_post=0),
+        image_size_bytes=1000,
+        stalled_content_posts=frozenset({0}),
+    )
+
+    async with (
+        FakeBoostyServer(config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        run = asyncio.create_task(
+            _download_all_posts(
+                author_environment, config.author_name, chunk_concurrency=3
+            ).execute()
+        )
+
+        await _wait_until(lambda: server.stats.stalled_requests == 3)
+        assert server.stats.cdn_requests == 3
+
+        server.release_stalled()
+        await run
+
+        (post_html,) = author_environment.destination_directory.glob('*/*.html')
+        html = post_html.read_text(encoding='utf-8')
+        # Images are in the order of the post, whichever of them was downloaded first
+        positions = [html.index(f'images/0-{n}.jpg') for n in range(4)]
+        assert positions == sorted(positions)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_post_cancels_all_its_chunks(tmp_path: Path):
+    config = FakeBoostyConfig(
+        posts_count=1,
+        posts=SyntheticPostsConfig(images_per_post=3, files_per_post=0),
+        image_size_bytes=1000,
+        stalled_content_posts=frozenset({0}),
+    )
+
+    async with (
+        FakeBoostyServer(config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        run = asyncio.create_task(
+            _download_all_posts(
+                author_environment, config.author_name, chunk_concurrency=3
+            ).execute()
+        )
+        await _wait_until(lambda: server.stats.stalled_requests == 3)
+
+        run.cancel()
+        with pytest.raises(ApplicationCancelledError):
+            await run
+
+        # Connections of all the chunks are dropped, the post isn't rendered
+        await _wait_until(lambda: server.stats.stalled_requests == 0)
+        assert list(author_environment.destination_directory.glob('*/*.html')) == []
+
+
+@pytest.mark.asyncio
+async def test_incremental_run_stops_at_posts_without_matching_content(
+    tmp_path: Path,
+):
+    # 3 pages of posts with images only, none of them has files
+    config = FakeBoostyConfig(
+        posts_count=15,
+        posts=SyntheticPostsConfig(images_per_post=1, files_per_post=0),
+        image_size_bytes=1000,
+    )
+
+    async with (
+        FakeBoostyServer(config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        only_files = [DownloadContentTypeFilter.files]
+        await _download_all_posts(
+            author_environment, config.author_name, filters=only_files
+        ).execute()
+        assert server.stats.api_requests == 3
+        assert server.stats.cdn_requests == 0
+
+        await _download_all_posts(
+            author_environment,
+            config.author_name,
+            filters=only_files,
+            stop_after_cached_posts=5,
+        ).execute()
+
+        # Posts without files are synced, so the 1st page is enough
+        assert server.stats.api_requests == 3 + 1
+
+
+@pytest.mark.asyncio
+async def test_resumed_incremental_run_keeps_checkpoint_after_early_stop(
+    tmp_path: Path,
+):
+    posts = SyntheticPostsConfig(images_per_post=1, files_per_post=0)
+    # 6 pages, the post #12 on the 3rd one stops the checkpoint of the full run
+    broken_config = FakeBoostyConfig(
+        posts_count=30,
+        posts=posts,
+        image_size_bytes=1000,
+        missing_content_posts=frozenset({12}),
+    )
+    async with (
+        FakeBoostyServer(broken_config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        await _download_all_posts(
+            author_environment,
+            broken_config.author_name,
+            checkpoint=author_environment.pagination_checkpoint,
+        ).execute()
+        assert author_environment.pagination_checkpoint.load() == '10'
+
+    fixed_config = FakeBoostyConfig(posts_count=30, posts=posts, image_size_bytes=1000)
+    async with (
+        FakeBoostyServer(fixed_config) as server,
+        _author_environment(server, tmp_path) as author_environment,
+    ):
+        await _download_all_posts(
+            author_environment,
+            fixed_config.author_name,
+            checkpoint=author_environment.pagination_checkpoint,
+            resume=True,
+            stop_after_cached_posts=5,
+        ).execute()
+
+        # The 4th page is cached, so the 5th and 6th ones are left for the next resume
+        assert server.stats.api_requests == 2
+        assert author_environment.pagination_checkpoint.load() == '20'
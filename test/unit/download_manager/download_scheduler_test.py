@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from boosty_downloader.src.infrastructure.download_scheduler import (
+    DownloadPriority,
+    DownloadScheduler,
+)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_respects_caps_and_priorities() -> None:
+    scheduler = DownloadScheduler(max_concurrent=2, max_per_host=1)
+    started: list[str] = []
+    release = asyncio.Event()
+
+    async def job(name: str) -> str:
+        started.append(name)
+        await release.wait()
+        return name
+
+    def submit(name: str, host: str, priority: DownloadPriority) -> asyncio.Task[str]:
+        return asyncio.create_task(
+            scheduler.submit(f'https://{host}/{name}', priority, lambda: job(name))
+        )
+
+    tasks = [
+        submit('video', 'cdn-a', DownloadPriority.videos),
+        submit('file', 'cdn-a', DownloadPriority.files),
+        submit('image-a', 'cdn-a', DownloadPriority.post_content),
+        submit('image-b', 'cdn-b', DownloadPriority.post_content),
+    ]
+    await asyncio.sleep(0)
+
+    # One slot per host: busy cdn-a doesn't block cdn-b
+    assert started == ['video', 'image-b']
+    assert scheduler.stats().queued == 2
+
+    release.set()
+    assert await asyncio.gather(*tasks) == ['video', 'file', 'image-a', 'image-b']
+
+    # Images go before files once the host is free again
+    assert started == ['video', 'image-b', 'image-a', 'file']
+    stats = scheduler.stats()
+    assert (stats.queued, stats.running, stats.total_jobs) == (0, 0, 4)
+    assert stats.peak_queued == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue() -> None:
+    scheduler = DownloadScheduler(max_concurrent=1)
+    release = asyncio.Event()
+
+    running = asyncio.create_task(
+        scheduler.submit('https://cdn/a', DownloadPriority.files, release.wait)
+    )
+    waiting = asyncio.create_task(
+        scheduler.submit('https://cdn/b', DownloadPriority.files, release.wait)
+    )
+    await asyncio.sleep(0)
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    release.set()
+    await running
+    stats = scheduler.stats()
+    assert (stats.queued, stats.running) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_slots_are_shared_fairly_between_owners() -> None:
+    scheduler = DownloadScheduler(max_concurrent=2, max_per_host=2)
+    started: list[str] = []
+
+    async def job(name: str) -> None:
+        started.append(name)
+        await asyncio.sleep(0)
+
+    # The first author queued a lot before the second one came
+    names = [f'a{n}' for n in range(4)] + ['b0', 'b1']
+    await asyncio.gather(
+        *(
+            scheduler.submit(
+                f'https://cdn/{name}',
+                DownloadPriority.files,
+                lambda name=name: job(name),
+                owner=name[0],
+            )
+            for name in names
+        )
+    )
+
+    # Once the owner `a` holds a slot, the freed one goes to `b` first
+    assert started == ['a0', 'a1', 'b0', 'a2', 'b1', 'a3']
+
+
+@pytest.mark.asyncio
+async def test_download_takes_a_slot_for_each_connection() -> None:
+    scheduler = DownloadScheduler(max_concurrent=8, max_per_host=4)
+    started: list[str] = []
+    release = asyncio.Event()
+
+    async def job(name: str) -> None:
+        started.append(name)
+        await release.wait()
+
+    def submit(name: str, host: str, connections: int) -> asyncio.Task[None]:
+        return asyncio.create_task(
+            scheduler.submit(
+                f'https://{host}/{name}',
+                DownloadPriority.files,
+                lambda: job(name),
+                connections=connections,
+            )
+        )
+
+    tasks = [
+        submit('segmented', 'cdn-a', 3),
+        submit('image-a', 'cdn-a', 1),
+        submit('file-a', 'cdn-a', 1),
+        # More connections than the host allows, so it runs alone on its host
+        submit('stream', 'cdn-b', 10),
+        submit('image-b', 'cdn-b', 1),
+    ]
+    await asyncio.sleep(0)
+
+    assert started == ['segmented', 'image-a', 'stream']
+    assert scheduler.stats().running == 8
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert sorted(started[3:]) == ['file-a', 'image-b']
+    assert scheduler.stats().running == 0
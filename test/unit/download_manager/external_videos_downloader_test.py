@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+from benchmarks.fake_boosty import FakeBoostyConfig, FakeBoostyServer
+
+from boosty_downloader.src.infrastructure.external_videos_downloader.external_videos_downloader import (
+    ExternalVideoDownloadStatus,
+    ExternalVideosDownloader,
+    ExtVideoInfoError,
+    ExtVideoInterruptedByUserError,
+)
+
+VIDEO_SIZE = 1_000_000
+
+
+class _FakeYoutubeDL:
+    """Answers `extract_info` with the prepared infos of the urls."""
+
+    def __init__(self, infos: dict[str, dict[str, Any]]) -> None:
+        self.infos = infos
+        self.requests: list[tuple[str, str | None]] = []
+
+    def extract_info(
+        self, url: str, *, download: bool, process: bool, ie_key: str | None
+    ) -> dict[str, Any]:
+        assert not download
+        assert not process
+        self.requests.append((url, ie_key))
+        return self.infos[url]
+
+
+def test_redirects_are_followed_with_transparent_fields():
+    ydl = _FakeYoutubeDL(
+        {
+            'https://blog/embed': {
+                '_type': 'url_transparent',
+                'url': 'https://player/1',
+                'ie_key': 'Player',
+                'id': 'embed',
+                'title': 'Title of the embedding page',
+                'description': None,
+            },
+            'https://player/1': {
+                '_type': 'url',
+                'url': 'https://video/1',
+                'ie_key': 'Video',
+            },
+            'https://video/1': {
+                'id': 'video-1',
+                'title': 'Title of the video',
+                'description': 'Video description',
+            },
+        }
+    )
+
+    info = ExternalVideosDownloader()._extract_video_info(  # noqa: SLF001 (the resolving step only)
+        ydl, 'https://blog/embed'
+    )
+
+    assert ydl.requests == [
+        ('https://blog/embed', None),
+        ('https://player/1', 'Player'),
+        ('https://video/1', 'Video'),
+    ]
+    assert info == {
+        'id': 'video-1',
+        'title': 'Title of the embedding page',
+        'description': 'Video description',
+    }
+
+
+def test_redirect_loop_is_not_followed_forever():
+    ydl = _FakeYoutubeDL(
+        {'https://loop': {'_type': 'url_transparent', 'url': 'https://loop'}}
+    )
+
+    with pytest.raises(ExtVideoInfoError):
+        ExternalVideosDownloader()._extract_video_info(ydl, 'https://loop')  # noqa: SLF001 (the resolving step only)
+    assert len(ydl.requests) == 5  # Redirects limit
+
+
+@pytest.mark.asyncio
+async def test_cancel_event_stops_download(tmp_path: Path):
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    async with FakeBoostyServer(
+        FakeBoostyConfig(video_size_bytes=VIDEO_SIZE)
+    ) as server:
+        # Stopped on the first progress report, before anything is written
+        with (
+            ExternalVideosDownloader() as downloader,
+            pytest.raises(ExtVideoInterruptedByUserError),
+        ):
+            await asyncio.to_thread(
+                downloader.download_video,
+                f'{server.cdn_url}/videos/0-0',
+                tmp_path,
+                cancel_event=cancel_event,
+            )
+
+    assert not (tmp_path / '00.mp4').exists()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_task_stops_download_thread(tmp_path: Path):
+    config = FakeBoostyConfig(
+        video_size_bytes=VIDEO_SIZE, bandwidth_bytes_per_second=VIDEO_SIZE
+    )
+    started = asyncio.Event()
+    statuses: list[ExternalVideoDownloadStatus] = []
+
+    def on_progress(status: ExternalVideoDownloadStatus) -> None:
+        statuses.append(status)
+        started.set()
+
+    async with FakeBoostyServer(config) as server:
+        with ExternalVideosDownloader() as downloader:
+            download = asyncio.create_task(
+                downloader.download_video_async(
+                    f'{server.cdn_url}/videos/0-0', tmp_path, on_progress
+                )
+            )
+            await asyncio.wait_for(started.wait(), timeout=10)
+
+            download.cancel()
+            with pytest.raises(ExtVideoInterruptedByUserError):
+                await download
+
+            # The thread has stopped, nothing is reported after the cancellation
+            reported = len(statuses)
+            await asyncio.sleep(0.2)
+            assert len(statuses) == reported
+
+    assert not (tmp_path / '00.mp4').exists()
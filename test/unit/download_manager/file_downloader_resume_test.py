@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp_retry import RetryClient
+
+from boosty_downloader.src.infrastructure.file_downloader import (
+    DownloadConnectionError,
+    DownloadedFile,
+    DownloadFileConfig,
+    download_file,
+    download_file_with_info,
+)
+
+FILE_DATA = os.urandom(3 * 1024 * 1024)
+ETAG = '"test-etag"'
+
+
+def _assert_downloaded(downloaded: DownloadedFile, expected: bytes) -> None:
+    """The whole file is downloaded and its partial file is renamed to it."""
+    assert downloaded.path.read_bytes() == expected
+    assert [p.name for p in downloaded.path.parent.iterdir()] == [downloaded.path.name]
+
+
+def _make_app(*, drop_first_response: bool) -> web.Application:
+    state = {'drop': drop_first_response}
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        start = 0
+        range_header = request.headers.get('Range')
+        if range_header and request.headers.get('If-Range') == ETAG:
+            start = int(range_header.removeprefix('bytes=').rstrip('-'))
+
+        response = web.StreamResponse(
+            status=206 if start else 200,
+            headers={'ETag': ETAG, 'Content-Type': 'video/mp4'},
+        )
+        if start:
+            response.headers['Content-Range'] = (
+                f'bytes {start}-{len(FILE_DATA) - 1}/{len(FILE_DATA)}'
+            )
+        response.content_length = len(FILE_DATA) - start
+        await response.prepare(request)
+
+        body = FILE_DATA[start:]
+        if state['drop']:
+            state['drop'] = False
+            await response.write(body[: len(body) // 3])
+            assert request.transport is not None
+            request.transport.close()
+            return response
+
+        await response.write(body)
+        return response
+
+    app = web.Application()
+    app.router.add_get('/video', handler)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_download_file_resumes_partial_download(tmp_path: Path):
+    runner = web.AppRunner(_make_app(drop_first_response=True))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    try:
+        async with ClientSession() as session:
+            dl_config = DownloadFileConfig(
+                session=RetryClient(session),
+                url=f'http://127.0.0.1:{port}/video',
+                filename='video',
+                destination=tmp_path,
+                resume=True,
+                compute_sha256=True,
+            )
+
+            with pytest.raises(DownloadConnectionError) as exc_info:
+                await download_file(dl_config)
+
+            part_file = tmp_path / 'video.part'
+            assert exc_info.value.resumable
+            assert exc_info.value.file == part_file
+            part_size = (await asyncio.to_thread(part_file.stat)).st_size
+            assert 0 < part_size < len(FILE_DATA)
+
+            downloaded = await download_file_with_info(dl_config)
+    finally:
+        await runner.cleanup()
+
+    assert downloaded.path == tmp_path / 'video.mp4'
+    # Resumed prefix is hashed too, not only the streamed rest
+    assert downloaded.sha256 == hashlib.sha256(FILE_DATA).hexdigest()
+    assert downloaded.size == len(FILE_DATA)
+    _assert_downloaded(downloaded, FILE_DATA)
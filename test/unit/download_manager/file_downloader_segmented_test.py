@@ -0,0 +1,76 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+from aiohttp import ClientSession
+from aiohttp_retry import ExponentialRetry, RetryClient
+from benchmarks.fake_boosty import FakeBoostyConfig, FakeBoostyServer
+
+from boosty_downloader.src.infrastructure.file_downloader import (
+    DownloadError,
+    DownloadFileConfig,
+    DownloadIncompleteError,
+    DownloadUnexpectedStatusError,
+    download_file_with_info,
+)
+
+FILE_SIZE = 100_000
+
+
+async def _download_segmented(
+    server: FakeBoostyServer, destination: Path
+) -> tuple[Path, str | None]:
+    async with ClientSession() as session:
+        downloaded = await download_file_with_info(
+            DownloadFileConfig(
+                session=RetryClient(
+                    session, retry_options=ExponentialRetry(attempts=1)
+                ),
+                url=f'{server.cdn_url}/files/0-0',
+                filename='file',
+                destination=destination,
+                guess_extension=False,
+                segments=4,
+                segment_threshold_bytes=1000,
+                compute_sha256=True,
+            )
+        )
+    return downloaded.path, downloaded.sha256
+
+
+@pytest.mark.asyncio
+async def test_segmented_download_joins_ranges(tmp_path: Path):
+    async with FakeBoostyServer(FakeBoostyConfig(file_size_bytes=FILE_SIZE)) as server:
+        path, sha256 = await _download_segmented(server, tmp_path)
+        expected = server.payload('files', '0-0')
+
+    assert path.read_bytes() == expected
+    assert sha256 == hashlib.sha256(expected).hexdigest()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('config', 'error_type'),
+    [
+        # CDN serves only the first 10 KB of every range
+        (
+            FakeBoostyConfig(file_size_bytes=FILE_SIZE, max_range_bytes=10_000),
+            DownloadUnexpectedStatusError,
+        ),
+        # CDN confirms the whole range, but the body is cut short
+        (
+            FakeBoostyConfig(file_size_bytes=FILE_SIZE, range_body_shortfall_bytes=100),
+            DownloadIncompleteError,
+        ),
+    ],
+)
+async def test_segmented_download_rejects_incomplete_ranges(
+    tmp_path: Path, config: FakeBoostyConfig, error_type: type[DownloadError]
+):
+    async with FakeBoostyServer(config) as server:
+        with pytest.raises(error_type) as exc_info:
+            await _download_segmented(server, tmp_path)
+
+    # The file with zero-filled holes is never reported as downloaded
+    assert not exc_info.value.resumable
+    assert not (tmp_path / 'file').exists()
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import os
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp_retry import ExponentialRetry, RetryClient
+
+from boosty_downloader.src.infrastructure.file_downloader import (
+    DownloadedFile,
+    DownloadError,
+    DownloadFileConfig,
+    DownloadUnexpectedStatusError,
+)
+from boosty_downloader.src.infrastructure.host_failover import (
+    DownloadTooSlowError,
+    ThroughputFloor,
+    download_with_failover,
+)
+
+FILE_DATA = os.urandom(1024 * 1024)
+ETAG = '"same-video"'
+SLOW_PREFIX_SIZE = 256 * 1024
+
+
+def _assert_downloaded(downloaded: DownloadedFile, expected: bytes) -> None:
+    """The file is complete and no host has left its partial file behind."""
+    assert downloaded.path.read_bytes() == expected
+    assert [p.name for p in downloaded.path.parent.iterdir()] == [downloaded.path.name]
+
+
+def _make_app(mirror_ranges: list[str | None], stall: asyncio.Event) -> web.Application:
+    async def slow(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(
+            headers={'ETag': ETAG, 'Content-Type': 'video/mp4'}
+        )
+        response.content_length = len(FILE_DATA)
+        await response.prepare(request)
+        await response.write(FILE_DATA[:SLOW_PREFIX_SIZE])
+        await stall.wait()  # Stalled node, until the test is over
+        return response
+
+    async def broken(_: web.Request) -> web.Response:
+        raise web.HTTPServiceUnavailable
+
+    async def mirror(request: web.Request) -> web.Response:
+        range_header = request.headers.get('Range')
+        mirror_ranges.append(range_header)
+        if range_header is None or request.headers.get('If-Range') != ETAG:
+            return web.Response(
+                body=FILE_DATA, headers={'ETag': ETAG, 'Content-Type': 'video/mp4'}
+            )
+
+        start = int(range_header.removeprefix('bytes=').rstrip('-'))
+        return web.Response(
+            status=206,
+            body=FILE_DATA[start:],
+            headers={
+                'ETag': ETAG,
+                'Content-Type': 'video/mp4',
+                'Content-Range': f'bytes {start}-{len(FILE_DATA) - 1}/{len(FILE_DATA)}',
+            },
+        )
+
+    app = web.Application()
+    app.router.add_get('/slow/video', slow)
+    app.router.add_get('/broken/video', broken)
+    app.router.add_get('/mirror/video', mirror)
+    return app
+
+
+async def _download(
+    tmp_path: Path, primary: str
+) -> tuple[list[str | None], list[DownloadError], list[str]]:
+    mirror_ranges: list[str | None] = []
+    failover_errors: list[DownloadError] = []
+    host_slots: list[str] = []
+    reported_bytes: list[int] = []
+
+    @asynccontextmanager
+    async def host_slot(url: str) -> AsyncGenerator[None, None]:
+        host = url.split('/')[-2]  # Hosts are emulated by the path prefix
+        host_slots.append(f'enter {host}')
+        try:
+            yield
+        finally:
+            host_slots.append(f'exit {host}')
+
+    stall = asyncio.Event()
+    runner = web.AppRunner(_make_app(mirror_ranges, stall))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base_url = f'http://127.0.0.1:{runner.addresses[0][1]}'
+
+    try:
+        async with ClientSession() as session:
+            downloaded = await download_with_failover(
+                DownloadFileConfig(
+                    session=RetryClient(
+                        session, retry_options=ExponentialRetry(attempts=1)
+                    ),
+                    url=f'{base_url}/{primary}/video',
+                    filename='video',
+                    destination=tmp_path,
+                    resume=True,
+                    compute_sha256=True,
+                    chunk_size_bytes=65536,
+                    on_status_update=lambda s: reported_bytes.append(
+                        s.downloaded_bytes
+                    ),
+                ),
+                [f'{base_url}/mirror/video'],
+                throughput_floor=ThroughputFloor(
+                    bytes_per_second=1024 * 1024, window_seconds=0.2
+                ),
+                on_failover=lambda error, _: failover_errors.append(error),
+                host_slot=host_slot,
+            )
+    finally:
+        stall.set()
+        await runner.cleanup()
+
+    assert downloaded.path == tmp_path / 'video.mp4'
+    assert downloaded.sha256 == hashlib.sha256(FILE_DATA).hexdigest()
+    _assert_downloaded(downloaded, FILE_DATA)
+    # Bytes the mirror reports again after the failover aren't counted twice
+    assert sum(reported_bytes) == len(FILE_DATA)
+    return mirror_ranges, failover_errors, host_slots
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_host_is_continued_from_the_mirror(tmp_path: Path):
+    mirror_ranges, failover_errors, _ = await _download(tmp_path, 'slow')
+
+    assert [type(e) for e in failover_errors] == [DownloadTooSlowError]
+    # The mirror serves the same file version, so the partial download is resumed
+    assert mirror_ranges == [f'bytes={SLOW_PREFIX_SIZE}-']
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_host_is_downloaded_from_the_mirror(tmp_path: Path):
+    mirror_ranges, failover_errors, host_slots = await _download(tmp_path, 'broken')
+
+    assert [type(e) for e in failover_errors] == [DownloadUnexpectedStatusError]
+    assert mirror_ranges == [None]
+    # The slot of the failed host is given back before the mirror takes its own
+    assert host_slots == ['enter broken', 'exit broken', 'enter mirror', 'exit mirror']
@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from boosty_downloader.src.application.filtering import DownloadContentTypeFilter
+from boosty_downloader.src.application.use_cases.verify_downloads import (
+    VerifyDownloadsUseCase,
+)
+from boosty_downloader.src.infrastructure.loggers.base import RichLogger
+from boosty_downloader.src.infrastructure.post_caching.post_cache import (
+    SQLitePostCache,
+)
+from boosty_downloader.src.infrastructure.post_manifest import PostManifest
+from boosty_downloader.src.interfaces.console_progress_reporter import ProgressReporter
+
+UPDATED_AT = datetime(2025, 1, 1, tzinfo=timezone.utc)
+ALL_PARTS = list(DownloadContentTypeFilter)
+
+
+def _write_post(post_directory: Path, files: dict[str, bytes]) -> None:
+    manifest = PostManifest(post_uuid=post_directory.name, updated_at=UPDATED_AT)
+    for relative_path, content in files.items():
+        file_path = post_directory / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(content)
+        manifest.add(
+            post_directory,
+            file_path,
+            url=f'https://cdn.example/{relative_path}?signature=secret',
+            size=len(content),
+            sha256=hashlib.sha256(content).hexdigest(),
+            etag='"v1"',
+        )
+    manifest.save(post_directory)
+
+
+def test_manifest_roundtrip_without_signed_query(tmp_path: Path) -> None:
+    _write_post(tmp_path, {'images/a.jpg': b'image'})
+
+    manifest = PostManifest.load(tmp_path)
+    assert manifest is not None
+    assert manifest.updated_at == UPDATED_AT
+    entry = manifest.entries['images/a.jpg']
+    assert entry.url == 'https://cdn.example/images/a.jpg'
+    assert entry.etag == '"v1"'
+    assert manifest.find_intact(tmp_path, tmp_path / 'images' / 'a.jpg') is entry
+
+    (tmp_path / 'images' / 'a.jpg').write_bytes(b'truncated')
+    assert manifest.find_intact(tmp_path, tmp_path / 'images' / 'a.jpg') is None
+
+
+@pytest.mark.asyncio
+async def test_verify_queues_only_broken_parts(tmp_path: Path) -> None:
+    _write_post(
+        tmp_path / 'post-ok',
+        {'images/a.jpg': b'image', 'files/doc.pdf': b'document'},
+    )
+    _write_post(
+        tmp_path / 'post-broken',
+        {'images/b.jpg': b'image-b', 'files/doc.pdf': b'document'},
+    )
+    # Same size, different content: only the hash can tell it
+    (tmp_path / 'post-broken' / 'images' / 'b.jpg').write_bytes(b'image-X')
+    (tmp_path / 'post-broken' / 'files' / 'doc.pdf').unlink()
+
+    with SQLitePostCache(tmp_path, RichLogger('post_manifest_test')) as cache:
+        for post_uuid in ('post-ok', 'post-broken'):
+            cache.cache(post_uuid, UPDATED_AT, ALL_PARTS)
+
+        report = await VerifyDownloadsUseCase(
+            destination=tmp_path,
+            post_cache=cache,
+            progress_reporter=ProgressReporter(),
+        ).execute()
+
+        assert report.checked == 4
+        assert report.damaged == ['post-broken/images/b.jpg']
+        assert report.missing == ['post-broken/files/doc.pdf']
+        assert not (tmp_path / 'post-broken' / 'images' / 'b.jpg').exists()
+
+        assert cache.get_missing_parts('post-ok', UPDATED_AT, ALL_PARTS) == []
+        assert set(cache.get_missing_parts('post-broken', UPDATED_AT, ALL_PARTS)) == {
+            DownloadContentTypeFilter.post_content,
+            DownloadContentTypeFilter.files,
+        }
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from boosty_downloader.src.application.use_cases.sync_daemon import (
+    PollSchedule,
+    SyncDaemonUseCase,
+)
+from boosty_downloader.src.infrastructure.boosty_api.core.client import (
+    BoostyAPIUnauthorizedError,
+    BoostyAPIUnknownError,
+)
+from boosty_downloader.src.infrastructure.loggers.base import RichLogger
+from boosty_downloader.src.interfaces.console_progress_reporter import (
+    ProgressReporter,
+)
+
+
+def _quiet_reporter() -> ProgressReporter:
+    logger = RichLogger('daemon-test')
+    logger.console.quiet = True
+    return ProgressReporter(logger=logger.logging_logger_obj, console=logger.console)
+
+
+def test_backoff_doubles_after_failures_up_to_the_max():
+    schedule = PollSchedule(
+        interval_seconds=600, error_backoff_seconds=60, max_backoff_seconds=300
+    )
+
+    assert [schedule.next_delay(failures) for failures in range(5)] == [
+        600,
+        60,
+        120,
+        240,
+        300,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_daemon_keeps_polling_failing_author_and_stops_gracefully():
+    polls: list[str] = []
+    finished_polls: list[str] = []
+
+    async def poll_author(author_name: str) -> None:
+        polls.append(author_name)
+        if author_name == 'broken':
+            raise BoostyAPIUnknownError(500, 'oops')
+        if polls.count('fine') == 3:
+            daemon.request_stop()
+            await asyncio.sleep(0.01)  # The running poll is finished after the stop
+        finished_polls.append(author_name)
+
+    daemon = SyncDaemonUseCase(
+        authors=['fine', 'broken'],
+        poll_author=poll_author,
+        progress_reporter=_quiet_reporter(),
+        schedule=PollSchedule(interval_seconds=0.01, error_backoff_seconds=0.001),
+        parallel_authors=2,
+    )
+    await asyncio.wait_for(daemon.execute(), timeout=5)
+
+    assert finished_polls == ['fine'] * 3
+    assert polls.count('broken') >= 2  # Failures don't stop polling of the author
+
+
+@pytest.mark.asyncio
+async def test_daemon_stops_on_bad_credentials():
+    async def poll_author(_: str) -> None:
+        raise BoostyAPIUnauthorizedError
+
+    daemon = SyncDaemonUseCase(
+        authors=['author'],
+        poll_author=poll_author,
+        progress_reporter=_quiet_reporter(),
+        schedule=PollSchedule(interval_seconds=0.01),
+    )
+    with pytest.raises(BoostyAPIUnauthorizedError):
+        await asyncio.wait_for(daemon.execute(), timeout=5)
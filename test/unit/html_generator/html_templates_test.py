@@ -1,7 +1,11 @@
+from collections.abc import Iterator
 from pathlib import Path
 
+import pytest
+
 from boosty_downloader.src.infrastructure.html_generator.models import (
     HtmlGenChunk,
+    HtmlGenFile,
     HtmlGenImage,
     HtmlGenList,
     HtmlGenText,
@@ -12,6 +16,7 @@ from boosty_downloader.src.infrastructure.html_generator.models import (
 )
 from boosty_downloader.src.infrastructure.html_generator.renderer import (
     render_html,
+    render_html_chunk,
     render_html_to_file,
 )
 
@@ -158,3 +163,29 @@ def test_html_generator_templates():
     assert len(data) > 0
 
     test_output_file.unlink(missing_ok=True)
+
+
+def test_html_is_streamed_to_file_and_kept_on_failure(tmp_path: Path):
+    out_path = tmp_path / 'post' / 'post.html'
+    chunks: list[HtmlGenChunk] = [
+        HtmlGenText(text_fragments=[HtmlTextFragment(text='Hello', header_level=1)]),
+        HtmlGenFile(url='files/a&b.zip', filename='a&b.zip'),
+    ]
+
+    render_html_to_file(iter(chunks), out_path)
+
+    html = out_path.read_text(encoding='utf-8')
+    assert html == render_html(chunks)
+    assert '<h1>Hello</h1>' in html
+    assert render_html_chunk(chunks[1]) in html
+    assert '<a href="files/a&amp;b.zip" download>a&amp;b.zip</a>' in html
+
+    def failing_chunks() -> Iterator[HtmlGenChunk]:
+        yield chunks[0]
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        render_html_to_file(failing_chunks(), out_path)
+
+    assert out_path.read_text(encoding='utf-8') == html
+    assert list(out_path.parent.iterdir()) == [out_path]
@@ -0,0 +1,83 @@
+import json
+import random
+
+import pytest
+
+from boosty_downloader.src.application.mappers import to_domain_text_chunk
+from boosty_downloader.src.domain.post_data_chunks import PostDataChunkText
+from boosty_downloader.src.infrastructure.boosty_api.models.post.post_data_types import (
+    BoostyPostDataTextDTO,
+)
+
+TextFragment = PostDataChunkText.TextFragment
+
+
+def _reference_fragments(text: str, style_array: list[list[int]]) -> list[TextFragment]:
+    """Previous per-character implementation, the sweep must give the same output."""
+    if not text:
+        return []
+
+    bitmap: list[set[int]] = [set() for _ in range(len(text))]
+    for style_id, start_idx, end_idx in style_array:
+        for i in range(start_idx, min(end_idx, len(text))):
+            bitmap[i].add(style_id)
+
+    def make_fragment(fragment_text: str, styles: set[int]) -> TextFragment:
+        return TextFragment(
+            fragment_text,
+            style=TextFragment.TextStyle(
+                bold=0 in styles, italic=2 in styles, underline=4 in styles
+            ),
+        )
+
+    fragments: list[TextFragment] = []
+    start = 0
+    for i in range(1, len(text)):
+        if bitmap[i] != bitmap[start]:
+            fragments.append(make_fragment(text[start:i], bitmap[start]))
+            start = i
+    fragments.append(make_fragment(text[start:], bitmap[start]))
+    return fragments
+
+
+def _random_case(rng: random.Random) -> tuple[str, list[list[int]], str]:
+    text = ''.join(rng.choice('ab c') for _ in range(rng.randint(0, 60)))
+    styles: list[list[int]] = []
+    for _ in range(rng.randint(0, 12)):
+        start = rng.randint(0, len(text) + 5)
+        # Empty, reversed and beyond the text ranges are allowed too
+        end = start + rng.randint(-3, 20)
+        # 1 and 7 are unknown styles, they still split fragments
+        styles.append([rng.choice((0, 2, 4, 1, 7)), start, end])
+    modificator = rng.choice(('', 'BLOCK_END'))
+    return text, styles, modificator
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_fragments_match_per_character_reference(seed: int) -> None:
+    rng = random.Random(seed)  # noqa: S311 (reproducible corpus)
+    for _ in range(100):
+        text, styles, modificator = _random_case(rng)
+        dto = BoostyPostDataTextDTO(
+            type='text',
+            modificator=modificator,
+            content=json.dumps([text, 'unstyled', styles]),
+        )
+
+        full_text = text + '\n' if modificator == 'BLOCK_END' else text
+        assert to_domain_text_chunk(dto) == _reference_fragments(full_text, styles)
+
+
+def test_negative_offsets_are_clamped_to_text_start() -> None:
+    dto = BoostyPostDataTextDTO(
+        type='text',
+        modificator='',
+        content=json.dumps(['hello world', 'header-one', [[0, -3, 5]]]),
+    )
+
+    fragments = to_domain_text_chunk(dto)
+
+    assert [f.text for f in fragments] == ['hello', ' world']
+    assert fragments[0].style.bold
+    assert not fragments[1].style.bold
+    assert all(f.header_level == 1 for f in fragments)
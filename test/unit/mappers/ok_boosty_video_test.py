@@ -0,0 +1,26 @@
+import pytest
+
+from boosty_downloader.src.application.mappers.ok_boosty_video import (
+    to_failover_url,
+)
+
+VIDEO_URL = 'https://vd5.mycdn.me/?expires=1&srcIp=1.2.3.4&sig=a%2Fb%3D&id=42'
+
+
+@pytest.mark.parametrize(
+    ('failover_host', 'expected'),
+    [
+        (
+            'vd9.mycdn.me',
+            'https://vd9.mycdn.me/?expires=1&srcIp=1.2.3.4&sig=a%2Fb%3D&id=42',
+        ),
+        (
+            'http://vd9.mycdn.me:8080',
+            'http://vd9.mycdn.me:8080/?expires=1&srcIp=1.2.3.4&sig=a%2Fb%3D&id=42',
+        ),
+        ('vd5.mycdn.me', None),  # The same host, nothing to fail over to
+        ('', None),
+    ],
+)
+def test_failover_url_keeps_signed_query(failover_host: str, expected: str | None):
+    assert to_failover_url(VIDEO_URL, failover_host) == expected
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from boosty_downloader.src.application.filtering import DownloadContentTypeFilter
+from boosty_downloader.src.infrastructure.author_index import AuthorIndex
+from boosty_downloader.src.infrastructure.author_index.author_index import (
+    shard_filename,
+)
+from boosty_downloader.src.infrastructure.loggers.base import RichLogger
+from boosty_downloader.src.infrastructure.post_caching.post_cache import (
+    IndexedPost,
+    SQLitePostCache,
+)
+from boosty_downloader.src.infrastructure.post_manifest import PostManifest
+
+FIRST_POST_AT = datetime(2025, 1, 1, tzinfo=timezone.utc)
+LOGGER = RichLogger('author_index_test')
+
+
+def _post(number: int, title: str | None = None) -> IndexedPost:
+    return IndexedPost(
+        uuid=f'post-{number}',
+        title=title or f'Post number {number}',
+        directory=f'2025 - Post {number}',
+        created_at=FIRST_POST_AT + timedelta(days=number),
+    )
+
+
+def test_new_posts_rewrite_only_the_last_page_and_their_shards(tmp_path: Path):
+    pages_dir = tmp_path / '_index' / 'pages'
+    search_dir = tmp_path / '_index' / 'search'
+
+    with (
+        SQLitePostCache(tmp_path, LOGGER) as cache,
+        AuthorIndex(tmp_path, cache, posts_per_page=2) as index,
+    ):
+        for number in range(3):
+            index.add(_post(number))
+
+    assert sorted(p.name for p in pages_dir.iterdir()) == [
+        'page-00001.html',
+        'page-00002.html',
+    ]
+    assert '2025%20-%20Post%202/post.html' in (
+        search_dir / shard_filename('nu')
+    ).read_text(encoding='utf-8')
+
+    # Files of untouched pages/shards are not written again
+    (pages_dir / 'page-00001.html').unlink()
+    (search_dir / shard_filename('po')).unlink()
+
+    with (
+        SQLitePostCache(tmp_path, LOGGER) as cache,
+        AuthorIndex(tmp_path, cache, posts_per_page=2) as index,
+    ):
+        index.add(_post(2))  # Same post, nothing changes
+        index.add(_post(3, title='Extra update'))
+
+    assert [p.name for p in pages_dir.iterdir()] == ['page-00002.html']
+    assert not (search_dir / shard_filename('po')).exists()
+    assert 'Extra update' in (search_dir / shard_filename('ex')).read_text(
+        encoding='utf-8'
+    )
+    index_html = (tmp_path / 'index.html').read_text(encoding='utf-8')
+    assert '4 posts' in index_html
+    assert '_index/pages/page-00002.html' in index_html
+
+
+def test_existing_downloads_are_indexed_from_manifests(tmp_path: Path):
+    for number in range(2):
+        post_directory = tmp_path / f'post-dir-{number}'
+        post_directory.mkdir()
+        PostManifest(
+            post_uuid=f'post-{number}',
+            updated_at=FIRST_POST_AT,
+            title=f'Manifest title {number}',
+            created_at=FIRST_POST_AT,
+        ).save(post_directory)
+
+    with SQLitePostCache(tmp_path, LOGGER) as cache:
+        # Only posts the cache knows as downloaded are indexed
+        cache.cache('post-0', FIRST_POST_AT, [DownloadContentTypeFilter.post_content])
+        with AuthorIndex(tmp_path, cache):
+            pass
+
+    with SQLitePostCache(tmp_path, LOGGER) as cache:
+        indexed = cache.get_indexed_posts()
+
+    assert [(post.uuid, post.title, post.has_html) for post in indexed] == [
+        ('post-0', 'Manifest title 0', False)
+    ]
+    assert 'post-dir-0/' in (
+        tmp_path / '_index' / 'pages' / 'page-00001.html'
+    ).read_text(encoding='utf-8')
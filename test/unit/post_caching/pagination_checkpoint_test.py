@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from boosty_downloader.src.infrastructure.post_caching.pagination_checkpoint import (
+    PaginationCheckpoint,
+)
+
+
+def test_checkpoint_roundtrip_and_clear(tmp_path: Path) -> None:
+    checkpoint = PaginationCheckpoint(tmp_path)
+    assert checkpoint.load() is None
+
+    checkpoint.save('1700000000:42')
+    checkpoint.save('1600000000:17')
+    assert PaginationCheckpoint(tmp_path).load() == '1600000000:17'
+
+    checkpoint.clear()
+    assert checkpoint.load() is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_broken_checkpoint_is_ignored(tmp_path: Path) -> None:
+    checkpoint = PaginationCheckpoint(tmp_path)
+    checkpoint.checkpoint_file.write_text('{"offset": ', encoding='utf-8')
+
+    assert checkpoint.load() is None
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+from boosty_downloader.src.application.filtering import DownloadContentTypeFilter
+from boosty_downloader.src.infrastructure.loggers.base import RichLogger
+from boosty_downloader.src.infrastructure.post_caching.post_cache import (
+    SQLitePostCache,
+)
+
+UPDATED_AT = datetime(2025, 1, 1, tzinfo=timezone.utc)
+ALL_PARTS = list(DownloadContentTypeFilter)
+LOGGER = RichLogger('post_cache_test')
+
+
+def test_cached_parts_survive_reopening(tmp_path: Path) -> None:
+    with SQLitePostCache(tmp_path, LOGGER) as cache:
+        cache.cache('post-1', UPDATED_AT, [DownloadContentTypeFilter.files])
+        cache.cache('post-1', UPDATED_AT, [DownloadContentTypeFilter.post_content])
+        cache.commit()
+
+    with SQLitePostCache(tmp_path, LOGGER) as cache:
+        missing = cache.get_missing_parts_many(
+            [
+                ('post-1', UPDATED_AT),
+                ('post-1-outdated', UPDATED_AT),
+                ('post-2', UPDATED_AT),
+            ],
+            required=ALL_PARTS,
+        )
+        outdated = cache.get_missing_parts(
+            'post-1', UPDATED_AT + timedelta(days=1), required=ALL_PARTS
+        )
+
+    assert set(missing['post-1']) == {
+        DownloadContentTypeFilter.boosty_videos,
+        DownloadContentTypeFilter.external_videos,
+    }
+    assert missing['post-2'] == ALL_PARTS
+    assert outdated == ALL_PARTS
+
+
+def test_remove_cache_completely_clears_memory_view(tmp_path: Path) -> None:
+    with SQLitePostCache(tmp_path, LOGGER) as cache:
+        cache.cache('post-1', UPDATED_AT, ALL_PARTS)
+        cache.commit()
+        assert cache.get_missing_parts('post-1', UPDATED_AT, ALL_PARTS) == []
+
+        cache.remove_cache_completely()
+
+        assert cache.get_missing_parts('post-1', UPDATED_AT, ALL_PARTS) == ALL_PARTS
+
+
+def test_commits_are_grouped_and_flushed_on_close(tmp_path: Path) -> None:
+    cache = SQLitePostCache(
+        tmp_path, LOGGER, commit_every=3, commit_interval_seconds=3600
+    )
+    journal_mode = cache.session.execute(text('PRAGMA journal_mode')).scalar()
+
+    def committed_posts() -> int:
+        with SQLitePostCache(tmp_path, LOGGER) as other:
+            return sum(
+                not missing
+                for missing in other.get_missing_parts_many(
+                    [(f'post-{i}', UPDATED_AT) for i in range(4)], ALL_PARTS
+                ).values()
+            )
+
+    for i in range(4):
+        cache.cache(f'post-{i}', UPDATED_AT, ALL_PARTS)
+        cache.commit()
+
+    committed_before_close = committed_posts()
+    cache.close()
+
+    assert journal_mode == 'wal'
+    assert committed_before_close == 3
+    assert committed_posts() == 4